@@ -0,0 +1,61 @@
+"""Keyset pagination indexes
+
+Revision ID: 018c65c82a37
+Revises: 3cb537aa6328
+Create Date: 2026-10-17 09:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = '018c65c82a37'
+down_revision: Union[str, Sequence[str], None] = '3cb537aa6328'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Built concurrently so large tables stay writable; needs autocommit.
+    with op.get_context().autocommit_block():
+        # (posted_date DESC, id DESC) replaces (posted_date DESC) so ties on
+        # posted_date are also resolved by the index.
+        op.create_index(
+            'idx_jobs_posted_date_id', 'jobs',
+            [sa.literal_column('posted_date DESC'), sa.literal_column('id DESC')],
+            unique=False, postgresql_concurrently=True,
+        )
+        op.drop_index('idx_jobs_posted_date', table_name='jobs', postgresql_concurrently=True)
+        op.execute('ALTER INDEX idx_jobs_posted_date_id RENAME TO idx_jobs_posted_date')
+        op.create_index(
+            'idx_applications_user_created', 'applications',
+            ['user_id', sa.literal_column('created_at DESC'), sa.literal_column('id DESC')],
+            unique=False, postgresql_concurrently=True,
+        )
+        op.create_index(
+            'idx_generated_cvs_user_created', 'generated_cvs',
+            ['user_id', sa.literal_column('created_at DESC'), sa.literal_column('id DESC')],
+            unique=False, postgresql_concurrently=True,
+        )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.get_context().autocommit_block():
+        op.drop_index(
+            'idx_generated_cvs_user_created', table_name='generated_cvs',
+            postgresql_concurrently=True,
+        )
+        op.drop_index(
+            'idx_applications_user_created', table_name='applications',
+            postgresql_concurrently=True,
+        )
+        op.create_index(
+            'idx_jobs_posted_date_old', 'jobs', [sa.literal_column('posted_date DESC')],
+            unique=False, postgresql_concurrently=True,
+        )
+        op.drop_index('idx_jobs_posted_date', table_name='jobs', postgresql_concurrently=True)
+        op.execute('ALTER INDEX idx_jobs_posted_date_old RENAME TO idx_jobs_posted_date')
@@ -0,0 +1,53 @@
+"""Jobs archive and expiry sweeper indexes
+
+Revision ID: 568f8edcc373
+Revises: 6160ff3dd928
+Create Date: 2026-10-17 11:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision: str = '568f8edcc373'
+down_revision: Union[str, Sequence[str], None] = '6160ff3dd928'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('jobs_archive',
+    sa.Column('id', sa.UUID(), nullable=False),
+    sa.Column('external_id', sa.String(length=255), nullable=True),
+    sa.Column('source', sa.String(length=50), nullable=False),
+    sa.Column('title', sa.String(length=255), nullable=False),
+    sa.Column('company', sa.String(length=255), nullable=False),
+    sa.Column('posted_date', sa.DateTime(timezone=True), nullable=True),
+    sa.Column('expires_at', sa.DateTime(timezone=True), nullable=True),
+    sa.Column('data', postgresql.JSONB(astext_type=sa.Text()), nullable=False),
+    sa.Column('archived_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+    sa.PrimaryKeyConstraint('id')
+    )
+    # Partial indexes covering only the rows each sweeper step looks at.
+    # Built concurrently so jobs stays writable; needs autocommit.
+    with op.get_context().autocommit_block():
+        op.create_index(
+            'idx_jobs_active_expires', 'jobs', ['expires_at'],
+            unique=False, postgresql_where=sa.text('is_active'), postgresql_concurrently=True,
+        )
+        op.create_index(
+            'idx_jobs_inactive_updated', 'jobs', ['updated_at'],
+            unique=False, postgresql_where=sa.text('NOT is_active'), postgresql_concurrently=True,
+        )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.get_context().autocommit_block():
+        op.drop_index('idx_jobs_inactive_updated', table_name='jobs', postgresql_concurrently=True)
+        op.drop_index('idx_jobs_active_expires', table_name='jobs', postgresql_concurrently=True)
+    op.drop_table('jobs_archive')
@@ -0,0 +1,66 @@
+"""Job full-text search
+
+Revision ID: 6160ff3dd928
+Revises: 018c65c82a37
+Create Date: 2026-10-17 10:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = '6160ff3dd928'
+down_revision: Union[str, Sequence[str], None] = '018c65c82a37'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# array_to_string() is only STABLE, which generated columns do not accept.
+# It is immutable for text[] input, so wrap it.
+CREATE_ARRAY_TO_STRING = """
+CREATE OR REPLACE FUNCTION immutable_array_to_string(text[], text)
+RETURNS text
+LANGUAGE sql IMMUTABLE PARALLEL SAFE
+AS $$ SELECT array_to_string($1, $2) $$
+"""
+
+# Keep in sync with Job.search_vector
+SEARCH_VECTOR = """
+setweight(to_tsvector('english', coalesce(title, '')), 'A') ||
+setweight(to_tsvector('english',
+    coalesce(company, '') || ' ' || coalesce(immutable_array_to_string(required_skills, ' '), '')
+), 'B') ||
+setweight(to_tsvector('english', coalesce(description, '')), 'C')
+"""
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.execute(CREATE_ARRAY_TO_STRING)
+    # Rewrites the table once to fill the stored column
+    op.add_column(
+        'jobs',
+        sa.Column(
+            'search_vector',
+            sa.dialects.postgresql.TSVECTOR(),
+            sa.Computed(SEARCH_VECTOR, persisted=True),
+            nullable=True,
+        ),
+    )
+    with op.get_context().autocommit_block():
+        op.create_index(
+            'idx_jobs_fts', 'jobs', ['search_vector'],
+            unique=False, postgresql_using='gin', postgresql_concurrently=True,
+        )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.get_context().autocommit_block():
+        op.drop_index(
+            'idx_jobs_fts', table_name='jobs',
+            postgresql_using='gin', postgresql_concurrently=True,
+        )
+    op.drop_column('jobs', 'search_vector')
+    op.execute('DROP FUNCTION IF EXISTS immutable_array_to_string(text[], text)')
@@ -0,0 +1,60 @@
+"""Per-user application statistics
+
+Revision ID: 9399bd099d78
+Revises: 568f8edcc373
+Create Date: 2026-10-17 12:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = '9399bd099d78'
+down_revision: Union[str, Sequence[str], None] = '568f8edcc373'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Status counts from the existing rows. Funnel timings start at zero and are
+# filled in by the first repair_application_stats run.
+BACKFILL = """
+INSERT INTO application_stats
+    (user_id, total, draft, applied, interviewing, offered, rejected, accepted)
+SELECT
+    user_id,
+    count(*),
+    count(*) FILTER (WHERE status = 'draft'),
+    count(*) FILTER (WHERE status = 'applied'),
+    count(*) FILTER (WHERE status = 'interviewing'),
+    count(*) FILTER (WHERE status = 'offered'),
+    count(*) FILTER (WHERE status = 'rejected'),
+    count(*) FILTER (WHERE status = 'accepted')
+FROM applications
+GROUP BY user_id
+"""
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('application_stats',
+    sa.Column('user_id', sa.UUID(), nullable=False),
+    sa.Column('total', sa.Integer(), server_default='0', nullable=False),
+    sa.Column('draft', sa.Integer(), server_default='0', nullable=False),
+    sa.Column('applied', sa.Integer(), server_default='0', nullable=False),
+    sa.Column('interviewing', sa.Integer(), server_default='0', nullable=False),
+    sa.Column('offered', sa.Integer(), server_default='0', nullable=False),
+    sa.Column('rejected', sa.Integer(), server_default='0', nullable=False),
+    sa.Column('accepted', sa.Integer(), server_default='0', nullable=False),
+    sa.Column('interviews_tracked', sa.Integer(), server_default='0', nullable=False),
+    sa.Column('days_to_interview_sum', sa.Float(), server_default='0', nullable=False),
+    sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+    sa.ForeignKeyConstraint(['user_id'], ['auth.users.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('user_id')
+    )
+    op.execute(BACKFILL)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('application_stats')
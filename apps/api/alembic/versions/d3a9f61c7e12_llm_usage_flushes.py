@@ -0,0 +1,34 @@
+"""LLM usage flush batch records
+
+Revision ID: d3a9f61c7e12
+Revises: b71e4c2a9d05
+Create Date: 2026-10-17 18:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = 'd3a9f61c7e12'
+down_revision: Union[str, Sequence[str], None] = 'b71e4c2a9d05'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('llm_usage_flushes',
+    sa.Column('batch_id', sa.String(length=32), nullable=False),
+    sa.Column('rows', sa.Integer(), nullable=False),
+    sa.Column('flushed_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+    sa.PrimaryKeyConstraint('batch_id')
+    )
+    op.create_index('idx_llm_usage_flushes_flushed_at', 'llm_usage_flushes', ['flushed_at'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('idx_llm_usage_flushes_flushed_at', table_name='llm_usage_flushes')
+    op.drop_table('llm_usage_flushes')
@@ -0,0 +1,21 @@
+"""
+Dashboard bootstrap endpoint.
+"""
+from typing import Any, Dict
+
+from fastapi import APIRouter, Depends
+
+from app.dependencies import get_current_user
+from app.schemas.dashboard import DashboardResponse
+from app.services.dashboard import get_dashboard
+
+router = APIRouter()
+
+
+@router.get("", response_model=DashboardResponse)
+async def read_dashboard(current_user: Dict[str, Any] = Depends(get_current_user)):
+    """
+    Everything the dashboard needs in one response: profile, projects,
+    applications with their jobs, status counts and generated documents.
+    """
+    return await get_dashboard(current_user["id"])
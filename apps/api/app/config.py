@@ -20,10 +20,78 @@ class Settings(BaseSettings):
     DB_POOL_SIZE: int = 10
     DB_MAX_OVERFLOW: int = 20
     DB_ECHO: bool = False  # Set to True to log SQL queries
+    DB_QUERY_STATS_ENABLED: bool = True  # Per-request query count/time (Server-Timing, logs)
+    DB_N_PLUS_ONE_THRESHOLD: int = 10  # Warn when one statement runs more often than this in a request
+    DB_SLOW_QUERY_MS: float = 200.0  # Log statements slower than this
+    DB_SLOW_QUERY_SAMPLE_RATE: float = 1.0  # Fraction of slow statements logged (0-1)
+    DATABASE_ASYNC_URL: Optional[str] = None  # Defaults to DATABASE_URL with the asyncpg driver
+    DB_ASYNC_POOL_SIZE: int = 20  # Async engine, used by async routes
+    DB_ASYNC_MAX_OVERFLOW: int = 20
+
+    # Read replicas; reads fall back to the primary when none is healthy
+    DATABASE_REPLICA_URLS: str = ""  # Comma-separated, empty disables replica routing
+    DB_REPLICA_POOL_SIZE: int = 10  # Per replica, for each of the sync and async engines
+    DB_REPLICA_MAX_OVERFLOW: int = 10
+    DB_REPLICA_MAX_LAG: float = 5.0  # Seconds of replay lag before a replica is skipped
+    DB_REPLICA_LAG_CHECK_INTERVAL: float = 5.0  # Seconds a lag measurement is reused
+    DB_READ_YOUR_WRITES_TTL: int = 10  # Seconds a user's reads stay on the primary after a write
+
+    @staticmethod
+    def to_async_url(url: str) -> str:
+        """Rewrite a PostgreSQL URL for the asyncpg driver."""
+        scheme, _, rest = url.partition("://")
+        if scheme.split("+")[0] in ("postgres", "postgresql"):
+            scheme = "postgresql+asyncpg"
+        # asyncpg takes "ssl" where libpq takes "sslmode"
+        return f"{scheme}://{rest}".replace("sslmode=", "ssl=")
+
+    @property
+    def async_database_url(self) -> str:
+        """DATABASE_ASYNC_URL, or DATABASE_URL rewritten for the asyncpg driver."""
+        return self.DATABASE_ASYNC_URL or self.to_async_url(self.DATABASE_URL)
+
+    @property
+    def database_replica_urls(self) -> list[str]:
+        """Parse DATABASE_REPLICA_URLS into a list."""
+        return [url.strip() for url in self.DATABASE_REPLICA_URLS.split(",") if url.strip()]
 
     # Redis Configuration
     REDIS_URL: str = "redis://localhost:6379/0"
     REDIS_MAX_CONNECTIONS: int = 10
+    REDIS_CONNECT_TIMEOUT: float = 1.0  # Seconds to establish a connection
+    REDIS_SOCKET_TIMEOUT: float = 0.5  # Seconds to wait for a command reply
+
+    # Cache Configuration
+    CACHE_L1_ENABLED: bool = True  # In-process tier in front of Redis
+    CACHE_L1_NAMESPACES: str = "user:1000,profile:1000,template:200"  # namespace:max_entries
+    CACHE_L1_TTL: int = 30  # Seconds an entry may live in-process
+    CACHE_INVALIDATION_CHANNEL: str = "cache:invalidate"
+    CACHE_SCAN_BATCH_SIZE: int = 500  # Keys per SCAN/UNLINK step in clear_pattern
+    CACHE_CODEC: str = "msgpack"  # "msgpack", "orjson", "json" or "json-legacy" (headerless)
+    CACHE_COMPRESSION_MIN_BYTES: int = 1024  # Compress larger values; 0 disables
+    CACHE_COMPRESSION_LEVEL: int = 6  # zlib level 1-9
+    CACHE_LOCK_TIMEOUT: int = 30  # Max seconds a get_or_compute recompute lock is held
+    CACHE_LOCK_WAIT: float = 2.0  # Seconds to wait for another worker's recompute
+    CACHE_STALE_TTL: int = 60  # Seconds a value is kept past expiry to serve while refreshing
+    CACHE_EARLY_REFRESH_BETA: float = 1.0  # >1 refreshes earlier, 0 disables early refresh
+    CACHE_VERSION: str = "1"  # Part of every @cached key; bump to invalidate all memoized results
+    CACHE_BREAKER_FAILURE_THRESHOLD: int = 5  # Consecutive Redis failures that open the breaker
+    CACHE_BREAKER_RECOVERY_TIMEOUT: float = 30.0  # Seconds open before a probe call is allowed
+    CACHE_FALLBACK_MAX_ENTRIES: int = 1000  # In-process entries kept while the breaker is open
+    CACHE_FALLBACK_TTL: int = 30  # Seconds a fallback entry may live
+    DASHBOARD_CACHE_TTL: int = 60  # Seconds a user's dashboard payload is cached
+
+    @property
+    def cache_l1_namespaces(self) -> dict[str, int]:
+        """Parse CACHE_L1_NAMESPACES into a namespace -> size limit mapping."""
+        if not self.CACHE_L1_ENABLED:
+            return {}
+        limits = {}
+        for item in self.CACHE_L1_NAMESPACES.split(","):
+            if item.strip():
+                namespace, _, size = item.strip().partition(":")
+                limits[namespace] = int(size or 1000)
+        return limits
 
     # Supabase Configuration
     SUPABASE_URL: Optional[str] = None
@@ -36,14 +104,30 @@ class Settings(BaseSettings):
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 60
     REFRESH_TOKEN_EXPIRE_DAYS: int = 30
 
+    # Password Hashing
+    BCRYPT_ROUNDS: int = 12  # Work factor (log2 iterations); changing it rehashes on next login
+    PASSWORD_HASH_WORKERS: int = 2  # Threads hashing passwords (cores given to bcrypt)
+    PASSWORD_HASH_MAX_PENDING: int = 32  # Hashing calls queued or running per process
+    PASSWORD_HASH_QUEUE_TIMEOUT: float = 5.0  # Seconds to wait for a slot before a 429
+    TOKEN_CACHE_ENABLED: bool = True  # Serve verified claims from memory until the token's exp
+    TOKEN_CACHE_MAX_ENTRIES: int = 10000  # Verified tokens kept per process (LRU)
+    TOKEN_REVOCATION_CHANNEL: str = "auth:revocations"  # Pub/sub channel evicting revoked tokens
+    JWKS_SOURCE: Optional[str] = None  # JWKS URL or file path; enables RS256/ES256 tokens
+    JWKS_AUDIENCE: Optional[str] = "authenticated"  # Required "aud" of JWKS tokens; None skips
+    JWKS_REFRESH_INTERVAL: int = 600  # Seconds keys are kept when the source sends no max-age
+    JWKS_MIN_REFRESH_INTERVAL: int = 30  # Min seconds between refreshes triggered by unknown kids
+    JWKS_FETCH_TIMEOUT: float = 5.0  # Seconds
+
     # AI Services Configuration
     OPENAI_API_KEY: Optional[str] = None
     OPENAI_DEFAULT_MODEL: str = "gpt-4o"
+    OPENAI_ECONOMY_MODEL: str = "gpt-4o-mini"  # Used when a user nears their token budget
     OPENAI_MAX_TOKENS: int = 2000
     OPENAI_TEMPERATURE: float = 0.7
 
     ANTHROPIC_API_KEY: Optional[str] = None
     ANTHROPIC_DEFAULT_MODEL: str = "claude-3-5-sonnet-20241022"
+    ANTHROPIC_ECONOMY_MODEL: str = "claude-3-5-haiku-20241022"
     ANTHROPIC_MAX_TOKENS: int = 2000
     ANTHROPIC_TEMPERATURE: float = 0.7
 
@@ -51,6 +135,13 @@ class Settings(BaseSettings):
     AI_USE_FALLBACK: bool = True
     AI_DEFAULT_PROVIDER: str = "openai"  # "openai" or "anthropic"
 
+    # LLM Token Budgets (input + output tokens per user, UTC day/month)
+    LLM_DAILY_TOKEN_BUDGET: int = 200000
+    LLM_MONTHLY_TOKEN_BUDGET: int = 3000000
+    LLM_BUDGET_DOWNGRADE_RATIO: float = 0.8  # Switch to the economy model past this share of a budget
+    LLM_USAGE_FLUSH_INTERVAL: int = 60  # Seconds between Redis -> Postgres usage flushes
+    LLM_USAGE_FLUSH_BATCH_SIZE: int = 1000  # Rows per upsert statement
+
     # Job Scraping Configuration
     LINKEDIN_EMAIL: Optional[str] = None
     LINKEDIN_PASSWORD: Optional[str] = None
@@ -61,6 +152,14 @@ class Settings(BaseSettings):
     SCRAPER_MAX_RESULTS_PER_SOURCE: int = 100
     SCRAPER_RATE_LIMIT_PER_HOUR: int = 50
     SCRAPER_USER_AGENT: str = "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36"
+    SCRAPER_UPSERT_CHUNK_SIZE: int = 1000  # Postings per INSERT ... ON CONFLICT statement
+
+    # Job Expiry & Archival
+    JOB_SWEEP_INTERVAL: int = 900  # Seconds between expiry sweeper runs
+    JOB_SWEEP_BATCH_SIZE: int = 500  # Rows per sweeper transaction
+    JOB_SWEEP_MAX_BATCHES: int = 200  # Batches per step and run; the rest waits for the next run
+    JOB_ARCHIVE_AFTER_DAYS: int = 30  # Days a job stays inactive in the hot table before archival
+    APPLICATION_STATS_REPAIR_BATCH_SIZE: int = 200  # Users per stats repair transaction
 
     # Storage Configuration (AWS S3 or compatible)
     AWS_ACCESS_KEY_ID: Optional[str] = None
@@ -74,17 +173,31 @@ class Settings(BaseSettings):
     CELERY_RESULT_BACKEND: str = "redis://localhost:6379/0"
     CELERY_TASK_TRACK_STARTED: bool = True
     CELERY_TASK_TIME_LIMIT: int = 1800  # 30 minutes
+    CELERY_METRICS_QUEUES: str = "celery"  # Comma-separated queues whose depth /metrics reports
+    CELERY_METRICS_PORT: Optional[int] = None  # Serve worker task metrics on this port
 
     # Monitoring & Logging
     SENTRY_DSN: Optional[str] = None
     LOG_LEVEL: str = "INFO"
     LOG_FORMAT: str = "json"  # "json" or "text"
+    METRICS_ENABLED: bool = True  # Prometheus /metrics endpoint and request metrics
+
+    # Response Compression (brotli/gzip, negotiated)
+    COMPRESSION_ENABLED: bool = True
+    COMPRESSION_MIN_SIZE: int = 1024  # Bytes; smaller complete bodies are sent as is
+    COMPRESSION_GZIP_LEVEL: int = 6  # 1-9
+    COMPRESSION_BROTLI_QUALITY: int = 4  # 0-11; higher is much slower for dynamic responses
 
     # Rate Limiting
     RATE_LIMIT_ENABLED: bool = True
-    RATE_LIMIT_PER_MINUTE: int = 60
+    RATE_LIMIT_PER_MINUTE: int = 60  # Read operations (GET/HEAD)
+    RATE_LIMIT_WRITE_PER_MINUTE: int = 30  # POST/PUT/PATCH/DELETE
     RATE_LIMIT_AUTH_PER_5_MIN: int = 5
     RATE_LIMIT_AI_PER_MINUTE: int = 10
+    RATE_LIMIT_SCRAPING_PER_HOUR: int = 5  # Scrape triggers
+    RATE_LIMIT_UPLOAD_PER_10_MIN: int = 10  # multipart/form-data uploads
+    RATE_LIMIT_PROXY_HOPS: int = 0  # Trusted proxies appending to X-Forwarded-For (0 = use peer address)
+    RATE_LIMIT_LOCAL_MAX_KEYS: int = 10000  # Clients tracked by the in-process pre-check
 
     # CORS Configuration
     CORS_ORIGINS: str = "http://localhost:3000,http://localhost:3001,http://127.0.0.1:3000"
@@ -97,6 +210,9 @@ class Settings(BaseSettings):
         """Parse CORS_ORIGINS string into list."""
         return [origin.strip() for origin in self.CORS_ORIGINS.split(",")]
 
+    # Pagination
+    PAGINATION_MAX_LIMIT: int = 100  # Largest page size a client may request
+
     # File Upload Settings
     MAX_UPLOAD_SIZE: int = 10 * 1024 * 1024  # 10 MB
     ALLOWED_UPLOAD_EXTENSIONS: str = ".pdf,.docx,.doc"
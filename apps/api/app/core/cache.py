@@ -1,21 +1,378 @@
 """
 Redis cache management.
 """
-import json
-from typing import Optional, Any
+import asyncio
+import inspect
+import logging
+import math
+import random
+import threading
+import time
+import uuid
+from typing import Optional, Any, Awaitable, Callable, Dict, List, Iterable, Union
 import redis
+import redis.asyncio as aioredis
 from app.config import settings
+from app.core.circuit_breaker import CircuitBreaker, CircuitOpenError
+from app.core.codecs import UnserializableValue, encode, decode
+from app.core.local_cache import LocalCache, TTLCache, MISSING
+from app.core.metrics import record_cache_lookup
 
+logger = logging.getLogger(__name__)
 
-class Cache:
-    """Redis cache wrapper."""
+# Errors that mean Redis itself is unreachable or too slow, as opposed to a
+# bad command or an unserializable value; only these trip the breaker.
+REDIS_FAILURE_EXCEPTIONS = (
+    redis.exceptions.ConnectionError,
+    redis.exceptions.TimeoutError,
+    OSError,
+)
+
+# Tag sets live under this prefix, e.g. "tag:user:<id>" lists every key tagged "user:<id>"
+TAG_KEY_PREFIX = "tag:"
+
+# Add a key to its tag sets. A tag set never expires before its newest member.
+# KEYS: tag set keys, ARGV[1]: member key, ARGV[2]: member TTL in seconds (0 = none)
+TAG_REGISTER_SCRIPT = """
+local ttl = tonumber(ARGV[2])
+for _, tag_key in ipairs(KEYS) do
+    local existed = redis.call('EXISTS', tag_key)
+    redis.call('SADD', tag_key, ARGV[1])
+    if ttl == 0 then
+        redis.call('PERSIST', tag_key)
+    else
+        local current = redis.call('TTL', tag_key)
+        if existed == 0 or (current >= 0 and current < ttl) then
+            redis.call('EXPIRE', tag_key, ttl)
+        end
+    end
+end
+return 1
+"""
+
+# Unlink every member of the given tag sets plus the sets themselves, atomically.
+# KEYS: tag set keys. Returns the member keys that were removed.
+TAG_INVALIDATE_SCRIPT = """
+local removed = {}
+for _, tag_key in ipairs(KEYS) do
+    local members = redis.call('SMEMBERS', tag_key)
+    for i = 1, #members, 500 do
+        redis.call('UNLINK', unpack(members, i, math.min(i + 499, #members)))
+    end
+    for _, member in ipairs(members) do
+        removed[#removed + 1] = member
+    end
+    redis.call('UNLINK', tag_key)
+end
+return removed
+"""
+
+
+# Recompute locks live under this prefix, e.g. "lock:templates:public"
+LOCK_KEY_PREFIX = "lock:"
+
+# Delete a lock only if we still own it.
+# KEYS[1]: lock key, ARGV[1]: owner token
+LOCK_RELEASE_SCRIPT = """
+if redis.call('GET', KEYS[1]) == ARGV[1] then
+    return redis.call('DEL', KEYS[1])
+end
+return 0
+"""
+
+
+def tag_key(tag: str) -> str:
+    """Return the Redis key of the set tracking keys tagged with `tag`."""
+    return f"{TAG_KEY_PREFIX}{tag}"
+
+
+def _expire_for(key: str, expire: Optional[Union[int, Dict[str, int]]]) -> Optional[int]:
+    """Resolve a TTL given either for every key or per key."""
+    if isinstance(expire, dict):
+        return expire.get(key)
+    return expire
+
+
+# get_or_compute TTL: seconds, or a function of the computed value returning
+# seconds (None to return the value without caching it)
+Expire = Union[int, Callable[[Any], Optional[int]]]
+
+
+def _ttl_for(value: Any, expire: Expire) -> Optional[int]:
+    return expire(value) if callable(expire) else expire
+
+
+# Reserved key marking get_or_compute envelopes, valued with the envelope
+# format version. Anything else found under a get_or_compute key (including
+# envelopes of another version) is treated as a miss and overwritten.
+ENVELOPE_MARKER = "__cache_envelope__"
+ENVELOPE_VERSION = 1
+
+
+def _envelope(value: Any, expire: int, compute_time: float) -> Dict[str, Any]:
+    """Wrap a computed value with the metadata get_or_compute needs."""
+    return {
+        ENVELOPE_MARKER: ENVELOPE_VERSION,
+        "v": value,
+        "x": time.time() + expire,
+        "d": compute_time,
+    }
+
+
+def _needs_refresh(envelope: Dict[str, Any], beta: float) -> bool:
+    """
+    Decide whether to recompute an entry ahead of its logical expiry.
+
+    Probabilistic early expiration ("XFetch"): the closer the entry is to
+    expiring, and the longer it took to compute, the likelier a refresh.
+    Always True once the entry has expired.
+    """
+    jitter = envelope["d"] * beta * -math.log(1.0 - random.random())
+    return time.time() + jitter >= envelope["x"]
+
+
+def _is_envelope(value: Any) -> bool:
+    return isinstance(value, dict) and value.get(ENVELOPE_MARKER) == ENVELOPE_VERSION
+
+
+class _Flight:
+    """An in-process computation other threads can wait on."""
 
     def __init__(self):
+        self.done = threading.Event()
+        self.result: Any = None
+        self.error: Optional[BaseException] = None
+
+
+def _decode(value: Optional[bytes]) -> Optional[Any]:
+    """Decode a raw Redis value, None for missing entries."""
+    return decode(value) if value else None
+
+
+def _record_many(
+    results: List[Optional[Any]],
+    remote_positions: List[int],
+    local_hits: int,
+    seconds: Optional[float] = None,
+) -> None:
+    found = sum(1 for position in remote_positions if results[position] is not None)
+    record_cache_lookup("get_many", found, len(remote_positions) - found, seconds, local_hits)
+
+
+def _log_error(operation: str, error: Exception) -> None:
+    """Log a failed cache operation; calls rejected by the open breaker stay quiet."""
+    if isinstance(error, CircuitOpenError):
+        return
+    logger.warning(
+        "Cache %s error: %s",
+        operation,
+        error,
+        extra={"cache_operation": operation, "error_type": type(error).__name__},
+    )
+
+
+def _encode_or_skip(key: str, value: Any) -> Optional[bytes]:
+    """Encoded value, or None (logged) if it is not plain data and must not be cached."""
+    try:
+        return encode(value)
+    except UnserializableValue as e:
+        logger.warning(
+            "Not caching %s: %s",
+            key,
+            e,
+            extra={"cache_operation": "set", "error_type": type(e).__name__},
+        )
+        return None
+
+
+def _encode_mapping(mapping: Dict[str, Any]) -> Dict[str, bytes]:
+    """Encode a set_many mapping, leaving out values that are not plain data."""
+    encoded = {}
+    for key, value in mapping.items():
+        serialized = _encode_or_skip(key, value)
+        if serialized is not None:
+            encoded[key] = serialized
+    return encoded
+
+
+class CachePipeline:
+    """
+    Queue cache commands and send them to Redis in one round trip.
+
+    Usage:
+        with cache.pipeline() as pipe:
+            pipe.get("job:1")
+            pipe.set("job:2", data, expire=300)
+        first, stored = pipe.results
+
+    Commands still queued when the block exits are executed automatically;
+    execute() may also be called inside the block. Reads bypass the L1 tier.
+    """
+
+    def __init__(self, cache: "Cache"):
+        self._cache = cache
+        self._pipe = cache.redis_client.pipeline(transaction=False)
+        self._decoders: List[Callable[[Any], Any]] = []
+        self._written: List[str] = []
+        self.results: List[Any] = []
+
+    def get(self, key: str) -> "CachePipeline":
+        """Queue a get; its result is the decoded value or None."""
+        self._pipe.get(key)
+        self._decoders.append(_decode)
+        return self
+
+    def set(self, key: str, value: Any, expire: Optional[int] = None) -> "CachePipeline":
+        """
+        Queue a set; its result is True if stored.
+
+        Raises:
+            UnserializableValue: If the value is not plain data
+        """
+        serialized = encode(value)
+        if expire:
+            self._pipe.setex(key, expire, serialized)
+        else:
+            self._pipe.set(key, serialized)
+        self._decoders.append(bool)
+        self._written.append(key)
+        return self
+
+    def delete(self, key: str) -> "CachePipeline":
+        """Queue a delete; its result is True if the key existed."""
+        self._pipe.delete(key)
+        self._decoders.append(bool)
+        self._written.append(key)
+        return self
+
+    def exists(self, key: str) -> "CachePipeline":
+        """Queue an existence check; its result is True if the key exists."""
+        self._pipe.exists(key)
+        self._decoders.append(bool)
+        return self
+
+    def execute(self) -> List[Any]:
+        """
+        Send all queued commands in one round trip.
+
+        Returns:
+            Decoded results in the order the commands were queued
+        """
+        if not self._decoders:
+            return []
+        decoders, written = self._decoders, self._written
+        self._decoders, self._written = [], []
+        try:
+            with self._cache.breaker.guard():
+                raw = self._pipe.execute(raise_on_error=False)
+        except Exception as e:
+            _log_error("pipeline", e)
+            raw = [e] * len(decoders)
+        for key in written:
+            self._cache.fallback.delete(key)
+        self._cache._invalidate_local(keys=written)
+        results = [
+            None if isinstance(value, Exception) else decode(value)
+            for decode, value in zip(decoders, raw)
+        ]
+        self.results.extend(results)
+        return results
+
+    def __enter__(self) -> "CachePipeline":
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        if exc_type is None:
+            self.execute()
+        self._pipe.reset()
+
+
+class AsyncCachePipeline(CachePipeline):
+    """
+    Async counterpart of CachePipeline.
+
+    Usage:
+        async with async_cache.pipeline() as pipe:
+            pipe.get("job:1")
+            pipe.set("job:2", data, expire=300)
+        first, stored = pipe.results
+    """
+
+    def __init__(self, cache: "AsyncCache"):
+        super().__init__(cache)
+
+    async def execute(self) -> List[Any]:
+        """
+        Send all queued commands in one round trip.
+
+        Returns:
+            Decoded results in the order the commands were queued
+        """
+        if not self._decoders:
+            return []
+        decoders, written = self._decoders, self._written
+        self._decoders, self._written = [], []
+        try:
+            with self._cache.breaker.guard():
+                raw = await self._pipe.execute(raise_on_error=False)
+        except Exception as e:
+            _log_error("pipeline", e)
+            raw = [e] * len(decoders)
+        for key in written:
+            self._cache.fallback.delete(key)
+        await self._cache._invalidate_local(keys=written)
+        results = [
+            None if isinstance(value, Exception) else decode(value)
+            for decode, value in zip(decoders, raw)
+        ]
+        self.results.extend(results)
+        return results
+
+    async def __aenter__(self) -> "AsyncCachePipeline":
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb) -> None:
+        if exc_type is None:
+            await self.execute()
+        await self._pipe.reset()
+
+
+class Cache:
+    """
+    Redis cache wrapper.
+
+    Keys in L1-enabled namespaces are also served from the in-process
+    `local` tier; writes and deletes evict them on every replica through
+    the invalidation channel.
+
+    Every Redis call goes through `breaker`. After repeated connection
+    errors or timeouts the breaker opens and calls fail fast; meanwhile
+    reads and writes use the short-lived in-process `fallback` cache, so
+    callers see misses (and recompute) instead of waiting on timeouts.
+    """
+
+    def __init__(
+        self,
+        local: Optional[LocalCache] = None,
+        breaker: Optional[CircuitBreaker] = None,
+        fallback: Optional[TTLCache] = None,
+    ):
         self.redis_client = redis.from_url(
             settings.REDIS_URL,
             max_connections=settings.REDIS_MAX_CONNECTIONS,
-            decode_responses=True,
+            socket_connect_timeout=settings.REDIS_CONNECT_TIMEOUT,
+            socket_timeout=settings.REDIS_SOCKET_TIMEOUT,
+            decode_responses=False,  # Values are codec-encoded bytes
         )
+        self.local = local
+        self.breaker = breaker or _redis_breaker()
+        self.fallback = fallback or _fallback_cache()
+        self._listener_thread: Optional[threading.Thread] = None
+        self._flights: Dict[str, _Flight] = {}
+        self._flights_lock = threading.Lock()
+        self._release_lock = self.redis_client.register_script(LOCK_RELEASE_SCRIPT)
+        self._register_tags = self.redis_client.register_script(TAG_REGISTER_SCRIPT)
+        self._invalidate_tags = self.redis_client.register_script(TAG_INVALIDATE_SCRIPT)
 
     def get(self, key: str) -> Optional[Any]:
         """
@@ -27,40 +384,69 @@ class Cache:
         Returns:
             Cached value or None if not found
         """
+        if self.local is not None:
+            value = self.local.get(key)
+            if value is not MISSING:
+                record_cache_lookup("get", 0, 0, local_hits=1)
+                return value
+        started = time.perf_counter()
         try:
-            value = self.redis_client.get(key)
-            if value:
-                return json.loads(value)
-            return None
+            with self.breaker.guard():
+                value = self.redis_client.get(key)
+                if value:
+                    value = decode(value)
+                    if self.local is not None:
+                        self.local.set(key, value)
+                    record_cache_lookup("get", 1, 0, time.perf_counter() - started)
+                    return value
+                record_cache_lookup("get", 0, 1, time.perf_counter() - started)
+                return None
         except Exception as e:
-            print(f"Cache get error: {e}")
-            return None
+            _log_error("get", e)
+            value = self.fallback.get(key)
+            found = value is not MISSING
+            record_cache_lookup("get", int(found), int(not found))
+            return value if found else None
 
     def set(
         self,
         key: str,
         value: Any,
-        expire: Optional[int] = None
+        expire: Optional[int] = None,
+        tags: Optional[Iterable[str]] = None,
     ) -> bool:
         """
         Set value in cache.
 
         Args:
             key: Cache key
-            value: Value to cache (will be JSON serialized)
+            value: Value to cache (will be serialized with CACHE_CODEC)
             expire: Expiration time in seconds (optional)
+            tags: Tags to register the key under, e.g. ["user:<id>"] (optional)
 
         Returns:
             True if successful, False otherwise
         """
+        serialized = _encode_or_skip(key, value)
+        if serialized is None:
+            return False
         try:
-            serialized = json.dumps(value)
-            if expire:
-                return bool(self.redis_client.setex(key, expire, serialized))
-            return bool(self.redis_client.set(key, serialized))
+            with self.breaker.guard():
+                if expire:
+                    stored = bool(self.redis_client.setex(key, expire, serialized))
+                else:
+                    stored = bool(self.redis_client.set(key, serialized))
+                if tags:
+                    self._register_tags(
+                        keys=[tag_key(tag) for tag in tags],
+                        args=[key, expire or 0],
+                    )
         except Exception as e:
-            print(f"Cache set error: {e}")
+            _log_error("set", e)
+            self.fallback.set(key, value, expire)
             return False
+        self._invalidate_local(keys=[key])
+        return stored
 
     def delete(self, key: str) -> bool:
         """
@@ -72,10 +458,13 @@ class Cache:
         Returns:
             True if deleted, False otherwise
         """
+        self._invalidate_local(keys=[key])
+        self.fallback.delete(key)
         try:
-            return bool(self.redis_client.delete(key))
+            with self.breaker.guard():
+                return bool(self.redis_client.delete(key))
         except Exception as e:
-            print(f"Cache delete error: {e}")
+            _log_error("delete", e)
             return False
 
     def exists(self, key: str) -> bool:
@@ -89,30 +478,339 @@ class Cache:
             True if exists, False otherwise
         """
         try:
-            return bool(self.redis_client.exists(key))
+            with self.breaker.guard():
+                return bool(self.redis_client.exists(key))
         except Exception as e:
-            print(f"Cache exists error: {e}")
-            return False
+            _log_error("exists", e)
+            return self.fallback.get(key) is not MISSING
 
     def clear_pattern(self, pattern: str) -> int:
         """
         Delete all keys matching pattern.
 
+        Walks the keyspace incrementally with SCAN and removes matches with
+        UNLINK in batches, so Redis is never blocked the way KEYS blocks it.
+        Prefer invalidate_tags() when the affected keys are known up front.
+
         Args:
             pattern: Pattern to match (e.g., "user:*")
 
         Returns:
             Number of keys deleted
         """
+        self._invalidate_local(patterns=[pattern])
+        self.fallback.delete_pattern(pattern)
+        deleted = 0
         try:
-            keys = self.redis_client.keys(pattern)
-            if keys:
-                return self.redis_client.delete(*keys)
+            with self.breaker.guard():
+                batch = []
+                for key in self.redis_client.scan_iter(
+                    match=pattern, count=settings.CACHE_SCAN_BATCH_SIZE
+                ):
+                    batch.append(key)
+                    if len(batch) >= settings.CACHE_SCAN_BATCH_SIZE:
+                        deleted += self.redis_client.unlink(*batch)
+                        batch = []
+                if batch:
+                    deleted += self.redis_client.unlink(*batch)
+                return deleted
+        except Exception as e:
+            _log_error("clear pattern", e)
+            return deleted
+
+    def invalidate_tags(self, *tags: str) -> int:
+        """
+        Delete every key registered under any of the given tags.
+
+        Runs as a single atomic script that touches only the tagged keys.
+
+        Args:
+            tags: Tags to invalidate (e.g., "user:<id>", "job:<id>")
+
+        Returns:
+            Number of keys deleted
+        """
+        if not tags:
+            return 0
+        try:
+            with self.breaker.guard():
+                removed = [key.decode() for key in self._invalidate_tags(
+                    keys=[tag_key(tag) for tag in tags]
+                )]
+        except Exception as e:
+            _log_error("invalidate tags", e)
+            # Tag membership is only known to Redis; drop everything held locally
+            self.fallback.clear()
+            if self.local is not None:
+                self.local.clear()
+            return 0
+        for key in removed:
+            self.fallback.delete(key)
+        self._invalidate_local(keys=removed)
+        return len(removed)
+
+    def get_many(self, keys: List[str]) -> List[Optional[Any]]:
+        """
+        Get several values in a single MGET round trip.
+
+        The result is dense: one entry per requested key, in the same order,
+        with None for misses, so callers can batch-load the gaps, e.g.
+        `missing = [k for k, v in zip(keys, values) if v is None]`.
+
+        Args:
+            keys: Cache keys
+
+        Returns:
+            Values in the same order as keys, None for missing entries
+        """
+        if not keys:
+            return []
+        results: List[Optional[Any]] = [None] * len(keys)
+        remote_positions = []
+        for position, key in enumerate(keys):
+            value = self.local.get(key) if self.local is not None else MISSING
+            if value is MISSING:
+                remote_positions.append(position)
+            else:
+                results[position] = value
+        local_hits = len(keys) - len(remote_positions)
+        if not remote_positions:
+            record_cache_lookup("get_many", 0, 0, local_hits=local_hits)
+            return results
+        started = time.perf_counter()
+        try:
+            with self.breaker.guard():
+                values = self.redis_client.mget([keys[i] for i in remote_positions])
+                for position, value in zip(remote_positions, values):
+                    if value:
+                        results[position] = decode(value)
+                        if self.local is not None:
+                            self.local.set(keys[position], results[position])
+                _record_many(results, remote_positions, local_hits, time.perf_counter() - started)
+                return results
+        except Exception as e:
+            _log_error("get many", e)
+            for position in remote_positions:
+                value = self.fallback.get(keys[position])
+                if value is not MISSING:
+                    results[position] = value
+            _record_many(results, remote_positions, local_hits)
+            return results
+
+    def set_many(
+        self,
+        mapping: Dict[str, Any],
+        expire: Optional[Union[int, Dict[str, int]]] = None
+    ) -> bool:
+        """
+        Set several values in a single pipelined round trip.
+
+        Args:
+            mapping: Key to value mapping (values will be serialized with CACHE_CODEC)
+            expire: Expiration time in seconds, either for every key or as a
+                key to TTL mapping; keys without a TTL never expire (optional)
+
+        Returns:
+            True if all values were stored, False otherwise
+        """
+        if not mapping:
+            return True
+        encoded = _encode_mapping(mapping)
+        if not encoded:
+            return False
+        try:
+            with self.breaker.guard():
+                with self.redis_client.pipeline(transaction=False) as pipe:
+                    for key, serialized in encoded.items():
+                        ttl = _expire_for(key, expire)
+                        if ttl:
+                            pipe.setex(key, ttl, serialized)
+                        else:
+                            pipe.set(key, serialized)
+                    results = pipe.execute()
+        except Exception as e:
+            _log_error("set many", e)
+            for key in encoded:
+                self.fallback.set(key, mapping[key], _expire_for(key, expire))
+            return False
+        self._invalidate_local(keys=encoded.keys())
+        return all(results) and len(encoded) == len(mapping)
+
+    def delete_many(self, keys: Iterable[str]) -> int:
+        """
+        Delete several keys in a single round trip.
+
+        Args:
+            keys: Cache keys
+
+        Returns:
+            Number of keys deleted
+        """
+        keys = list(keys)
+        if not keys:
             return 0
+        self._invalidate_local(keys=keys)
+        for key in keys:
+            self.fallback.delete(key)
+        try:
+            with self.breaker.guard():
+                return self.redis_client.delete(*keys)
         except Exception as e:
-            print(f"Cache clear pattern error: {e}")
+            _log_error("delete many", e)
             return 0
 
+    def pipeline(self) -> CachePipeline:
+        """Start a pipeline that sends queued commands in one round trip."""
+        return CachePipeline(self)
+
+    def get_or_compute(
+        self,
+        key: str,
+        compute: Callable[[], Any],
+        expire: Expire,
+        tags: Optional[Iterable[str]] = None,
+        beta: Optional[float] = None,
+    ) -> Any:
+        """
+        Return the cached value for key, computing and storing it on a miss.
+
+        Protects the source of truth from stampedes at TTL boundaries:
+        - concurrent misses in this process share a single compute() call;
+        - across workers, only the holder of a short Redis lock recomputes
+          while the others wait briefly for its result;
+        - entries are refreshed probabilistically before they expire, and the
+          current (possibly stale) value is served to everyone else meanwhile.
+
+        Entries are stored wrapped with expiry metadata, so keys written here
+        should only be read through get_or_compute.
+
+        Args:
+            key: Cache key
+            compute: Zero-argument function producing the value
+            expire: Logical time to live in seconds, or a function of the value
+                returning it (None: return the value without caching it)
+            tags: Tags to register the key under (optional)
+            beta: Early refresh eagerness, >1 refreshes earlier (optional)
+
+        Returns:
+            Cached or freshly computed value
+        """
+        beta = settings.CACHE_EARLY_REFRESH_BETA if beta is None else beta
+        envelope = self.get(key)
+        if _is_envelope(envelope):
+            if not _needs_refresh(envelope, beta):
+                return envelope["v"]
+            # Refresh ahead of (or just after) expiry; serve the current value
+            # to everyone except the single caller that wins both locks.
+            flight = self._start_flight(key)
+            if flight is None:
+                return envelope["v"]
+            return self._run_flight(key, flight, compute, expire, tags, wait=False, stale=envelope)
+
+        flight = self._start_flight(key)
+        if flight is None:
+            return self._join_flight(key, compute)
+        return self._run_flight(key, flight, compute, expire, tags, wait=True)
+
+    def _start_flight(self, key: str) -> Optional[_Flight]:
+        """Become the in-process leader for key, or None if one exists."""
+        with self._flights_lock:
+            if key in self._flights:
+                return None
+            flight = self._flights[key] = _Flight()
+            return flight
+
+    def _join_flight(self, key: str, compute: Callable[[], Any]) -> Any:
+        """Wait for the in-process leader's result."""
+        with self._flights_lock:
+            flight = self._flights.get(key)
+        if flight is None or not flight.done.wait(settings.CACHE_LOCK_TIMEOUT):
+            return compute()
+        if flight.error is not None:
+            raise flight.error
+        return flight.result
+
+    def _run_flight(
+        self,
+        key: str,
+        flight: _Flight,
+        compute: Callable[[], Any],
+        expire: Expire,
+        tags: Optional[Iterable[str]],
+        wait: bool,
+        stale: Optional[Dict[str, Any]] = None,
+    ) -> Any:
+        """Compute under the Redis lock as the in-process leader."""
+        try:
+            token = self._acquire_lock(key)
+            if token is None:
+                if stale is not None:
+                    flight.result = stale["v"]
+                    return flight.result
+                envelope = self._wait_for_value(key) if wait else None
+                if envelope is not None:
+                    flight.result = envelope["v"]
+                    return flight.result
+            try:
+                started = time.monotonic()
+                value = compute()
+                ttl = _ttl_for(value, expire)
+                if ttl:
+                    self.set(
+                        key,
+                        _envelope(value, ttl, time.monotonic() - started),
+                        expire=ttl + settings.CACHE_STALE_TTL,
+                        tags=tags,
+                    )
+            finally:
+                if token is not None:
+                    self._release(key, token)
+            flight.result = value
+            return value
+        except BaseException as e:
+            flight.error = e
+            raise
+        finally:
+            with self._flights_lock:
+                self._flights.pop(key, None)
+            flight.done.set()
+
+    def _acquire_lock(self, key: str) -> Optional[str]:
+        """
+        Take the cross-worker recompute lock for key.
+
+        Returns:
+            Owner token, None if another worker holds the lock. If Redis is
+            unreachable a dummy token is returned so callers never block on it.
+        """
+        token = uuid.uuid4().hex
+        try:
+            with self.breaker.guard():
+                acquired = self.redis_client.set(
+                    f"{LOCK_KEY_PREFIX}{key}", token, nx=True, ex=settings.CACHE_LOCK_TIMEOUT
+                )
+                return token if acquired else None
+        except Exception as e:
+            _log_error("lock", e)
+            return token
+
+    def _release(self, key: str, token: str) -> None:
+        try:
+            with self.breaker.guard():
+                self._release_lock(keys=[f"{LOCK_KEY_PREFIX}{key}"], args=[token])
+        except Exception as e:
+            _log_error("unlock", e)
+
+    def _wait_for_value(self, key: str) -> Optional[Dict[str, Any]]:
+        """Poll briefly for the value another worker is computing."""
+        deadline = time.monotonic() + settings.CACHE_LOCK_WAIT
+        while time.monotonic() < deadline:
+            time.sleep(0.05)
+            envelope = self.get(key)
+            if _is_envelope(envelope):
+                return envelope
+        return None
+
     def ping(self) -> bool:
         """
         Check if Redis is available.
@@ -121,15 +819,665 @@ class Cache:
             True if connected, False otherwise
         """
         try:
-            return self.redis_client.ping()
+            with self.breaker.guard():
+                return self.redis_client.ping()
+        except Exception:
+            return False
+
+    def _invalidate_local(
+        self,
+        keys: Iterable[str] = (),
+        patterns: Iterable[str] = (),
+    ) -> None:
+        """Evict keys/patterns from L1 here and announce it to other replicas."""
+        if self.local is None:
+            return
+        keys = [key for key in keys if self.local.handles(key)]
+        patterns = list(patterns)
+        if not keys and not patterns:
+            return
+        for key in keys:
+            self.local.delete(key)
+        for pattern in patterns:
+            self.local.delete_pattern(pattern)
+        try:
+            with self.breaker.guard():
+                self.redis_client.publish(
+                    settings.CACHE_INVALIDATION_CHANNEL,
+                    LocalCache.invalidation_message(keys, patterns),
+                )
+        except Exception as e:
+            _log_error("invalidation publish", e)
+
+    def start_invalidation_listener(self) -> None:
+        """
+        Subscribe to L1 invalidations from other replicas in a daemon thread.
+
+        Needed in processes that only use the sync client (e.g. Celery
+        workers); the L1 tier stays disabled until a listener is subscribed.
+        """
+        if self.local is None or self._listener_thread is not None:
+            return
+        self._listener_thread = threading.Thread(
+            target=self._listen_for_invalidations,
+            name="cache-invalidation-listener",
+            daemon=True,
+        )
+        self._listener_thread.start()
+
+    def _listen_for_invalidations(self) -> None:
+        """Apply invalidation messages forever, resubscribing after errors."""
+        while True:
+            pubsub = self.redis_client.pubsub(ignore_subscribe_messages=True)
+            subscribed = False
+            try:
+                pubsub.subscribe(settings.CACHE_INVALIDATION_CHANNEL)
+                self.local.listener_started()
+                subscribed = True
+                while True:
+                    # Poll with a timeout rather than blocking in listen(), which
+                    # would trip REDIS_SOCKET_TIMEOUT on an idle channel.
+                    message = pubsub.get_message(ignore_subscribe_messages=True, timeout=1.0)
+                    if message is not None and message["type"] == "message":
+                        self.local.apply_invalidation(message["data"])
+            except Exception as e:
+                _log_error("invalidation listener", e)
+            finally:
+                if subscribed:
+                    self.local.listener_stopped()
+                pubsub.close()
+            time.sleep(1)
+
+
+class AsyncCache:
+    """
+    Asyncio Redis cache wrapper.
+
+    Mirrors the Cache API on top of redis.asyncio so async routes never block
+    the event loop on a Redis round trip. Shares the L1 tier, breaker and
+    fallback with Cache.
+    """
+
+    def __init__(
+        self,
+        local: Optional[LocalCache] = None,
+        breaker: Optional[CircuitBreaker] = None,
+        fallback: Optional[TTLCache] = None,
+    ):
+        self.redis_client = aioredis.from_url(
+            settings.REDIS_URL,
+            max_connections=settings.REDIS_MAX_CONNECTIONS,
+            socket_connect_timeout=settings.REDIS_CONNECT_TIMEOUT,
+            socket_timeout=settings.REDIS_SOCKET_TIMEOUT,
+            decode_responses=False,  # Values are codec-encoded bytes
+        )
+        self.local = local
+        self.breaker = breaker or _redis_breaker()
+        self.fallback = fallback or _fallback_cache()
+        self._listener_task: Optional[asyncio.Task] = None
+        self._flights: Dict[str, asyncio.Future] = {}
+        self._flight_tasks: set = set()
+        self._release_lock = self.redis_client.register_script(LOCK_RELEASE_SCRIPT)
+        self._register_tags = self.redis_client.register_script(TAG_REGISTER_SCRIPT)
+        self._invalidate_tags = self.redis_client.register_script(TAG_INVALIDATE_SCRIPT)
+
+    async def get(self, key: str) -> Optional[Any]:
+        """
+        Get value from cache.
+
+        Args:
+            key: Cache key
+
+        Returns:
+            Cached value or None if not found
+        """
+        if self.local is not None:
+            value = self.local.get(key)
+            if value is not MISSING:
+                record_cache_lookup("get", 0, 0, local_hits=1)
+                return value
+        started = time.perf_counter()
+        try:
+            with self.breaker.guard():
+                value = await self.redis_client.get(key)
+                if value:
+                    value = decode(value)
+                    if self.local is not None:
+                        self.local.set(key, value)
+                    record_cache_lookup("get", 1, 0, time.perf_counter() - started)
+                    return value
+                record_cache_lookup("get", 0, 1, time.perf_counter() - started)
+                return None
+        except Exception as e:
+            _log_error("get", e)
+            value = self.fallback.get(key)
+            found = value is not MISSING
+            record_cache_lookup("get", int(found), int(not found))
+            return value if found else None
+
+    async def set(
+        self,
+        key: str,
+        value: Any,
+        expire: Optional[int] = None,
+        tags: Optional[Iterable[str]] = None,
+    ) -> bool:
+        """
+        Set value in cache.
+
+        Args:
+            key: Cache key
+            value: Value to cache (will be serialized with CACHE_CODEC)
+            expire: Expiration time in seconds (optional)
+            tags: Tags to register the key under, e.g. ["user:<id>"] (optional)
+
+        Returns:
+            True if successful, False otherwise
+        """
+        serialized = _encode_or_skip(key, value)
+        if serialized is None:
+            return False
+        try:
+            with self.breaker.guard():
+                if expire:
+                    stored = bool(await self.redis_client.setex(key, expire, serialized))
+                else:
+                    stored = bool(await self.redis_client.set(key, serialized))
+                if tags:
+                    await self._register_tags(
+                        keys=[tag_key(tag) for tag in tags],
+                        args=[key, expire or 0],
+                    )
+        except Exception as e:
+            _log_error("set", e)
+            self.fallback.set(key, value, expire)
+            return False
+        await self._invalidate_local(keys=[key])
+        return stored
+
+    async def delete(self, key: str) -> bool:
+        """
+        Delete key from cache.
+
+        Args:
+            key: Cache key
+
+        Returns:
+            True if deleted, False otherwise
+        """
+        await self._invalidate_local(keys=[key])
+        self.fallback.delete(key)
+        try:
+            with self.breaker.guard():
+                return bool(await self.redis_client.delete(key))
+        except Exception as e:
+            _log_error("delete", e)
+            return False
+
+    async def exists(self, key: str) -> bool:
+        """
+        Check if key exists in cache.
+
+        Args:
+            key: Cache key
+
+        Returns:
+            True if exists, False otherwise
+        """
+        try:
+            with self.breaker.guard():
+                return bool(await self.redis_client.exists(key))
+        except Exception as e:
+            _log_error("exists", e)
+            return self.fallback.get(key) is not MISSING
+
+    async def clear_pattern(self, pattern: str) -> int:
+        """
+        Delete all keys matching pattern.
+
+        Walks the keyspace incrementally with SCAN and removes matches with
+        UNLINK in batches, so Redis is never blocked the way KEYS blocks it.
+        Prefer invalidate_tags() when the affected keys are known up front.
+
+        Args:
+            pattern: Pattern to match (e.g., "user:*")
+
+        Returns:
+            Number of keys deleted
+        """
+        await self._invalidate_local(patterns=[pattern])
+        self.fallback.delete_pattern(pattern)
+        deleted = 0
+        try:
+            with self.breaker.guard():
+                batch = []
+                async for key in self.redis_client.scan_iter(
+                    match=pattern, count=settings.CACHE_SCAN_BATCH_SIZE
+                ):
+                    batch.append(key)
+                    if len(batch) >= settings.CACHE_SCAN_BATCH_SIZE:
+                        deleted += await self.redis_client.unlink(*batch)
+                        batch = []
+                if batch:
+                    deleted += await self.redis_client.unlink(*batch)
+                return deleted
+        except Exception as e:
+            _log_error("clear pattern", e)
+            return deleted
+
+    async def invalidate_tags(self, *tags: str) -> int:
+        """
+        Delete every key registered under any of the given tags.
+
+        Runs as a single atomic script that touches only the tagged keys.
+
+        Args:
+            tags: Tags to invalidate (e.g., "user:<id>", "job:<id>")
+
+        Returns:
+            Number of keys deleted
+        """
+        if not tags:
+            return 0
+        try:
+            with self.breaker.guard():
+                removed = [key.decode() for key in await self._invalidate_tags(
+                    keys=[tag_key(tag) for tag in tags]
+                )]
+        except Exception as e:
+            _log_error("invalidate tags", e)
+            # Tag membership is only known to Redis; drop everything held locally
+            self.fallback.clear()
+            if self.local is not None:
+                self.local.clear()
+            return 0
+        for key in removed:
+            self.fallback.delete(key)
+        await self._invalidate_local(keys=removed)
+        return len(removed)
+
+    async def get_many(self, keys: List[str]) -> List[Optional[Any]]:
+        """
+        Get several values in a single MGET round trip.
+
+        The result is dense: one entry per requested key, in the same order,
+        with None for misses.
+
+        Args:
+            keys: Cache keys
+
+        Returns:
+            Values in the same order as keys, None for missing entries
+        """
+        if not keys:
+            return []
+        results: List[Optional[Any]] = [None] * len(keys)
+        remote_positions = []
+        for position, key in enumerate(keys):
+            value = self.local.get(key) if self.local is not None else MISSING
+            if value is MISSING:
+                remote_positions.append(position)
+            else:
+                results[position] = value
+        local_hits = len(keys) - len(remote_positions)
+        if not remote_positions:
+            record_cache_lookup("get_many", 0, 0, local_hits=local_hits)
+            return results
+        started = time.perf_counter()
+        try:
+            with self.breaker.guard():
+                values = await self.redis_client.mget([keys[i] for i in remote_positions])
+                for position, value in zip(remote_positions, values):
+                    if value:
+                        results[position] = decode(value)
+                        if self.local is not None:
+                            self.local.set(keys[position], results[position])
+                _record_many(results, remote_positions, local_hits, time.perf_counter() - started)
+                return results
+        except Exception as e:
+            _log_error("get many", e)
+            for position in remote_positions:
+                value = self.fallback.get(keys[position])
+                if value is not MISSING:
+                    results[position] = value
+            _record_many(results, remote_positions, local_hits)
+            return results
+
+    async def set_many(
+        self,
+        mapping: Dict[str, Any],
+        expire: Optional[Union[int, Dict[str, int]]] = None
+    ) -> bool:
+        """
+        Set several values in a single pipelined round trip.
+
+        Args:
+            mapping: Key to value mapping (values will be serialized with CACHE_CODEC)
+            expire: Expiration time in seconds, either for every key or as a
+                key to TTL mapping; keys without a TTL never expire (optional)
+
+        Returns:
+            True if all values were stored, False otherwise
+        """
+        if not mapping:
+            return True
+        encoded = _encode_mapping(mapping)
+        if not encoded:
+            return False
+        try:
+            with self.breaker.guard():
+                async with self.redis_client.pipeline(transaction=False) as pipe:
+                    for key, serialized in encoded.items():
+                        ttl = _expire_for(key, expire)
+                        if ttl:
+                            pipe.setex(key, ttl, serialized)
+                        else:
+                            pipe.set(key, serialized)
+                    results = await pipe.execute()
+        except Exception as e:
+            _log_error("set many", e)
+            for key in encoded:
+                self.fallback.set(key, mapping[key], _expire_for(key, expire))
+            return False
+        await self._invalidate_local(keys=encoded.keys())
+        return all(results) and len(encoded) == len(mapping)
+
+    async def delete_many(self, keys: Iterable[str]) -> int:
+        """
+        Delete several keys in a single round trip.
+
+        Args:
+            keys: Cache keys
+
+        Returns:
+            Number of keys deleted
+        """
+        keys = list(keys)
+        if not keys:
+            return 0
+        await self._invalidate_local(keys=keys)
+        for key in keys:
+            self.fallback.delete(key)
+        try:
+            with self.breaker.guard():
+                return await self.redis_client.delete(*keys)
+        except Exception as e:
+            _log_error("delete many", e)
+            return 0
+
+    def pipeline(self) -> AsyncCachePipeline:
+        """Start a pipeline that sends queued commands in one round trip."""
+        return AsyncCachePipeline(self)
+
+    async def get_or_compute(
+        self,
+        key: str,
+        compute: Callable[[], Union[Any, Awaitable[Any]]],
+        expire: Expire,
+        tags: Optional[Iterable[str]] = None,
+        beta: Optional[float] = None,
+    ) -> Any:
+        """
+        Return the cached value for key, computing and storing it on a miss.
+
+        Same protections as Cache.get_or_compute. The computation runs in a
+        task of its own, so a caller that is cancelled while waiting does not
+        fail the others waiting on it. When an entry is due for an early
+        refresh that task runs in the background and every caller, including
+        the one that triggered it, gets the current value.
+
+        Args:
+            key: Cache key
+            compute: Zero-argument coroutine function producing the value, or a
+                plain function, which is run in a worker thread
+            expire: Logical time to live in seconds, or a function of the value
+                returning it (None: return the value without caching it)
+            tags: Tags to register the key under (optional)
+            beta: Early refresh eagerness, >1 refreshes earlier (optional)
+
+        Returns:
+            Cached or freshly computed value
+        """
+        beta = settings.CACHE_EARLY_REFRESH_BETA if beta is None else beta
+        envelope = await self.get(key)
+        if _is_envelope(envelope):
+            if _needs_refresh(envelope, beta) and key not in self._flights:
+                self._start_flight(key, compute, expire, tags, stale=envelope)
+            return envelope["v"]
+
+        future = self._flights.get(key)
+        if future is None:
+            future = self._start_flight(key, compute, expire, tags)
+        # Shielded: a cancelled caller leaves the computation running for the others
+        return await asyncio.shield(future)
+
+    def _start_flight(
+        self,
+        key: str,
+        compute: Callable[[], Union[Any, Awaitable[Any]]],
+        expire: Expire,
+        tags: Optional[Iterable[str]],
+        stale: Optional[Dict[str, Any]] = None,
+    ) -> asyncio.Future:
+        """Run the in-process leader computation for key as a task of its own."""
+        future = asyncio.get_running_loop().create_future()
+        self._flights[key] = future
+        task = asyncio.create_task(self._run_flight(key, future, compute, expire, tags, stale))
+        self._flight_tasks.add(task)
+        task.add_done_callback(self._flight_tasks.discard)
+        return future
+
+    async def _run_flight(
+        self,
+        key: str,
+        future: asyncio.Future,
+        compute: Callable[[], Union[Any, Awaitable[Any]]],
+        expire: Expire,
+        tags: Optional[Iterable[str]],
+        stale: Optional[Dict[str, Any]] = None,
+    ) -> None:
+        """Compute under the Redis lock as the in-process leader; the outcome goes to future."""
+        try:
+            token = await self._acquire_lock(key)
+            value = MISSING
+            if token is None:
+                if stale is not None:
+                    value = stale["v"]
+                else:
+                    envelope = await self._wait_for_value(key)
+                    if envelope is not None:
+                        value = envelope["v"]
+            if value is MISSING:
+                try:
+                    started = time.monotonic()
+                    if inspect.iscoroutinefunction(compute):
+                        value = await compute()
+                    else:
+                        # Blocking work must not stall the event loop
+                        value = await asyncio.to_thread(compute)
+                        if inspect.isawaitable(value):
+                            value = await value
+                    ttl = _ttl_for(value, expire)
+                    if ttl:
+                        await self.set(
+                            key,
+                            _envelope(value, ttl, time.monotonic() - started),
+                            expire=ttl + settings.CACHE_STALE_TTL,
+                            tags=tags,
+                        )
+                finally:
+                    if token is not None:
+                        await self._release(key, token)
+            future.set_result(value)
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except Exception as e:
+            future.set_exception(e)
+            if stale is not None:
+                # Nobody awaits a background refresh
+                _log_error("background refresh", e)
+                future.exception()
+        finally:
+            self._flights.pop(key, None)
+
+    async def _acquire_lock(self, key: str) -> Optional[str]:
+        """Take the cross-worker recompute lock; see Cache._acquire_lock."""
+        token = uuid.uuid4().hex
+        try:
+            with self.breaker.guard():
+                acquired = await self.redis_client.set(
+                    f"{LOCK_KEY_PREFIX}{key}", token, nx=True, ex=settings.CACHE_LOCK_TIMEOUT
+                )
+                return token if acquired else None
+        except Exception as e:
+            _log_error("lock", e)
+            return token
+
+    async def _release(self, key: str, token: str) -> None:
+        try:
+            with self.breaker.guard():
+                await self._release_lock(keys=[f"{LOCK_KEY_PREFIX}{key}"], args=[token])
+        except Exception as e:
+            _log_error("unlock", e)
+
+    async def _wait_for_value(self, key: str) -> Optional[Dict[str, Any]]:
+        """Poll briefly for the value another worker is computing."""
+        deadline = time.monotonic() + settings.CACHE_LOCK_WAIT
+        while time.monotonic() < deadline:
+            await asyncio.sleep(0.05)
+            envelope = await self.get(key)
+            if _is_envelope(envelope):
+                return envelope
+        return None
+
+    async def ping(self) -> bool:
+        """
+        Check if Redis is available.
+
+        Returns:
+            True if connected, False otherwise
+        """
+        try:
+            with self.breaker.guard():
+                return await self.redis_client.ping()
         except Exception:
             return False
 
+    async def _invalidate_local(
+        self,
+        keys: Iterable[str] = (),
+        patterns: Iterable[str] = (),
+    ) -> None:
+        """Evict keys/patterns from L1 here and announce it to other replicas."""
+        if self.local is None:
+            return
+        keys = [key for key in keys if self.local.handles(key)]
+        patterns = list(patterns)
+        if not keys and not patterns:
+            return
+        for key in keys:
+            self.local.delete(key)
+        for pattern in patterns:
+            self.local.delete_pattern(pattern)
+        try:
+            with self.breaker.guard():
+                await self.redis_client.publish(
+                    settings.CACHE_INVALIDATION_CHANNEL,
+                    LocalCache.invalidation_message(keys, patterns),
+                )
+        except Exception as e:
+            _log_error("invalidation publish", e)
+
+    def start_invalidation_listener(self) -> None:
+        """
+        Subscribe to L1 invalidations from other replicas in a background task.
+
+        Must be called from a running event loop (see app.main lifespan).
+        """
+        if self.local is None or self._listener_task is not None:
+            return
+        self._listener_task = asyncio.create_task(self._listen_for_invalidations())
+
+    async def _listen_for_invalidations(self) -> None:
+        """Apply invalidation messages forever, resubscribing after errors."""
+        while True:
+            pubsub = self.redis_client.pubsub(ignore_subscribe_messages=True)
+            subscribed = False
+            try:
+                await pubsub.subscribe(settings.CACHE_INVALIDATION_CHANNEL)
+                self.local.listener_started()
+                subscribed = True
+                while True:
+                    # Poll with a timeout; see Cache._listen_for_invalidations
+                    message = await pubsub.get_message(
+                        ignore_subscribe_messages=True, timeout=1.0
+                    )
+                    if message is not None and message["type"] == "message":
+                        self.local.apply_invalidation(message["data"])
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                _log_error("invalidation listener", e)
+            finally:
+                if subscribed:
+                    self.local.listener_stopped()
+                await pubsub.aclose()
+            await asyncio.sleep(1)
+
+    async def close(self) -> None:
+        """Stop background tasks and close the connection pool."""
+        for task in list(self._flight_tasks):
+            task.cancel()
+        if self._listener_task is not None:
+            self._listener_task.cancel()
+            try:
+                await self._listener_task
+            except asyncio.CancelledError:
+                pass
+            self._listener_task = None
+        await self.redis_client.aclose()
+
+
+def _redis_breaker() -> CircuitBreaker:
+    return CircuitBreaker(
+        "redis",
+        failure_threshold=settings.CACHE_BREAKER_FAILURE_THRESHOLD,
+        recovery_timeout=settings.CACHE_BREAKER_RECOVERY_TIMEOUT,
+        failure_exceptions=REDIS_FAILURE_EXCEPTIONS,
+        timing_phase="cache",
+    )
+
+
+def _fallback_cache() -> TTLCache:
+    return TTLCache(
+        max_entries=settings.CACHE_FALLBACK_MAX_ENTRIES,
+        ttl=settings.CACHE_FALLBACK_TTL,
+    )
+
+
+# Process-wide L1 tier shared by the sync and async clients
+local_cache = LocalCache(
+    namespace_limits=settings.cache_l1_namespaces,
+    ttl=settings.CACHE_L1_TTL,
+)
+
+# Both clients talk to the same Redis, so they share one breaker and one
+# fallback. Fallback entries are never invalidated across replicas, so they
+# are dropped as soon as Redis is back.
+redis_breaker = _redis_breaker()
+fallback_cache = _fallback_cache()
+redis_breaker.on_state_change(
+    lambda old, new: fallback_cache.clear() if new == CircuitBreaker.CLOSED else None
+)
 
-# Global cache instance
-cache = Cache()
+# Global cache instances.
+# `cache` is for sync code (Celery tasks, threadpool routes);
+# `async_cache` is for async routes running on the event loop.
+cache = Cache(local=local_cache, breaker=redis_breaker, fallback=fallback_cache)
+async_cache = AsyncCache(local=local_cache, breaker=redis_breaker, fallback=fallback_cache)
 
 
-def get_cache() -> Cache:
-    """Dependency function to get cache instance."""
-    return cache
+def get_cache() -> AsyncCache:
+    """Dependency function to get the async cache instance."""
+    return async_cache
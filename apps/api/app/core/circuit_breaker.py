@@ -0,0 +1,170 @@
+"""
+Circuit breaker for fail-fast access to degraded dependencies.
+"""
+import logging
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple, Type
+
+from app.core.timing import record_phase
+
+logger = logging.getLogger(__name__)
+
+
+class CircuitOpenError(Exception):
+    """Raised instead of calling a dependency while its breaker is open."""
+
+
+class CircuitBreaker:
+    """
+    Consecutive-failure circuit breaker.
+
+    closed:    calls go through; `failure_threshold` consecutive failures open it.
+    open:      calls fail immediately with CircuitOpenError for `recovery_timeout`
+               seconds, then the breaker goes half-open.
+    half_open: a single probe call goes through; success closes the breaker,
+               failure opens it again.
+    """
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(
+        self,
+        name: str,
+        failure_threshold: int,
+        recovery_timeout: float,
+        failure_exceptions: Tuple[Type[BaseException], ...] = (Exception,),
+        timing_phase: Optional[str] = None,
+    ):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.recovery_timeout = recovery_timeout
+        self.failure_exceptions = failure_exceptions
+        self.timing_phase = timing_phase  # Request timing phase calls count towards
+        self._state = self.CLOSED
+        self._failures = 0
+        self._opened_at = 0.0
+        self._probe_in_flight = False
+        self._lock = threading.Lock()
+        self._listeners: List[Callable[[str, str], None]] = []
+
+    @property
+    def state(self) -> str:
+        """Current state, reporting an expired open period as half-open."""
+        with self._lock:
+            if self._state == self.OPEN and self._recovery_due():
+                return self.HALF_OPEN
+            return self._state
+
+    def on_state_change(self, listener: Callable[[str, str], None]) -> None:
+        """Register a callback receiving (old_state, new_state)."""
+        self._listeners.append(listener)
+
+    def allow_request(self) -> bool:
+        """Check whether a call may go through right now."""
+        with self._lock:
+            if self._state == self.CLOSED:
+                return True
+            if self._state == self.OPEN:
+                if not self._recovery_due():
+                    return False
+                self._transition(self.HALF_OPEN)
+            if self._probe_in_flight:
+                return False
+            self._probe_in_flight = True
+            return True
+
+    def record_success(self) -> None:
+        """Record a successful call."""
+        with self._lock:
+            self._failures = 0
+            self._probe_in_flight = False
+            if self._state != self.CLOSED:
+                self._transition(self.CLOSED)
+
+    def record_failure(self, error: Optional[BaseException] = None) -> None:
+        """Record a failed call."""
+        with self._lock:
+            self._failures += 1
+            self._probe_in_flight = False
+            if self._state == self.HALF_OPEN or (
+                self._state == self.CLOSED and self._failures >= self.failure_threshold
+            ):
+                self._opened_at = time.monotonic()
+                self._transition(self.OPEN, error)
+
+    @contextmanager
+    def guard(self) -> Iterator[None]:
+        """
+        Run the enclosed call through the breaker.
+
+        Usage:
+            with breaker.guard():
+                value = redis_client.get(key)
+
+        Raises:
+            CircuitOpenError: If the breaker does not allow the call
+        """
+        if not self.allow_request():
+            raise CircuitOpenError(f"{self.name} circuit breaker is open")
+        started = time.perf_counter_ns()
+        try:
+            yield
+        except self.failure_exceptions as e:
+            self.record_failure(e)
+            raise
+        except BaseException:
+            # Not a dependency failure (e.g. a serialization error); just
+            # release the probe slot if this call was the probe.
+            with self._lock:
+                self._probe_in_flight = False
+            raise
+        else:
+            self.record_success()
+        finally:
+            if self.timing_phase is not None:
+                record_phase(self.timing_phase, time.perf_counter_ns() - started)
+
+    def snapshot(self) -> Dict[str, Any]:
+        """State summary for health checks."""
+        with self._lock:
+            state = self._state
+            if state == self.OPEN and self._recovery_due():
+                state = self.HALF_OPEN
+            return {
+                "state": state,
+                "consecutive_failures": self._failures,
+                "open_for_seconds": (
+                    round(time.monotonic() - self._opened_at, 1)
+                    if self._state != self.CLOSED else 0
+                ),
+            }
+
+    def _recovery_due(self) -> bool:
+        return time.monotonic() - self._opened_at >= self.recovery_timeout
+
+    def _transition(self, new_state: str, error: Optional[BaseException] = None) -> None:
+        """Change state and notify listeners. Must hold the lock."""
+        old_state, self._state = self._state, new_state
+        log = logger.info if new_state == self.CLOSED else logger.warning
+        log(
+            "Circuit breaker %s: %s -> %s",
+            self.name,
+            old_state,
+            new_state,
+            extra={
+                "breaker": self.name,
+                "breaker_state": new_state,
+                "breaker_previous_state": old_state,
+                "consecutive_failures": self._failures,
+                "error": str(error) if error else None,
+            },
+        )
+        for listener in self._listeners:
+            try:
+                listener(old_state, new_state)
+            except Exception:
+                logger.exception("Circuit breaker listener failed")
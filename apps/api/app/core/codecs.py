@@ -0,0 +1,156 @@
+"""
+Serialization codecs for cached values.
+
+Every encoded value starts with a one-byte header naming the codec, with
+COMPRESSED_FLAG set when the payload is zlib-compressed:
+
+    0x01 json    0x02 orjson    0x03 msgpack    (| 0x10 when compressed)
+
+Header bytes are control characters that can never start a JSON document,
+so entries written before codecs existed (bare JSON text) are still read.
+
+Only plain data round-trips (dicts, lists, strings, numbers, booleans and
+None; msgpack also keeps bytes). Anything else raises UnserializableValue
+rather than being stringified, since a value that comes back as a different
+type is worse than a cache miss.
+"""
+import json
+import zlib
+from typing import Any, Callable, Dict, NamedTuple, Optional
+
+import msgpack
+import orjson
+
+from app.config import settings
+
+COMPRESSED_FLAG = 0x10
+
+
+class UnserializableValue(TypeError):
+    """The value cannot be encoded without losing its type."""
+
+
+class Codec(NamedTuple):
+    """A named serializer registered under a header byte."""
+    header: int
+    dumps: Callable[[Any], bytes]
+    loads: Callable[[bytes], Any]
+
+
+def _json_dumps(value: Any) -> bytes:
+    return json.dumps(value, separators=(",", ":")).encode()
+
+
+# orjson would otherwise turn datetimes, dataclasses and str/int subclasses
+# into plain JSON; passing them through makes them raise, as json.dumps does.
+_ORJSON_OPTIONS = (
+    orjson.OPT_NON_STR_KEYS
+    | orjson.OPT_PASSTHROUGH_DATETIME
+    | orjson.OPT_PASSTHROUGH_DATACLASS
+    | orjson.OPT_PASSTHROUGH_SUBCLASS
+)
+
+
+def _orjson_dumps(value: Any) -> bytes:
+    return orjson.dumps(value, option=_ORJSON_OPTIONS)
+
+
+def _msgpack_dumps(value: Any) -> bytes:
+    return msgpack.packb(value, use_bin_type=True)
+
+
+def _msgpack_loads(data: bytes) -> Any:
+    return msgpack.unpackb(data, raw=False, strict_map_key=False)
+
+
+CODECS: Dict[str, Codec] = {
+    "json": Codec(0x01, _json_dumps, json.loads),
+    "orjson": Codec(0x02, _orjson_dumps, orjson.loads),
+    "msgpack": Codec(0x03, _msgpack_dumps, _msgpack_loads),
+}
+
+_CODECS_BY_HEADER: Dict[int, Codec] = {codec.header: codec for codec in CODECS.values()}
+
+# Writes bare JSON without a header, readable by code that predates codecs.
+# Only meant for the window of a rolling deploy.
+LEGACY_CODEC = "json-legacy"
+
+
+def register_codec(
+    name: str,
+    header: int,
+    dumps: Callable[[Any], bytes],
+    loads: Callable[[bytes], Any],
+) -> None:
+    """
+    Register an additional codec.
+
+    Args:
+        name: Name used in CACHE_CODEC
+        header: Header byte (0x01-0x0F, not already taken)
+        dumps: Value to bytes serializer
+        loads: Bytes to value deserializer
+    """
+    if not 0x01 <= header <= 0x0F or header in (0x09, 0x0A, 0x0D) or header in _CODECS_BY_HEADER:
+        raise ValueError(f"Invalid or duplicate codec header: {header:#04x}")
+    codec = Codec(header, dumps, loads)
+    CODECS[name] = codec
+    _CODECS_BY_HEADER[header] = codec
+
+
+def encode(value: Any, codec_name: Optional[str] = None) -> bytes:
+    """
+    Serialize a value for Redis.
+
+    Payloads larger than CACHE_COMPRESSION_MIN_BYTES are compressed when that
+    actually makes them smaller.
+
+    Args:
+        value: Value to serialize
+        codec_name: Codec to use (defaults to CACHE_CODEC)
+
+    Returns:
+        Header byte followed by the (possibly compressed) payload
+
+    Raises:
+        UnserializableValue: If the value is not plain data
+    """
+    codec_name = codec_name or settings.CACHE_CODEC
+    codec = None if codec_name == LEGACY_CODEC else CODECS[codec_name]
+    try:
+        if codec is None:
+            return json.dumps(value).encode()
+        payload = codec.dumps(value)
+    except (TypeError, ValueError, OverflowError) as e:
+        raise UnserializableValue(f"Cannot encode {type(value).__name__} for the cache: {e}") from e
+    header = codec.header
+
+    if settings.CACHE_COMPRESSION_MIN_BYTES and len(payload) >= settings.CACHE_COMPRESSION_MIN_BYTES:
+        compressed = zlib.compress(payload, settings.CACHE_COMPRESSION_LEVEL)
+        if len(compressed) < len(payload):
+            payload = compressed
+            header |= COMPRESSED_FLAG
+
+    return bytes((header,)) + payload
+
+
+def decode(data: bytes) -> Any:
+    """
+    Deserialize a value read from Redis.
+
+    Args:
+        data: Raw bytes as stored by encode() or by the pre-codec JSON cache
+
+    Returns:
+        Decoded value
+    """
+    header = data[0]
+    codec = _CODECS_BY_HEADER.get(header & ~COMPRESSED_FLAG)
+    if codec is None:
+        # Legacy entry: bare JSON text
+        return json.loads(data)
+
+    payload = data[1:]
+    if header & COMPRESSED_FLAG:
+        payload = zlib.decompress(payload)
+    return codec.loads(payload)
@@ -0,0 +1,210 @@
+"""
+Negotiated response compression (brotli or gzip).
+
+The encoding is picked from the request's Accept-Encoding by q-value,
+brotli winning ties. The response is compressed when:
+
+    - it is not already encoded (no Content-Encoding) and is not a range (206)
+    - its Content-Type is not compressed already (PDF, images, archives, ...)
+      or a live stream (text/event-stream)
+    - Cache-Control does not say no-transform
+    - the body is at least COMPRESSION_MIN_SIZE bytes; streamed bodies
+      (more_body) are always compressed, since their size is unknown
+
+Complete bodies are compressed in one call and get an exact Content-Length.
+Streamed bodies are compressed chunk by chunk and flushed after each chunk,
+so clients receive data as the app produces it.
+
+Every response that could be compressed carries Vary: Accept-Encoding,
+including those sent as is because the client accepts neither encoding (or
+the body is small), so shared caches keep the variants apart. A strong ETag
+of a compressed response is made weak: the bytes differ from the identity
+representation it was computed for.
+
+Usage:
+    app.add_middleware(CompressionMiddleware)
+"""
+import zlib
+from typing import Dict, Optional
+
+import brotli
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.config import settings
+
+# Content types that are compressed already (or must not be buffered)
+SKIP_CONTENT_TYPES = frozenset({
+    "application/pdf",
+    "application/zip",
+    "application/gzip",
+    "application/x-gzip",
+    "application/x-7z-compressed",
+    "application/x-bzip2",
+    "application/octet-stream",
+    "application/vnd.openxmlformats-officedocument.wordprocessingml.document",  # .docx is a zip
+    "text/event-stream",
+})
+SKIP_CONTENT_TYPE_PREFIXES = ("image/", "video/", "audio/", "font/woff")
+
+# Preference when q-values tie
+ENCODINGS = ("br", "gzip")
+
+
+def negotiate_encoding(accept_encoding: str) -> Optional[str]:
+    """
+    Pick the encoding for an Accept-Encoding header.
+
+    Returns:
+        "br", "gzip", or None for identity
+    """
+    weights: Dict[str, float] = {}
+    for part in accept_encoding.split(","):
+        name, _, params = part.strip().partition(";")
+        name = name.strip().lower()
+        if not name:
+            continue
+        q = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                q = float(params[2:])
+            except ValueError:
+                q = 0.0
+        weights[name] = q
+    wildcard = weights.get("*", 0.0)
+    best, best_q = None, 0.0
+    for encoding in ENCODINGS:
+        q = weights.get(encoding, wildcard)
+        if q > best_q:
+            best, best_q = encoding, q
+    return best
+
+
+def is_compressible(status: int, headers: Headers) -> bool:
+    """Whether a response may be compressed, judging by its status and headers."""
+    if status < 200 or status in (204, 206, 304):
+        return False
+    if "content-encoding" in headers:
+        return False
+    if "no-transform" in headers.get("cache-control", "").lower():
+        return False
+    content_type = headers.get("content-type", "").split(";")[0].strip().lower()
+    return content_type not in SKIP_CONTENT_TYPES and not content_type.startswith(
+        SKIP_CONTENT_TYPE_PREFIXES
+    )
+
+
+class _Compressor:
+    """One response's compression stream."""
+
+    def __init__(self, encoding: str):
+        self.encoding = encoding
+        if encoding == "br":
+            self._brotli = brotli.Compressor(
+                quality=settings.COMPRESSION_BROTLI_QUALITY, mode=brotli.MODE_TEXT
+            )
+        else:
+            # wbits=31: gzip container
+            self._zlib = zlib.compressobj(settings.COMPRESSION_GZIP_LEVEL, zlib.DEFLATED, 31)
+
+    def compress(self, data: bytes, final: bool) -> bytes:
+        """Compress a chunk; flushes so the output is decodable up to here."""
+        if self.encoding == "br":
+            out = self._brotli.process(data)
+            return out + (self._brotli.finish() if final else self._brotli.flush())
+        out = self._zlib.compress(data)
+        return out + self._zlib.flush(zlib.Z_FINISH if final else zlib.Z_SYNC_FLUSH)
+
+
+class CompressionMiddleware:
+    """
+    Pure ASGI middleware compressing responses with brotli or gzip.
+    """
+
+    def __init__(self, app: ASGIApp, minimum_size: Optional[int] = None):
+        self.app = app
+        self.minimum_size = (
+            settings.COMPRESSION_MIN_SIZE if minimum_size is None else minimum_size
+        )
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        encoding = negotiate_encoding(Headers(scope=scope).get("accept-encoding", ""))
+        responder = _CompressingSender(send, encoding, self.minimum_size)
+        await self.app(scope, receive, responder.send)
+
+
+class _CompressingSender:
+    """
+    Wraps `send` for one response. The start message is held back until the
+    first body chunk shows whether (and how) to compress. With no encoding
+    (identity) only the Vary header is added.
+    """
+
+    def __init__(self, send: Send, encoding: Optional[str], minimum_size: int):
+        self._send = send
+        self.encoding = encoding
+        self.minimum_size = minimum_size
+        self._start: Optional[Message] = None
+        self._compressor: Optional[_Compressor] = None
+        self._decided = False
+
+    async def send(self, message: Message) -> None:
+        if message["type"] == "http.response.start":
+            self._start = message
+            return
+        if message["type"] != "http.response.body":
+            # e.g. http.response.pathsend: pass the file through untouched
+            await self._flush_start()
+            await self._send(message)
+            return
+        if not self._decided:
+            await self._first_body(message)
+            return
+        if self._compressor is None:
+            await self._send(message)
+            return
+        more_body = message.get("more_body", False)
+        body = self._compressor.compress(message.get("body", b""), final=not more_body)
+        await self._send({"type": "http.response.body", "body": body, "more_body": more_body})
+
+    async def _flush_start(self) -> None:
+        if self._start is not None:
+            start, self._start = self._start, None
+            self._decided = True
+            await self._send(start)
+
+    async def _first_body(self, message: Message) -> None:
+        start = self._start
+        self._decided = True
+        self._start = None
+        headers = MutableHeaders(scope=start)
+        body = message.get("body", b"")
+        more_body = message.get("more_body", False)
+
+        if not is_compressible(start["status"], headers):
+            await self._send(start)
+            await self._send(message)
+            return
+        headers.add_vary_header("Accept-Encoding")
+        if self.encoding is None or (not more_body and len(body) < self.minimum_size):
+            await self._send(start)
+            await self._send(message)
+            return
+
+        self._compressor = _Compressor(self.encoding)
+        body = self._compressor.compress(body, final=not more_body)
+        headers["Content-Encoding"] = self.encoding
+        etag = headers.get("etag")
+        if etag and not etag.startswith("W/"):
+            headers["ETag"] = f"W/{etag}"
+        if more_body:
+            if "content-length" in headers:
+                del headers["Content-Length"]
+        else:
+            headers["Content-Length"] = str(len(body))
+        await self._send(start)
+        await self._send({"type": "http.response.body", "body": body, "more_body": more_body})
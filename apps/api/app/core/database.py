@@ -1,13 +1,25 @@
 """
 Database connection and session management.
 """
-from typing import Generator
+from typing import Any, AsyncGenerator, Generator, Optional
 from sqlalchemy import create_engine
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker, Session
 from app.config import settings
+from app.core.cache import cache, async_cache
+from app.core.metrics import watch_pool
+from app.core.query_stats import instrument_engine
+from app.core.db_routing import (
+    AsyncReplicaRouter,
+    ReplicaRouter,
+    RoutingSession,
+    REPLICA_INFO_KEY,
+    USER_INFO_KEY,
+    ryw_key,
+)
 
-# Create database engine
+# Create database engine (sync: Alembic, Celery tasks, threadpool routes)
 engine = create_engine(
     settings.DATABASE_URL,
     pool_size=settings.DB_POOL_SIZE,
@@ -23,6 +35,87 @@ SessionLocal = sessionmaker(
     bind=engine,
 )
 
+# Async engine for routes running on the event loop
+async_engine = create_async_engine(
+    settings.async_database_url,
+    pool_size=settings.DB_ASYNC_POOL_SIZE,
+    max_overflow=settings.DB_ASYNC_MAX_OVERFLOW,
+    pool_pre_ping=True,
+    echo=settings.DB_ECHO,
+)
+
+# Async session factory. Attributes stay loaded after commit, since lazy
+# refreshes would need an implicit await.
+AsyncSessionLocal = async_sessionmaker(
+    bind=async_engine,
+    class_=AsyncSession,
+    autoflush=False,
+    expire_on_commit=False,
+)
+
+# Read replicas, one sync and one async engine each
+replica_router = ReplicaRouter(
+    [
+        create_engine(
+            url,
+            pool_size=settings.DB_REPLICA_POOL_SIZE,
+            max_overflow=settings.DB_REPLICA_MAX_OVERFLOW,
+            pool_pre_ping=True,
+            echo=settings.DB_ECHO,
+        )
+        for url in settings.database_replica_urls
+    ],
+    max_lag=settings.DB_REPLICA_MAX_LAG,
+    check_interval=settings.DB_REPLICA_LAG_CHECK_INTERVAL,
+)
+async_replica_router = AsyncReplicaRouter(
+    [
+        create_async_engine(
+            settings.to_async_url(url),
+            pool_size=settings.DB_REPLICA_POOL_SIZE,
+            max_overflow=settings.DB_REPLICA_MAX_OVERFLOW,
+            pool_pre_ping=True,
+            echo=settings.DB_ECHO,
+        )
+        for url in settings.database_replica_urls
+    ],
+    max_lag=settings.DB_REPLICA_MAX_LAG,
+    check_interval=settings.DB_REPLICA_LAG_CHECK_INTERVAL,
+)
+
+# Session factories for read-mostly work; bound to the primary, reads are
+# routed to the replica chosen when the session is opened.
+ReadSessionLocal = sessionmaker(
+    class_=RoutingSession,
+    autocommit=False,
+    autoflush=False,
+    bind=engine,
+)
+AsyncReadSessionLocal = async_sessionmaker(
+    bind=async_engine,
+    class_=AsyncSession,
+    sync_session_class=RoutingSession,
+    autoflush=False,
+    expire_on_commit=False,
+)
+
+# Per-request query count/time, N+1 warnings and the slow-query log
+for _engine in (
+    engine,
+    async_engine.sync_engine,
+    *replica_router.engines,
+    *(replica.sync_engine for replica in async_replica_router.engines),
+):
+    instrument_engine(_engine)
+
+# Pool usage gauges for /metrics
+watch_pool("primary", engine.pool)
+watch_pool("primary_async", async_engine.pool)
+for _index, _replica in enumerate(replica_router.engines):
+    watch_pool(f"replica{_index}", _replica.pool)
+for _index, _replica in enumerate(async_replica_router.engines):
+    watch_pool(f"replica{_index}_async", _replica.pool)
+
 # Base class for all models
 Base = declarative_base()
 
@@ -44,6 +137,88 @@ def get_db() -> Generator[Session, None, None]:
         db.close()
 
 
+async def get_async_db() -> AsyncGenerator[AsyncSession, None]:
+    """
+    Dependency function to get an async database session.
+    Rolls back uncommitted work and closes the session after the request.
+
+    Relationships are not lazy-loaded on AsyncSession; load them eagerly
+    (selectinload/joinedload) in the query.
+
+    Usage in FastAPI:
+        @app.get("/items")
+        async def get_items(db: AsyncSession = Depends(get_async_db)):
+            result = await db.execute(select(Item))
+            return result.scalars().all()
+    """
+    async with AsyncSessionLocal() as db:
+        try:
+            yield db
+        except Exception:
+            await db.rollback()
+            raise
+
+
+def open_read_session(user_id: Optional[Any] = None) -> Session:
+    """
+    Open a session whose reads go to a healthy replica.
+
+    Falls back to the primary when no replica is configured or within the
+    lag limit, or while `user_id` is in a read-your-writes window.
+
+    Args:
+        user_id: Current user, to honour their recent writes (optional)
+    """
+    db = ReadSessionLocal()
+    if user_id is not None:
+        db.info[USER_INFO_KEY] = user_id
+    if replica_router.engines and not (user_id is not None and cache.exists(ryw_key(user_id))):
+        replica = replica_router.choose()
+        if replica is not None:
+            db.info[REPLICA_INFO_KEY] = replica
+    return db
+
+
+async def open_async_read_session(user_id: Optional[Any] = None) -> AsyncSession:
+    """Async counterpart of open_read_session."""
+    db = AsyncReadSessionLocal()
+    if user_id is not None:
+        db.info[USER_INFO_KEY] = user_id
+    if async_replica_router.engines and not (
+        user_id is not None and await async_cache.exists(ryw_key(user_id))
+    ):
+        replica = await async_replica_router.choose()
+        if replica is not None:
+            db.info[REPLICA_INFO_KEY] = replica.sync_engine
+    return db
+
+
+def get_read_db() -> Generator[Session, None, None]:
+    """
+    Dependency function to get a session for read-only routes.
+    Queries run on a read replica when a healthy one is available.
+
+    Usage in FastAPI:
+        @app.get("/jobs")
+        def list_jobs(db: Session = Depends(get_read_db)):
+            return db.query(Job).all()
+
+    See get_user_read_db in app.dependencies for per-user read-your-writes.
+    """
+    db = open_read_session()
+    try:
+        yield db
+    finally:
+        db.close()
+
+
+async def get_async_read_db() -> AsyncGenerator[AsyncSession, None]:
+    """Async counterpart of get_read_db."""
+    db = await open_async_read_session()
+    async with db:
+        yield db
+
+
 def init_db() -> None:
     """
     Initialize database tables.
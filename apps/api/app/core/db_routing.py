@@ -0,0 +1,216 @@
+"""
+Read-replica routing for SQLAlchemy sessions.
+
+Read sessions are created with a replica chosen up front (see
+app.core.database.get_read_db); RoutingSession.get_bind sends their
+statements there and everything else to the primary.
+"""
+import asyncio
+import logging
+import random
+import threading
+import time
+from typing import Any, Dict, Generic, List, Optional, TypeVar
+
+from sqlalchemy import event, text
+from sqlalchemy.engine import Engine
+from sqlalchemy.ext.asyncio import AsyncEngine
+from sqlalchemy.orm import Session
+
+from app.config import settings
+from app.core.cache import cache, async_cache
+
+logger = logging.getLogger(__name__)
+
+# Marks a user whose reads must stay on the primary, e.g. "ryw:<user_id>"
+RYW_KEY_PREFIX = "ryw:"
+
+# Session.info keys
+REPLICA_INFO_KEY = "replica"  # Sync Engine of the replica a read session uses
+PINNED_INFO_KEY = "pinned_to_primary"  # Set once the session writes
+WROTE_INFO_KEY = "uncommitted_writes"  # Flushed writes not yet committed
+USER_INFO_KEY = "user_id"  # Writes by this session start a read-your-writes window
+
+# Seconds of replay lag; 0 when the replica has replayed everything it
+# received (an idle primary must not make a caught-up replica look stale).
+# NULL when the server is not in recovery, i.e. not a replica at all.
+REPLICA_LAG_SQL = text(
+    """
+    SELECT CASE
+        WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0
+        ELSE EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp())
+    END
+    """
+)
+
+E = TypeVar("E", Engine, AsyncEngine)
+
+# Keeps marker writes scheduled from async commits alive until they finish
+_pending_markers: set = set()
+
+
+def ryw_key(user_id: Any) -> str:
+    """Return the Redis key of a user's read-your-writes marker."""
+    return f"{RYW_KEY_PREFIX}{user_id}"
+
+
+class _ReplicaPool(Generic[E]):
+    """Replica engines with cached lag measurements."""
+
+    def __init__(self, engines: List[E], max_lag: float, check_interval: float):
+        self.engines = engines
+        self.max_lag = max_lag
+        self.check_interval = check_interval
+        # engine index -> (checked at, healthy)
+        self._health: Dict[int, tuple] = {}
+        self._lock = threading.Lock()
+
+    def _cached_health(self, index: int) -> Optional[bool]:
+        with self._lock:
+            entry = self._health.get(index)
+        if entry is None or time.monotonic() - entry[0] >= self.check_interval:
+            return None
+        return entry[1]
+
+    def _record(self, index: int, lag: Optional[float], error: Optional[Exception]) -> bool:
+        healthy = error is None and (lag is None or lag <= self.max_lag)
+        with self._lock:
+            previous = self._health.get(index)
+            self._health[index] = (time.monotonic(), healthy)
+        if not healthy and (previous is None or previous[1]):
+            logger.warning(
+                "Read replica %d unavailable, routing reads to the primary",
+                index,
+                extra={
+                    "replica": index,
+                    "replica_lag": lag,
+                    "error": str(error) if error else None,
+                },
+            )
+        return healthy
+
+    def _candidates(self) -> List[int]:
+        indexes = list(range(len(self.engines)))
+        random.shuffle(indexes)
+        return indexes
+
+
+class ReplicaRouter(_ReplicaPool[Engine]):
+    """Picks a healthy sync replica engine."""
+
+    def choose(self) -> Optional[Engine]:
+        """
+        Pick a replica whose replay lag is within DB_REPLICA_MAX_LAG.
+
+        Returns:
+            Replica engine, None to use the primary
+        """
+        for index in self._candidates():
+            healthy = self._cached_health(index)
+            if healthy is None:
+                healthy = self._check(index)
+            if healthy:
+                return self.engines[index]
+        return None
+
+    def _check(self, index: int) -> bool:
+        try:
+            with self.engines[index].connect() as conn:
+                lag = conn.execute(REPLICA_LAG_SQL).scalar()
+        except Exception as e:
+            return self._record(index, None, e)
+        return self._record(index, float(lag) if lag is not None else None, None)
+
+
+class AsyncReplicaRouter(_ReplicaPool[AsyncEngine]):
+    """Picks a healthy async replica engine."""
+
+    async def choose(self) -> Optional[AsyncEngine]:
+        """
+        Pick a replica whose replay lag is within DB_REPLICA_MAX_LAG.
+
+        Returns:
+            Replica engine, None to use the primary
+        """
+        for index in self._candidates():
+            healthy = self._cached_health(index)
+            if healthy is None:
+                healthy = await self._check(index)
+            if healthy:
+                return self.engines[index]
+        return None
+
+    async def _check(self, index: int) -> bool:
+        try:
+            async with self.engines[index].connect() as conn:
+                lag = (await conn.execute(REPLICA_LAG_SQL)).scalar()
+        except Exception as e:
+            return self._record(index, None, e)
+        return self._record(index, float(lag) if lag is not None else None, None)
+
+
+class RoutingSession(Session):
+    """
+    Session that sends reads to the replica stored in `info["replica"]`.
+
+    Statements go to the primary (the session's own bind) when no replica
+    was chosen, while flushing, for INSERT/UPDATE/DELETE and SELECT ... FOR
+    UPDATE, and for the rest of the session once it has written anything.
+    """
+
+    def get_bind(self, mapper=None, clause=None, **kw):
+        replica = self.info.get(REPLICA_INFO_KEY)
+        if replica is not None and not self.info.get(PINNED_INFO_KEY):
+            if self._flushing or _is_write(clause):
+                self.info[PINNED_INFO_KEY] = True
+            else:
+                return replica
+        return super().get_bind(mapper=mapper, clause=clause, **kw)
+
+
+def _is_write(clause: Any) -> bool:
+    if clause is None:
+        return False
+    if getattr(clause, "is_dml", False):
+        return True
+    return getattr(clause, "_for_update_arg", None) is not None
+
+
+@event.listens_for(Session, "after_flush")
+def _pin_after_write(session: Session, flush_context: Any) -> None:
+    """Keep a session that wrote on the primary and remember that it wrote."""
+    session.info[PINNED_INFO_KEY] = True
+    session.info[WROTE_INFO_KEY] = True
+
+
+@event.listens_for(Session, "do_orm_execute")
+def _pin_on_dml(orm_execute_state: Any) -> None:
+    """Treat INSERT/UPDATE/DELETE statements executed directly like flushed writes."""
+    if orm_execute_state.is_insert or orm_execute_state.is_update or orm_execute_state.is_delete:
+        orm_execute_state.session.info[PINNED_INFO_KEY] = True
+        orm_execute_state.session.info[WROTE_INFO_KEY] = True
+
+
+@event.listens_for(Session, "after_rollback")
+def _forget_rolled_back_writes(session: Session) -> None:
+    session.info.pop(WROTE_INFO_KEY, None)
+
+
+@event.listens_for(Session, "after_commit")
+def _start_read_your_writes(session: Session) -> None:
+    """After a user's write commits, route that user's reads to the primary for a while."""
+    wrote = session.info.pop(WROTE_INFO_KEY, False)
+    user_id = session.info.get(USER_INFO_KEY)
+    if user_id is None or not wrote:
+        return
+    key = ryw_key(user_id)
+    try:
+        loop = asyncio.get_running_loop()
+    except RuntimeError:
+        cache.set(key, 1, expire=settings.DB_READ_YOUR_WRITES_TTL)
+        return
+    # AsyncSession commits run on the event loop; don't block it on Redis
+    task = loop.create_task(async_cache.set(key, 1, expire=settings.DB_READ_YOUR_WRITES_TTL))
+    _pending_markers.add(task)
+    task.add_done_callback(_pending_markers.discard)
+
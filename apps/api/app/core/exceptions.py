@@ -125,6 +125,17 @@ class RateLimitException(AppException):
         )
 
 
+class TokenBudgetExceededException(AppException):
+    """AI token budget used up for the current period."""
+    def __init__(self, period: str, retry_after: int):
+        super().__init__(
+            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+            detail=f"{period.capitalize()} AI token budget exceeded. Retry after {retry_after} seconds",
+            error_code="TOKEN_BUDGET_EXCEEDED",
+            headers={"Retry-After": str(retry_after)}
+        )
+
+
 # External Service Exceptions
 class ExternalServiceException(AppException):
     """External service error."""
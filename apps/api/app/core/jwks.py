@@ -0,0 +1,200 @@
+"""
+JSON Web Key Set manager for asymmetrically signed (e.g. Supabase) tokens.
+
+Public keys are loaded from JWKS_SOURCE, an https URL or a local file (the
+stand-in for tests and local development), parsed once and kept by `kid`. A
+daemon thread refreshes the set shortly before it expires (the response's
+Cache-Control max-age, else JWKS_REFRESH_INTERVAL). A token with an unknown
+`kid` wakes the thread for an early refresh, at most once per
+JWKS_MIN_REFRESH_INTERVAL, and is rejected meanwhile: requests never wait
+on a key fetch, and a failed fetch keeps the previous keys.
+
+Usage:
+    key = jwks_manager.get_key(kid)
+    if key is not None:
+        jwt.decode(token, key.key, algorithms=[key.algorithm], ...)
+"""
+import json
+import logging
+import re
+import threading
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Dict, Optional, Tuple
+
+import httpx
+from jose import jwk
+from jose.backends.base import Key
+from jose.exceptions import JWKError
+
+from app.config import settings
+
+logger = logging.getLogger(__name__)
+
+_MAX_AGE = re.compile(r"max-age=(\d+)")
+
+# Algorithm for keys that don't state one, by (kty, crv)
+_DEFAULT_ALGORITHMS = {
+    ("RSA", None): "RS256",
+    ("EC", "P-256"): "ES256",
+    ("EC", "P-384"): "ES384",
+    ("EC", "P-521"): "ES512",
+}
+
+
+@dataclass(frozen=True)
+class SigningKey:
+    """A parsed public key and the only algorithm it may verify."""
+    kid: str
+    algorithm: str
+    key: Key
+
+
+def parse_jwks(document: Dict[str, Any]) -> Dict[str, SigningKey]:
+    """
+    Parse the signature keys of a JWKS document, skipping unusable entries.
+
+    Returns:
+        Keys by kid
+    """
+    keys = {}
+    for data in document.get("keys", []):
+        kid = data.get("kid")
+        if not kid or data.get("use", "sig") != "sig":
+            continue
+        algorithm = data.get("alg") or _DEFAULT_ALGORITHMS.get((data.get("kty"), data.get("crv")))
+        if algorithm is None:
+            continue
+        try:
+            keys[kid] = SigningKey(kid, algorithm, jwk.construct(data, algorithm))
+        except (JWKError, ValueError) as e:
+            logger.warning("Skipping JWKS key %s: %s", kid, e)
+    return keys
+
+
+class JWKSManager:
+    """
+    Keeps the keys of one JWKS source fresh in the background.
+    """
+
+    def __init__(
+        self,
+        source: str,
+        refresh_interval: int = 600,
+        min_refresh_interval: int = 30,
+        timeout: float = 5.0,
+    ):
+        self.source = source
+        self.refresh_interval = refresh_interval
+        self.min_refresh_interval = min_refresh_interval
+        self.timeout = timeout
+        self._keys: Dict[str, SigningKey] = {}
+        self._expires_at = 0.0
+        self._last_attempt = 0.0
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def is_url(self) -> bool:
+        return self.source.startswith(("https://", "http://"))
+
+    def _load(self) -> Tuple[Dict[str, Any], int]:
+        """Read the JWKS document; returns it with its lifetime in seconds."""
+        if not self.is_url:
+            return json.loads(Path(self.source).read_text()), self.refresh_interval
+        response = httpx.get(self.source, timeout=self.timeout)
+        response.raise_for_status()
+        match = _MAX_AGE.search(response.headers.get("cache-control", ""))
+        max_age = int(match.group(1)) if match else self.refresh_interval
+        return response.json(), max(max_age, self.min_refresh_interval)
+
+    def refresh(self) -> bool:
+        """
+        Reload the key set now.
+
+        Returns:
+            True if the keys were replaced, False if loading failed (the
+            previous keys stay in use)
+        """
+        self._last_attempt = time.monotonic()
+        try:
+            document, lifetime = self._load()
+            keys = parse_jwks(document)
+        except Exception as e:
+            logger.warning("JWKS refresh from %s failed: %s", self.source, e)
+            self._expires_at = self._last_attempt + self.min_refresh_interval
+            return False
+        if not keys:
+            logger.warning("JWKS from %s has no usable signing keys", self.source)
+        self._keys = keys
+        self._expires_at = self._last_attempt + lifetime
+        return True
+
+    def get_key(self, kid: Optional[str]) -> Optional[SigningKey]:
+        """
+        Get a verification key without blocking.
+
+        An unknown kid (e.g. just after key rotation) schedules a refresh,
+        rate-limited by min_refresh_interval.
+
+        Returns:
+            Key, or None if the kid is not (yet) known
+        """
+        key = self._keys.get(kid) if kid else None
+        if key is None and kid:
+            self.request_refresh()
+        return key
+
+    def request_refresh(self) -> None:
+        """Wake the refresh thread unless a refresh was attempted recently."""
+        if time.monotonic() - self._last_attempt >= self.min_refresh_interval:
+            self._wake.set()
+
+    def start(self) -> None:
+        """Load the keys (blocking, once) and start the refresh thread."""
+        if self._thread is not None:
+            return
+        self.refresh()
+        self._thread = threading.Thread(target=self._run, name="jwks-refresh", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        self._wake.set()
+
+    def _seconds_until_refresh(self) -> float:
+        # Refresh a little before expiry, so keys never lapse
+        margin = min(60.0, (self._expires_at - self._last_attempt) * 0.2)
+        return max(0.0, self._expires_at - margin - time.monotonic())
+
+    def _run(self) -> None:
+        while not self._stop.is_set():
+            self._wake.wait(timeout=self._seconds_until_refresh())
+            self._wake.clear()
+            if self._stop.is_set():
+                break
+            # Unknown-kid wakeups are rate-limited here too
+            if time.monotonic() - self._last_attempt < self.min_refresh_interval:
+                continue
+            self.refresh()
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Key ids and freshness, for health checks."""
+        return {
+            "kids": sorted(self._keys),
+            "expires_in": round(self._expires_at - time.monotonic(), 1),
+        }
+
+
+jwks_manager: Optional[JWKSManager] = (
+    JWKSManager(
+        settings.JWKS_SOURCE,
+        refresh_interval=settings.JWKS_REFRESH_INTERVAL,
+        min_refresh_interval=settings.JWKS_MIN_REFRESH_INTERVAL,
+        timeout=settings.JWKS_FETCH_TIMEOUT,
+    )
+    if settings.JWKS_SOURCE
+    else None
+)
@@ -0,0 +1,226 @@
+"""
+In-process (L1) cache that sits in front of Redis.
+"""
+import fnmatch
+import json
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from typing import Any, Dict, Iterable, Optional, Tuple
+
+# Sentinel returned on a miss, so cached falsy values stay distinguishable
+MISSING = object()
+
+# Identifies this process in invalidation messages so it can skip its own
+PROCESS_ID = uuid.uuid4().hex
+
+
+class LocalCache:
+    """
+    Bounded in-process LRU/TTL cache partitioned by key namespace.
+
+    The namespace of a key is the segment before its first ":" (e.g. "profile"
+    for "profile:<user_id>"). Only namespaces listed in `namespace_limits` are
+    cached, each with its own LRU size limit.
+
+    Values are stored decoded and returned as-is, so callers must treat them
+    as read-only.
+    """
+
+    def __init__(self, namespace_limits: Dict[str, int], ttl: int):
+        self.namespace_limits = namespace_limits
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._entries: Dict[str, "OrderedDict[str, Tuple[float, Any]]"] = {
+            namespace: OrderedDict() for namespace in namespace_limits
+        }
+        # Entries are only served while an invalidation listener is subscribed;
+        # without one, other replicas' writes could never evict stale values.
+        self._listeners = 0
+
+    @staticmethod
+    def namespace(key: str) -> str:
+        """Return the namespace segment of a cache key."""
+        return key.split(":", 1)[0]
+
+    @property
+    def active(self) -> bool:
+        """Whether the L1 tier is currently serving reads."""
+        return self._listeners > 0
+
+    def handles(self, key: str) -> bool:
+        """Check if key belongs to an L1-enabled namespace."""
+        return self.namespace(key) in self._entries
+
+    def get(self, key: str) -> Any:
+        """
+        Get value from the local tier.
+
+        Args:
+            key: Cache key
+
+        Returns:
+            Cached value or MISSING if absent, expired or not L1-enabled
+        """
+        if not self.active:
+            return MISSING
+        entries = self._entries.get(self.namespace(key))
+        if entries is None:
+            return MISSING
+        with self._lock:
+            entry = entries.get(key)
+            if entry is None:
+                return MISSING
+            expires_at, value = entry
+            if expires_at <= time.monotonic():
+                del entries[key]
+                return MISSING
+            entries.move_to_end(key)
+            return value
+
+    def set(self, key: str, value: Any, ttl: Optional[int] = None) -> None:
+        """
+        Store value in the local tier, evicting the least recently used
+        entry of the namespace when it is full.
+
+        Args:
+            key: Cache key
+            value: Decoded value
+            ttl: Time to live in seconds, capped at the L1 TTL (optional)
+        """
+        if not self.active:
+            return
+        namespace = self.namespace(key)
+        entries = self._entries.get(namespace)
+        if entries is None:
+            return
+        ttl = min(ttl, self.ttl) if ttl else self.ttl
+        with self._lock:
+            entries[key] = (time.monotonic() + ttl, value)
+            entries.move_to_end(key)
+            while len(entries) > self.namespace_limits[namespace]:
+                entries.popitem(last=False)
+
+    def delete(self, key: str) -> None:
+        """Evict a key from the local tier."""
+        entries = self._entries.get(self.namespace(key))
+        if entries is None:
+            return
+        with self._lock:
+            entries.pop(key, None)
+
+    def delete_pattern(self, pattern: str) -> None:
+        """Evict all keys matching a Redis-style glob pattern."""
+        with self._lock:
+            for entries in self._entries.values():
+                for key in [k for k in entries if fnmatch.fnmatchcase(k, pattern)]:
+                    del entries[key]
+
+    def clear(self) -> None:
+        """Evict everything."""
+        with self._lock:
+            for entries in self._entries.values():
+                entries.clear()
+
+    def listener_started(self) -> None:
+        """Record that an invalidation listener subscribed successfully."""
+        with self._lock:
+            self._listeners += 1
+
+    def listener_stopped(self) -> None:
+        """
+        Record that an invalidation listener went away.
+
+        Everything is dropped, since invalidations may have been missed.
+        """
+        with self._lock:
+            self._listeners = max(0, self._listeners - 1)
+            for entries in self._entries.values():
+                entries.clear()
+
+    @staticmethod
+    def invalidation_message(
+        keys: Iterable[str] = (),
+        patterns: Iterable[str] = (),
+    ) -> str:
+        """Build the pub/sub payload announcing evicted keys/patterns."""
+        return json.dumps({
+            "origin": PROCESS_ID,
+            "keys": list(keys),
+            "patterns": list(patterns),
+        })
+
+    def apply_invalidation(self, data: Any) -> None:
+        """
+        Apply an invalidation message received over pub/sub.
+
+        Args:
+            data: Raw message payload
+        """
+        try:
+            if isinstance(data, bytes):
+                data = data.decode()
+            message = json.loads(data)
+        except (ValueError, UnicodeDecodeError):
+            return
+        if message.get("origin") == PROCESS_ID:
+            return
+        for key in message.get("keys", ()):
+            self.delete(key)
+        for pattern in message.get("patterns", ()):
+            self.delete_pattern(pattern)
+
+
+class TTLCache:
+    """
+    Bounded in-process LRU cache with a single TTL.
+
+    Used as the stand-in for Redis while the cache circuit breaker is open.
+    """
+
+    def __init__(self, max_entries: int, ttl: int):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[str, Tuple[float, Any]]" = OrderedDict()
+
+    def get(self, key: str) -> Any:
+        """Get value, MISSING if absent or expired."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return MISSING
+            expires_at, value = entry
+            if expires_at <= time.monotonic():
+                del self._entries[key]
+                return MISSING
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key: str, value: Any, ttl: Optional[int] = None) -> None:
+        """Store value for at most the configured TTL."""
+        ttl = min(ttl, self.ttl) if ttl else self.ttl
+        with self._lock:
+            self._entries[key] = (time.monotonic() + ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def delete(self, key: str) -> bool:
+        """Evict a key, True if it was present."""
+        with self._lock:
+            return self._entries.pop(key, None) is not None
+
+    def delete_pattern(self, pattern: str) -> int:
+        """Evict all keys matching a Redis-style glob pattern."""
+        with self._lock:
+            keys = [k for k in self._entries if fnmatch.fnmatchcase(k, pattern)]
+            for key in keys:
+                del self._entries[key]
+            return len(keys)
+
+    def clear(self) -> None:
+        """Evict everything."""
+        with self._lock:
+            self._entries.clear()
@@ -0,0 +1,282 @@
+"""
+Declarative memoization for service and query functions.
+
+Usage:
+    @cached(ttl=300, tags=["user:{user_id}"])
+    def get_profile_summary(db: Session, user_id: UUID) -> dict:
+        ...
+
+    @cached(ttl=600, namespace="template", negative_ttl=30)
+    async def get_default_template() -> Optional[dict]:
+        async with AsyncSessionLocal() as db:
+            ...
+
+    get_profile_summary.invalidate(db, user_id)   # drop one entry
+    async_cache.invalidate_tags(f"user:{user_id}")  # drop everything for a user
+
+Lookups go through Cache.get_or_compute / AsyncCache.get_or_compute, so
+concurrent misses share one call and hot entries are refreshed early.
+Async functions may be computed in a background task that outlives the
+caller, so they open their own session instead of taking the request's.
+"""
+import enum
+import functools
+import hashlib
+import inspect
+import json
+import threading
+from dataclasses import dataclass, field
+from datetime import date, datetime, time
+from decimal import Decimal
+from typing import Any, Callable, Dict, Iterable, Optional, Union
+from uuid import UUID
+
+from pydantic import BaseModel
+from sqlalchemy import inspect as sa_inspect
+from sqlalchemy.exc import NoInspectionAvailable
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from app.config import settings
+from app.core.cache import cache, async_cache
+
+# Arguments of these types never contribute to the key
+_IGNORED_TYPES = (Session, AsyncSession)
+
+
+def _check_no_session(value: Any, name: str, func_path: str) -> None:
+    """
+    Reject a session argument of an async @cached function.
+
+    Raises:
+        TypeError: If value is a session or a session type
+    """
+    if isinstance(value, _IGNORED_TYPES) or (
+        isinstance(value, type) and issubclass(value, _IGNORED_TYPES)
+    ):
+        raise TypeError(
+            f"async @cached {func_path} takes a session ({name}); early refreshes run "
+            "after the request's session is closed, open one inside the function instead"
+        )
+
+
+def _normalize(value: Any) -> Any:
+    """
+    Reduce an argument to a JSON-stable structure.
+
+    Raises:
+        TypeError: If the value has no stable representation
+    """
+    if value is None or isinstance(value, (bool, int, float, str)):
+        return value
+    if isinstance(value, (UUID, Decimal)):
+        return str(value)
+    if isinstance(value, (datetime, date, time)):
+        return value.isoformat()
+    if isinstance(value, enum.Enum):
+        return _normalize(value.value)
+    if isinstance(value, BaseModel):
+        return [type(value).__name__, value.model_dump(mode="json")]
+    if isinstance(value, dict):
+        return {str(k): _normalize(v) for k, v in sorted(value.items(), key=lambda kv: str(kv[0]))}
+    if isinstance(value, (list, tuple)):
+        return [_normalize(v) for v in value]
+    if isinstance(value, (set, frozenset)):
+        return sorted((_normalize(v) for v in value), key=repr)
+    try:
+        state = sa_inspect(value)
+    except NoInspectionAvailable:
+        state = None
+    if state is not None and getattr(state, "identity", None) is not None:
+        # SQLAlchemy model: identified by table and primary key, not by content
+        return [state.mapper.persist_selectable.name, [_normalize(v) for v in state.identity]]
+    raise TypeError(f"Cannot derive a stable cache key from {type(value).__name__}")
+
+
+def _check_plain(value: Any, func_path: str) -> None:
+    """
+    Make sure a result survives the cache codecs unchanged.
+
+    Raises:
+        TypeError: If the value holds anything but dicts with string keys,
+            lists, strings, numbers, booleans and None
+    """
+    if value is None or isinstance(value, (bool, int, float, str)):
+        return
+    if isinstance(value, list):
+        for item in value:
+            _check_plain(item, func_path)
+        return
+    if isinstance(value, dict):
+        for k, v in value.items():
+            if not isinstance(k, str):
+                raise TypeError(f"@cached {func_path} returned a dict key of type {type(k).__name__}")
+            _check_plain(v, func_path)
+        return
+    raise TypeError(
+        f"@cached {func_path} returned {type(value).__name__}, which is not plain data; "
+        "convert it (e.g. with a Pydantic schema and model_dump(mode=\"json\")) first"
+    )
+
+
+@dataclass
+class CacheStats:
+    """Hit/miss counters of one memoized function."""
+    hits: int = 0
+    misses: int = 0
+    _lock: threading.Lock = field(default_factory=threading.Lock, repr=False, compare=False)
+
+    def record(self, hit: bool) -> None:
+        with self._lock:
+            if hit:
+                self.hits += 1
+            else:
+                self.misses += 1
+
+    @property
+    def hit_ratio(self) -> float:
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+
+def cached(
+    ttl: int,
+    tags: Optional[Union[Iterable[str], Callable[..., Iterable[str]]]] = None,
+    namespace: str = "memo",
+    version: Optional[str] = None,
+    negative_ttl: Optional[int] = None,
+    ignore: Iterable[str] = (),
+) -> Callable:
+    """
+    Memoize a sync or async function in the Redis cache.
+
+    Keys look like "<namespace>:<CACHE_VERSION>:<module.function>[:<version>]:<digest>",
+    where the digest covers all bound arguments. SQLAlchemy sessions (of sync
+    functions) are skipped, SQLAlchemy models contribute their table and primary key, and
+    Pydantic models their field values. Bumping CACHE_VERSION on deploy
+    orphans every memoized entry at once.
+
+    Async functions must not take a session: they may be computed in a
+    background task after the caller's session is closed, so they open their
+    own (TypeError at decoration or call time otherwise).
+
+    Results must be plain data (dicts with string keys, lists, primitives),
+    anything else raises TypeError; convert ORM instances with a Pydantic
+    schema first. Callers served without running the function, including
+    those that waited on a concurrent call, count as hits.
+
+    Args:
+        ttl: Time to live in seconds
+        tags: Tag templates formatted with the bound arguments, e.g.
+            ["user:{user_id}", "job:{job.id}"], or a callable receiving the
+            function's arguments and returning tags (optional)
+        namespace: First key segment; use an L1-enabled namespace (e.g.
+            "template") to also serve hot results from process memory
+        version: Per-function version, bump when the return shape changes
+        negative_ttl: Cache None results for this many seconds; None results
+            are not cached when omitted
+        ignore: Argument names left out of the key (e.g. "request")
+
+    Returns:
+        Decorator. The wrapped function gains `cache_key(*args, **kwargs)`,
+        `invalidate(*args, **kwargs)` and `cache_stats`.
+    """
+    ignored = set(ignore)
+
+    def decorator(func: Callable) -> Callable:
+        signature = inspect.signature(func)
+        func_path = f"{func.__module__}.{func.__qualname__}"
+        stats = CacheStats()
+
+        def bind(args: tuple, kwargs: dict) -> Dict[str, Any]:
+            bound = signature.bind(*args, **kwargs)
+            bound.apply_defaults()
+            return bound.arguments
+
+        def cache_key(*args, **kwargs) -> str:
+            arguments = {
+                name: value
+                for name, value in bind(args, kwargs).items()
+                if name not in ignored
+                and name not in ("self", "cls")
+                and not isinstance(value, _IGNORED_TYPES)
+            }
+            payload = json.dumps(_normalize(arguments), sort_keys=True, separators=(",", ":"))
+            digest = hashlib.sha1(payload.encode()).hexdigest()
+            parts = [namespace, settings.CACHE_VERSION, func_path]
+            if version:
+                parts.append(version)
+            parts.append(digest)
+            return ":".join(parts)
+
+        def resolve_tags(args: tuple, kwargs: dict) -> Optional[list]:
+            if not tags:
+                return None
+            if callable(tags):
+                return list(tags(*args, **kwargs))
+            arguments = bind(args, kwargs)
+            return [template.format(**arguments) for template in tags]
+
+        def expire_for(result: Any) -> Optional[int]:
+            if result is None:
+                return negative_ttl
+            return ttl
+
+        def checked(result: Any) -> Any:
+            _check_plain(result, func_path)
+            return result
+
+        if inspect.iscoroutinefunction(func):
+            for name, parameter in signature.parameters.items():
+                _check_no_session(parameter.annotation, name, func_path)
+
+            @functools.wraps(func)
+            async def wrapper(*args, **kwargs):
+                for name, value in bind(args, kwargs).items():
+                    _check_no_session(value, name, func_path)
+                computed = False
+
+                async def compute():
+                    nonlocal computed
+                    computed = True
+                    return checked(await func(*args, **kwargs))
+
+                result = await async_cache.get_or_compute(
+                    cache_key(*args, **kwargs),
+                    compute,
+                    expire=expire_for,
+                    tags=resolve_tags(args, kwargs),
+                )
+                stats.record(hit=not computed)
+                return result
+
+            async def invalidate(*args, **kwargs) -> bool:
+                return await async_cache.delete(cache_key(*args, **kwargs))
+        else:
+            @functools.wraps(func)
+            def wrapper(*args, **kwargs):
+                computed = False
+
+                def compute():
+                    nonlocal computed
+                    computed = True
+                    return checked(func(*args, **kwargs))
+
+                result = cache.get_or_compute(
+                    cache_key(*args, **kwargs),
+                    compute,
+                    expire=expire_for,
+                    tags=resolve_tags(args, kwargs),
+                )
+                stats.record(hit=not computed)
+                return result
+
+            def invalidate(*args, **kwargs) -> bool:
+                return cache.delete(cache_key(*args, **kwargs))
+
+        wrapper.cache_key = cache_key
+        wrapper.invalidate = invalidate
+        wrapper.cache_stats = stats
+        return wrapper
+
+    return decorator
@@ -0,0 +1,323 @@
+"""
+Prometheus metrics for the API and Celery workers.
+
+Collected:
+
+    http_requests_total / http_request_duration_seconds   per method, route template, status
+    http_requests_in_progress                             per method, route template
+    db_pool_checked_out / db_pool_overflow / db_pool_size per pool (sampled)
+    cache_lookups_total / cache_lookup_duration_seconds   per operation, result
+    celery_queue_length                                   per queue (LLEN on the broker at scrape time)
+    celery_task_duration_seconds / celery_tasks_total     per task, state
+
+Multi-process: when PROMETHEUS_MULTIPROC_DIR is set (required with several
+uvicorn or Celery worker processes), every process writes its values to
+memory-mapped files in that directory and /metrics merges them. The directory
+must be emptied before the server starts. Without it, each process reports
+only its own values.
+
+Recording a sample is a lock-protected in-memory (or mmap) update; nothing
+is computed on the request path beyond matching the route template.
+
+Usage:
+    app.add_middleware(MetricsMiddleware)
+    watch_pool("primary", engine.pool)
+    body = render_metrics()
+"""
+import logging
+import os
+import threading
+import time
+from typing import Dict, List, Optional, Tuple
+
+import redis
+from prometheus_client import (
+    CONTENT_TYPE_LATEST,
+    CollectorRegistry,
+    Counter,
+    Gauge,
+    Histogram,
+    generate_latest,
+    multiprocess,
+    start_http_server,
+)
+from prometheus_client.core import GaugeMetricFamily
+from sqlalchemy.pool import Pool
+from starlette.routing import Match
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.config import settings
+
+logger = logging.getLogger(__name__)
+
+# Label for requests that matched no route, so unknown paths can't create series
+UNMATCHED_ROUTE = "<unmatched>"
+
+# Generation and scraping tasks run for minutes
+TASK_BUCKETS = (0.1, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300, 600, 1800)
+CACHE_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25)
+
+HTTP_REQUESTS = Counter(
+    "http_requests_total", "HTTP requests", ["method", "route", "status"]
+)
+HTTP_DURATION = Histogram(
+    "http_request_duration_seconds", "HTTP request latency", ["method", "route"]
+)
+HTTP_IN_PROGRESS = Gauge(
+    "http_requests_in_progress", "HTTP requests being served", ["method", "route"],
+    multiprocess_mode="livesum",
+)
+
+DB_POOL_CHECKED_OUT = Gauge(
+    "db_pool_checked_out", "Connections checked out of the pool", ["pool"],
+    multiprocess_mode="livesum",
+)
+DB_POOL_OVERFLOW = Gauge(
+    "db_pool_overflow", "Connections open beyond pool_size", ["pool"],
+    multiprocess_mode="livesum",
+)
+DB_POOL_SIZE = Gauge(
+    "db_pool_size", "Configured pool_size", ["pool"],
+    multiprocess_mode="livesum",
+)
+
+CACHE_LOOKUPS = Counter(
+    "cache_lookups_total", "Cache keys looked up", ["operation", "result"]
+)
+CACHE_DURATION = Histogram(
+    "cache_lookup_duration_seconds", "Cache lookup latency, Redis round trip included",
+    ["operation"], buckets=CACHE_BUCKETS,
+)
+
+TASKS = Counter("celery_tasks_total", "Celery tasks finished", ["task", "state"])
+TASK_DURATION = Histogram(
+    "celery_task_duration_seconds", "Celery task runtime", ["task", "state"],
+    buckets=TASK_BUCKETS,
+)
+
+
+def multiprocess_enabled() -> bool:
+    return bool(os.environ.get("PROMETHEUS_MULTIPROC_DIR"))
+
+
+def mark_process_dead(pid: Optional[int] = None) -> None:
+    """Drop a stopped process's live gauges (in-flight requests, pools)."""
+    if multiprocess_enabled():
+        multiprocess.mark_process_dead(pid or os.getpid())
+
+
+# ---------------------------------------------------------------------------
+# HTTP
+# ---------------------------------------------------------------------------
+
+def route_template(scope: Scope) -> str:
+    """Path template of the route a request will hit, e.g. /api/v1/jobs/{job_id}."""
+    app = scope.get("app")
+    router = getattr(app, "router", None)
+    partial = None
+    for route in getattr(router, "routes", ()):
+        match, _ = route.matches(scope)
+        if match == Match.FULL:
+            return route.path
+        if match == Match.PARTIAL and partial is None:
+            partial = route.path  # Path matched, method did not (405)
+    return partial or UNMATCHED_ROUTE
+
+
+class MetricsMiddleware:
+    """
+    Pure ASGI middleware recording request counts, latency and concurrency.
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        method = scope["method"]
+        route = route_template(scope)
+        status_code = 500  # If the app raises before responding
+        in_progress = HTTP_IN_PROGRESS.labels(method, route)
+
+        async def send_with_status(message: Message) -> None:
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        started = time.perf_counter()
+        in_progress.inc()
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            in_progress.dec()
+            HTTP_DURATION.labels(method, route).observe(time.perf_counter() - started)
+            HTTP_REQUESTS.labels(method, route, str(status_code)).inc()
+            sample_pools()
+
+
+# ---------------------------------------------------------------------------
+# Database pools
+# ---------------------------------------------------------------------------
+
+_pools: Dict[str, Pool] = {}
+_pools_sampled_at = 0.0
+
+
+def watch_pool(name: str, pool: Pool) -> None:
+    """Report a connection pool's usage under `name`."""
+    _pools[name] = pool
+    DB_POOL_SIZE.labels(name).set(getattr(pool, "size", lambda: 0)())
+
+
+def sample_pools(min_interval: float = 1.0) -> None:
+    """Update the pool gauges, at most once per min_interval seconds per process."""
+    global _pools_sampled_at
+    now = time.monotonic()
+    if now - _pools_sampled_at < min_interval:
+        return
+    _pools_sampled_at = now
+    for name, pool in _pools.items():
+        checkedout = getattr(pool, "checkedout", None)
+        overflow = getattr(pool, "overflow", None)
+        if checkedout is not None:
+            DB_POOL_CHECKED_OUT.labels(name).set(checkedout())
+        if overflow is not None:
+            # Negative while the pool has not been filled yet
+            DB_POOL_OVERFLOW.labels(name).set(max(0, overflow()))
+
+
+# ---------------------------------------------------------------------------
+# Cache
+# ---------------------------------------------------------------------------
+
+def record_cache_lookup(
+    operation: str,
+    hits: int,
+    misses: int,
+    seconds: Optional[float] = None,
+    local_hits: int = 0,
+) -> None:
+    """
+    Count the keys of one cache read.
+
+    Args:
+        operation: "get" or "get_many"
+        hits: Keys found in Redis (or the fallback cache)
+        misses: Keys not found
+        seconds: Duration of the Redis round trip, None if there was none
+        local_hits: Keys served by the in-process tier
+    """
+    for result, count in (("local_hit", local_hits), ("hit", hits), ("miss", misses)):
+        if count:
+            CACHE_LOOKUPS.labels(operation, result).inc(count)
+    if seconds is not None:
+        CACHE_DURATION.labels(operation).observe(seconds)
+
+
+# ---------------------------------------------------------------------------
+# Celery
+# ---------------------------------------------------------------------------
+
+_task_started: Dict[str, Tuple[str, float]] = {}
+_task_lock = threading.Lock()
+
+
+def task_started(task_id: str, task_name: str) -> None:
+    with _task_lock:
+        _task_started[task_id] = (task_name, time.perf_counter())
+
+
+def task_finished(task_id: str, state: str) -> None:
+    """Record the runtime of a task started with task_started."""
+    with _task_lock:
+        started = _task_started.pop(task_id, None)
+    if started is None:
+        return
+    task_name, started_at = started
+    TASKS.labels(task_name, state).inc()
+    TASK_DURATION.labels(task_name, state).observe(time.perf_counter() - started_at)
+
+
+class CeleryQueueCollector:
+    """Broker queue lengths, read with one pipelined LLEN per scrape."""
+
+    def __init__(self, broker_url: str, queues: List[str]):
+        self.queues = queues
+        self._client = redis.from_url(broker_url, socket_timeout=1, socket_connect_timeout=1)
+
+    def collect(self):
+        family = GaugeMetricFamily(
+            "celery_queue_length", "Tasks waiting in the broker queue", labels=["queue"]
+        )
+        try:
+            pipe = self._client.pipeline(transaction=False)
+            for queue in self.queues:
+                pipe.llen(queue)
+            for queue, length in zip(self.queues, pipe.execute()):
+                family.add_metric([queue], length)
+        except redis.RedisError as e:
+            logger.warning("Celery queue length scrape failed: %s", e)
+        yield family
+
+
+# ---------------------------------------------------------------------------
+# Exposition
+# ---------------------------------------------------------------------------
+
+_registry: Optional[CollectorRegistry] = None
+_registry_lock = threading.Lock()
+
+
+def _build_registry(include_queues: bool) -> CollectorRegistry:
+    if multiprocess_enabled():
+        built = CollectorRegistry()
+        multiprocess.MultiProcessCollector(built)
+    else:
+        built = CollectorRegistry()
+        for collector in (HTTP_REQUESTS, HTTP_DURATION, HTTP_IN_PROGRESS, DB_POOL_CHECKED_OUT,
+                          DB_POOL_OVERFLOW, DB_POOL_SIZE, CACHE_LOOKUPS, CACHE_DURATION,
+                          TASKS, TASK_DURATION):
+            built.register(collector)
+    queues = [q.strip() for q in settings.CELERY_METRICS_QUEUES.split(",") if q.strip()]
+    if include_queues and queues:
+        built.register(CeleryQueueCollector(settings.CELERY_BROKER_URL, queues))
+    return built
+
+
+def registry() -> CollectorRegistry:
+    """
+    Registry /metrics exposes: the merged multi-process values (or this
+    process's own), plus Celery queue lengths. Built once per process.
+    """
+    global _registry
+    with _registry_lock:
+        if _registry is None:
+            _registry = _build_registry(include_queues=True)
+        return _registry
+
+
+def start_worker_server(port: int) -> None:
+    """
+    Serve a Celery worker's task metrics on `port` (from the worker's main
+    process; pool processes report through PROMETHEUS_MULTIPROC_DIR).
+    Queue lengths are left to the API's /metrics.
+    """
+    start_http_server(port, registry=_build_registry(include_queues=False))
+
+
+def render_metrics() -> Tuple[bytes, str]:
+    """
+    Metrics in the Prometheus text format.
+
+    Blocking (reads the multi-process files and the broker); call from a
+    threadpool.
+
+    Returns:
+        (body, content type)
+    """
+    sample_pools(min_interval=0)
+    return generate_latest(registry()), CONTENT_TYPE_LATEST
@@ -0,0 +1,186 @@
+"""
+Per-request SQL instrumentation.
+
+Engine events (see instrument_engine) add every statement to the QueryStats
+of the current request or task, held in a contextvar: query count, total
+database time and how often each statement fingerprint ran. The same
+fingerprint running more than DB_N_PLUS_ONE_THRESHOLD times in one request
+is reported (once) as a likely N+1, and slow statements are logged (sampled) with the
+shape of their parameters, never their values.
+
+Usage:
+    with track_queries("GET /api/v1/dashboard") as stats:
+        ...
+    stats.count, stats.total_ms
+"""
+import hashlib
+import logging
+import random
+import re
+import threading
+import time
+from collections import Counter
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from typing import Any, Dict, Iterator, Optional, Tuple
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from app.config import settings
+
+logger = logging.getLogger(__name__)
+
+_current: ContextVar[Optional["QueryStats"]] = ContextVar("query_stats", default=None)
+
+_WHITESPACE = re.compile(r"\s+")
+# IN lists expand to one placeholder per element; count them as one statement
+_IN_LIST = re.compile(r"\bIN \((?:[^()]|\([^()]*\))*\)", re.IGNORECASE)
+# Multi-row VALUES lists, e.g. from bulk inserts
+_VALUES_LIST = re.compile(r"\bVALUES (\([^()]*\))(?:, \([^()]*\))+", re.IGNORECASE)
+
+
+@dataclass
+class QueryStats:
+    """
+    SQL activity of one request or task.
+
+    Updated from engine events, which run in threadpool workers for sync
+    sessions, so concurrent statements of one request may record at once.
+    """
+    label: str = ""
+    count: int = 0
+    total_ms: float = 0.0
+    fingerprints: Counter = field(default_factory=Counter)
+    statements: Dict[str, str] = field(default_factory=dict)
+    _lock: threading.Lock = field(default_factory=threading.Lock, repr=False, compare=False)
+
+    def record(self, statement: str, duration_ms: float) -> Tuple[str, int]:
+        """Add one executed statement; returns its fingerprint and run count so far."""
+        normalized = normalize_statement(statement)
+        fingerprint = hashlib.sha1(normalized.encode()).hexdigest()[:12]
+        with self._lock:
+            self.count += 1
+            self.total_ms += duration_ms
+            self.fingerprints[fingerprint] += 1
+            self.statements.setdefault(fingerprint, normalized)
+            return fingerprint, self.fingerprints[fingerprint]
+
+    def repeated(self, minimum: int = 2) -> Dict[str, int]:
+        """Fingerprints run at least `minimum` times, most frequent first."""
+        with self._lock:
+            common = self.fingerprints.most_common()
+        return {fp: n for fp, n in common if n >= minimum}
+
+    def log_fields(self) -> Dict[str, Any]:
+        """Summary suitable for structured log `extra` fields."""
+        return {
+            "db_queries": self.count,
+            "db_time_ms": round(self.total_ms, 2),
+            "db_repeated_statements": len(self.repeated()),
+        }
+
+    def server_timing(self) -> str:
+        """Server-Timing header entry."""
+        return f'db;dur={self.total_ms:.1f};desc="{self.count} queries"'
+
+
+def normalize_statement(statement: str) -> str:
+    """Collapse whitespace and variable-length lists so equivalent statements match."""
+    statement = _WHITESPACE.sub(" ", statement).strip()
+    statement = _IN_LIST.sub("IN (...)", statement)
+    return _VALUES_LIST.sub(r"VALUES \1, ...", statement)
+
+
+def parameter_shape(parameters: Any) -> Any:
+    """Describe bound parameters by type only (values may be personal data)."""
+    if isinstance(parameters, dict):
+        return {key: type(value).__name__ for key, value in parameters.items()}
+    if isinstance(parameters, (list, tuple)):
+        if parameters and isinstance(parameters[0], (dict, list, tuple)):
+            # executemany: describe the first row
+            return {"rows": len(parameters), "row": parameter_shape(parameters[0])}
+        return [type(value).__name__ for value in parameters]
+    return type(parameters).__name__
+
+
+def current_query_stats() -> Optional[QueryStats]:
+    """QueryStats of the running request/task, None outside of one."""
+    return _current.get()
+
+
+@contextmanager
+def track_queries(label: str = "") -> Iterator[QueryStats]:
+    """
+    Collect SQL statistics for the enclosed block.
+
+    Sync code run in a threadpool from inside the block (e.g. FastAPI sync
+    dependencies) shares the same QueryStats, since the contextvar holds a
+    mutable object.
+    """
+    stats = QueryStats(label=label)
+    token = _current.set(stats)
+    try:
+        yield stats
+    finally:
+        _current.reset(token)
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault("query_started_at", []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    started = conn.info["query_started_at"].pop()
+    duration_ms = (time.perf_counter() - started) * 1000
+    stats = _current.get()
+
+    if stats is not None:
+        fingerprint, runs = stats.record(statement, duration_ms)
+        # Warn once, on the first run past the threshold
+        if runs == settings.DB_N_PLUS_ONE_THRESHOLD + 1:
+            logger.warning(
+                "Possible N+1: statement ran more than %d times in %s: %s",
+                settings.DB_N_PLUS_ONE_THRESHOLD,
+                stats.label or "request",
+                stats.statements[fingerprint][:300],
+                extra={"db_fingerprint": fingerprint, "request": stats.label},
+            )
+
+    if (
+        duration_ms >= settings.DB_SLOW_QUERY_MS
+        and random.random() < settings.DB_SLOW_QUERY_SAMPLE_RATE
+    ):
+        logger.warning(
+            "Slow query (%.1f ms): %s",
+            duration_ms,
+            normalize_statement(statement)[:1000],
+            extra={
+                "db_duration_ms": round(duration_ms, 2),
+                "db_parameters": parameter_shape(parameters),
+                "db_executemany": executemany,
+                "request": stats.label if stats else None,
+            },
+        )
+
+
+def _handle_error(context):
+    # after_cursor_execute does not run for failed statements
+    if context.connection is not None:
+        started = context.connection.info.get("query_started_at")
+        if started:
+            started.pop()
+
+
+def instrument_engine(engine: Engine) -> None:
+    """
+    Attach the statistics hooks to an engine.
+
+    For an AsyncEngine pass its `sync_engine`.
+    """
+    if not settings.DB_QUERY_STATS_ENABLED:
+        return
+    event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(engine, "after_cursor_execute", _after_cursor_execute)
+    event.listen(engine, "handle_error", _handle_error)
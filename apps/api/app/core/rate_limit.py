@@ -0,0 +1,333 @@
+"""
+Sliding-window rate limiting middleware.
+
+Each request is assigned a category (see `classify`) and counted against
+that category's limit for its client: the user id of a
+valid bearer token, else the client IP (always the IP for auth routes,
+which are called before there is a token).
+
+The shared count lives in a Redis sorted set of request timestamps per
+(category, client); one Lua script call trims the window, checks the limit
+and records the request atomically. An in-process token bucket with the
+same limit runs first, before the bearer token is even verified: it is
+keyed by a digest of the token (or the IP without one), and tokens that
+fail verification are charged to their IP, so a flood of repeated or
+made-up tokens is rejected by the process it hits without JWT decoding or
+a Redis round trip. While an IP's bad-token budget is spent, only tokens
+already in the verified-claims cache are accepted from it. If Redis is unavailable the request is allowed (fail
+open) and only the local buckets apply.
+
+Responses carry X-RateLimit-Limit/-Remaining/-Reset; rejections are 429
+with Retry-After and the API's error body.
+"""
+import logging
+import math
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Tuple
+
+import orjson
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.config import settings
+from app.core.cache import AsyncCache, async_cache
+from app.core.circuit_breaker import CircuitOpenError
+from app.core.token_cache import claims_cache, token_digest, verify_token_cached
+
+logger = logging.getLogger(__name__)
+
+# KEYS[1]: window zset; ARGV: window ms, limit, unique member.
+# Returns {allowed (0/1), remaining, reset time in epoch ms}.
+SLIDING_WINDOW_SCRIPT = """
+local t = redis.call('TIME')
+local now = tonumber(t[1]) * 1000 + math.floor(tonumber(t[2]) / 1000)
+local window = tonumber(ARGV[1])
+local limit = tonumber(ARGV[2])
+redis.call('ZREMRANGEBYSCORE', KEYS[1], '-inf', now - window)
+local count = redis.call('ZCARD', KEYS[1])
+local allowed = 0
+if count < limit then
+    redis.call('ZADD', KEYS[1], now, ARGV[3])
+    count = count + 1
+    allowed = 1
+end
+redis.call('PEXPIRE', KEYS[1], window)
+local reset = now + window
+local oldest = redis.call('ZRANGE', KEYS[1], 0, 0, 'WITHSCORES')
+if oldest[2] then
+    reset = tonumber(oldest[2]) + window
+end
+return {allowed, limit - count, reset}
+"""
+
+# Never limited: probes, metrics and docs
+EXEMPT_PATHS = ("/health", "/ping", "/metrics", "/docs", "/redoc")
+
+READ_METHODS = ("GET", "HEAD")
+
+
+@dataclass(frozen=True)
+class RateLimit:
+    """A request budget per client."""
+    category: str
+    limit: int
+    window: int  # Seconds
+
+
+@dataclass
+class Decision:
+    allowed: bool
+    limit: int
+    remaining: int
+    reset: float  # Epoch seconds when the window frees up
+
+    def headers(self) -> Dict[str, str]:
+        return {
+            "X-RateLimit-Limit": str(self.limit),
+            "X-RateLimit-Remaining": str(max(0, self.remaining)),
+            "X-RateLimit-Reset": str(math.ceil(self.reset)),
+        }
+
+
+def limits() -> Dict[str, RateLimit]:
+    """Limits per category, from settings."""
+    return {
+        "auth": RateLimit("auth", settings.RATE_LIMIT_AUTH_PER_5_MIN, 300),
+        "ai": RateLimit("ai", settings.RATE_LIMIT_AI_PER_MINUTE, 60),
+        "scraping": RateLimit("scraping", settings.RATE_LIMIT_SCRAPING_PER_HOUR, 3600),
+        "upload": RateLimit("upload", settings.RATE_LIMIT_UPLOAD_PER_10_MIN, 600),
+        "read": RateLimit("read", settings.RATE_LIMIT_PER_MINUTE, 60),
+        "write": RateLimit("write", settings.RATE_LIMIT_WRITE_PER_MINUTE, 60),
+    }
+
+
+def _under(path: str, prefix: str) -> bool:
+    return path == prefix or path.startswith(prefix + "/")
+
+
+def classify(
+    path: str,
+    categories: Dict[str, RateLimit],
+    method: str = "GET",
+    content_type: str = "",
+) -> Optional[RateLimit]:
+    """
+    Category of a request, None if exempt.
+
+    auth, ai and scraping go by path (/auth/*, /ai/*, /scraper/trigger),
+    then file uploads (multipart/form-data) go to upload, other GET/HEAD
+    requests to read and everything else to write.
+    """
+    if path.startswith(EXEMPT_PATHS) or path.endswith("/openapi.json"):
+        return None
+    for category in ("auth", "ai"):
+        if _under(path, f"{settings.API_V1_PREFIX}/{category}"):
+            return categories[category]
+    if _under(path, f"{settings.API_V1_PREFIX}/scraper/trigger"):
+        return categories["scraping"]
+    if method in READ_METHODS:
+        return categories["read"]
+    if content_type.lower().startswith("multipart/form-data"):
+        return categories["upload"]
+    return categories["write"]
+
+
+class LocalTokenBuckets:
+    """
+    Per-client token buckets in process memory (LRU-bounded).
+
+    A bucket holds up to `limit` tokens and refills at limit/window per
+    second, so it only runs dry when this process alone sees more than the
+    shared limit.
+    """
+
+    def __init__(self, max_keys: int):
+        self.max_keys = max_keys
+        self._lock = threading.Lock()
+        self._buckets: "OrderedDict[str, Tuple[float, float]]" = OrderedDict()
+
+    def take(self, key: str, rule: RateLimit) -> Optional[Decision]:
+        """
+        Take a token.
+
+        Returns:
+            None if a token was available, else the rejection
+        """
+        now = time.monotonic()
+        rate = rule.limit / rule.window
+        with self._lock:
+            tokens, updated = self._buckets.get(key, (float(rule.limit), now))
+            tokens = min(float(rule.limit), tokens + (now - updated) * rate)
+            if tokens >= 1:
+                self._buckets[key] = (tokens - 1, now)
+                rejection = None
+            else:
+                self._buckets[key] = (tokens, now)
+                wait = (1 - tokens) / rate
+                rejection = Decision(False, rule.limit, 0, time.time() + wait)
+            self._buckets.move_to_end(key)
+            while len(self._buckets) > self.max_keys:
+                self._buckets.popitem(last=False)
+        return rejection
+
+    def peek(self, key: str, rule: RateLimit) -> Optional[Decision]:
+        """
+        Check for a token without taking it.
+
+        Returns:
+            None if a token is available, else the rejection
+        """
+        now = time.monotonic()
+        rate = rule.limit / rule.window
+        with self._lock:
+            entry = self._buckets.get(key)
+        if entry is None:
+            return None
+        tokens, updated = entry
+        tokens = min(float(rule.limit), tokens + (now - updated) * rate)
+        if tokens >= 1:
+            return None
+        return Decision(False, rule.limit, 0, time.time() + (1 - tokens) / rate)
+
+
+class RateLimitMiddleware:
+    """
+    Pure ASGI middleware enforcing RATE_LIMIT_* per route category.
+    """
+
+    def __init__(self, app: ASGIApp, cache: AsyncCache = async_cache):
+        self.app = app
+        self.cache = cache
+        self.categories = limits()
+        self.local = LocalTokenBuckets(settings.RATE_LIMIT_LOCAL_MAX_KEYS)
+        self._script = cache.redis_client.register_script(SLIDING_WINDOW_SCRIPT)
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or not settings.RATE_LIMIT_ENABLED:
+            await self.app(scope, receive, send)
+            return
+        if scope["method"] == "OPTIONS":
+            await self.app(scope, receive, send)
+            return
+        headers = Headers(scope=scope)
+        rule = classify(
+            scope["path"], self.categories, scope["method"], headers.get("content-type", "")
+        )
+        if rule is None:
+            await self.app(scope, receive, send)
+            return
+
+        ip = client_ip(scope, headers)
+        token = bearer_token(headers) if rule.category != "auth" else None
+        decision, client = await self._precheck(rule, ip, token)
+        if decision is None:
+            decision = await self._check_redis(f"ratelimit:{rule.category}:{client}", rule)
+        if decision is not None and not decision.allowed:
+            await self._reject(scope, send, rule, decision)
+            return
+
+        if decision is None:
+            await self.app(scope, receive, send)
+            return
+
+        async def send_with_headers(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                MutableHeaders(scope=message).update(decision.headers())
+            await send(message)
+
+        await self.app(scope, receive, send_with_headers)
+
+    async def _precheck(
+        self, rule: RateLimit, ip: str, token: Optional[str]
+    ) -> Tuple[Optional[Decision], str]:
+        """
+        Local token buckets, then token verification only if they pass.
+
+        Returns:
+            (rejection or None, client key for the shared count)
+        """
+        prefix = f"ratelimit:{rule.category}"
+        if token is None:
+            return self.local.take(f"{prefix}:ip:{ip}", rule), f"ip:{ip}"
+        digest = token_digest(token)
+        rejection = self.local.take(f"{prefix}:token:{digest}", rule)
+        if rejection is None and not claims_cache.contains(digest):
+            # Made-up tokens are each new to the bucket above; stop verifying
+            # unknown tokens once this address has sent a limit's worth of
+            # bad ones (tokens already verified here still pass).
+            rejection = self.local.peek(f"{prefix}:invalid:{ip}", rule)
+        if rejection is not None:
+            return rejection, f"ip:{ip}"
+        payload = await verify_token_cached(token)
+        if payload and payload.get("sub"):
+            return None, f"user:{payload['sub']}"
+        return self.local.take(f"{prefix}:invalid:{ip}", rule), f"ip:{ip}"
+
+    async def _check_redis(self, key: str, rule: RateLimit) -> Optional[Decision]:
+        """Atomic check-and-record; None when Redis is unavailable (fail open)."""
+        try:
+            with self.cache.breaker.guard():
+                allowed, remaining, reset_ms = await self._script(
+                    keys=[key],
+                    args=[rule.window * 1000, rule.limit, uuid.uuid4().hex],
+                )
+        except CircuitOpenError:
+            return None
+        except Exception as e:
+            logger.warning("Rate limit check failed, allowing request: %s", e)
+            return None
+        return Decision(bool(allowed), rule.limit, int(remaining), int(reset_ms) / 1000)
+
+    async def _reject(self, scope: Scope, send: Send, rule: RateLimit, decision: Decision) -> None:
+        retry_after = max(1, math.ceil(decision.reset - time.time()))
+        body = orjson.dumps({
+            "error": {
+                "code": "RATE_LIMIT_EXCEEDED",
+                "message": "Rate limit exceeded. Please try again later.",
+                "details": {
+                    "limit": rule.limit,
+                    "window": f"{rule.window} seconds",
+                    "retryAfter": retry_after,
+                },
+            },
+            "timestamp": time.time(),
+            "path": scope["path"],
+        })
+        response_headers: List[Tuple[bytes, bytes]] = [
+            (b"content-type", b"application/json"),
+            (b"content-length", str(len(body)).encode()),
+            (b"retry-after", str(retry_after).encode()),
+            *[(name.lower().encode(), value.encode()) for name, value in decision.headers().items()],
+        ]
+        await send({"type": "http.response.start", "status": 429, "headers": response_headers})
+        await send({"type": "http.response.body", "body": body})
+
+
+def bearer_token(headers: Headers) -> Optional[str]:
+    """The request's bearer token, unverified."""
+    authorization = headers.get("authorization", "")
+    if authorization.startswith("Bearer ") and len(authorization) > len("Bearer "):
+        return authorization[len("Bearer "):]
+    return None
+
+
+def client_ip(scope: Scope, headers: Headers) -> str:
+    """
+    Client address, looking through RATE_LIMIT_PROXY_HOPS trusted proxies.
+
+    Each proxy appends the address it received the request from to
+    X-Forwarded-For, so the client is the entry that many places from the end;
+    anything before it can be forged.
+    """
+    hops = settings.RATE_LIMIT_PROXY_HOPS
+    if hops > 0:
+        forwarded = [part.strip() for part in headers.get("x-forwarded-for", "").split(",")]
+        forwarded = [part for part in forwarded if part]
+        if len(forwarded) >= hops:
+            return forwarded[-hops]
+    client = scope.get("client")
+    return client[0] if client else "unknown"
@@ -1,14 +1,34 @@
 """
 Security utilities for authentication and authorization.
 """
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, Callable, Tuple, TypeVar
 from jose import JWTError, jwt
 from passlib.context import CryptContext
 from app.config import settings
+from app.core.exceptions import RateLimitException
+from app.core.jwks import jwks_manager
 
-# Password hashing context
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+T = TypeVar("T")
+
+# Password hashing context. Hashes made with a different work factor are
+# flagged by needs_update() and rehashed on the next successful login.
+pwd_context = CryptContext(
+    schemes=["bcrypt"],
+    deprecated="auto",
+    bcrypt__rounds=settings.BCRYPT_ROUNDS,
+)
+
+# bcrypt releases the GIL, so hashes run in parallel on these threads. The
+# pool size caps the CPU spent on hashing; the semaphore caps calls queued
+# or running, beyond which callers wait up to PASSWORD_HASH_QUEUE_TIMEOUT.
+_hash_executor = ThreadPoolExecutor(
+    max_workers=settings.PASSWORD_HASH_WORKERS,
+    thread_name_prefix="password-hash",
+)
+_hash_slots = asyncio.Semaphore(settings.PASSWORD_HASH_MAX_PENDING)
 
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
@@ -38,6 +58,84 @@ def get_password_hash(password: str) -> str:
     return pwd_context.hash(password)
 
 
+def verify_and_update_password(
+    plain_password: str,
+    hashed_password: str
+) -> Tuple[bool, Optional[str]]:
+    """
+    Verify a password and rehash it if its hash is outdated.
+
+    Args:
+        plain_password: Plain text password
+        hashed_password: Stored hash
+
+    Returns:
+        (valid, new_hash): new_hash is set when the password is valid and
+        the stored hash needs an update (e.g. BCRYPT_ROUNDS changed); the
+        caller should store it
+    """
+    return pwd_context.verify_and_update(plain_password, hashed_password)
+
+
+async def _run_hashing(func: Callable[..., T], *args: Any) -> T:
+    """Run a hashing call on the bounded executor."""
+    # The flag, not the control flow, says whether the slot is ours: a timeout
+    # or cancellation can land right after acquire() succeeded.
+    acquired = False
+    try:
+        async with asyncio.timeout(settings.PASSWORD_HASH_QUEUE_TIMEOUT):
+            await _hash_slots.acquire()
+            acquired = True
+        return await asyncio.get_running_loop().run_in_executor(_hash_executor, func, *args)
+    except TimeoutError:
+        if acquired:
+            raise
+        raise RateLimitException(retry_after=1) from None
+    finally:
+        if acquired:
+            _hash_slots.release()
+
+
+async def verify_password_async(plain_password: str, hashed_password: str) -> bool:
+    """
+    verify_password off the event loop.
+
+    Raises:
+        RateLimitException: If too many hashing calls are already pending
+    """
+    return await _run_hashing(verify_password, plain_password, hashed_password)
+
+
+async def get_password_hash_async(password: str) -> str:
+    """
+    get_password_hash off the event loop.
+
+    Raises:
+        RateLimitException: If too many hashing calls are already pending
+    """
+    return await _run_hashing(get_password_hash, password)
+
+
+async def verify_and_update_password_async(
+    plain_password: str,
+    hashed_password: str
+) -> Tuple[bool, Optional[str]]:
+    """
+    verify_and_update_password off the event loop.
+
+    Usage at login:
+        valid, new_hash = await verify_and_update_password_async(password, user.password_hash)
+        if not valid:
+            raise InvalidCredentialsException()
+        if new_hash:
+            user.password_hash = new_hash
+
+    Raises:
+        RateLimitException: If too many hashing calls are already pending
+    """
+    return await _run_hashing(verify_and_update_password, plain_password, hashed_password)
+
+
 def create_access_token(
     data: Dict[str, Any],
     expires_delta: Optional[timedelta] = None
@@ -105,6 +203,9 @@ def verify_token(token: str) -> Optional[Dict[str, Any]]:
     """
     Verify and decode a JWT token.
 
+    Tokens signed with ALGORITHM are checked against SECRET_KEY; others
+    (e.g. Supabase RS256/ES256) against the JWKS keys, if JWKS_SOURCE is set.
+
     Args:
         token: JWT token to verify
 
@@ -112,16 +213,35 @@ def verify_token(token: str) -> Optional[Dict[str, Any]]:
         Decoded token payload or None if invalid
     """
     try:
-        payload = jwt.decode(
-            token,
-            settings.SECRET_KEY,
-            algorithms=[settings.ALGORITHM]
-        )
-        return payload
+        header = jwt.get_unverified_header(token)
+        if header.get("alg") == settings.ALGORITHM:
+            return jwt.decode(
+                token,
+                settings.SECRET_KEY,
+                algorithms=[settings.ALGORITHM]
+            )
+        return _verify_jwks_token(token, header)
     except JWTError:
         return None
 
 
+def _verify_jwks_token(token: str, header: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    """Verify an asymmetrically signed token against the JWKS keys."""
+    if jwks_manager is None:
+        return None
+    key = jwks_manager.get_key(header.get("kid"))
+    if key is None:
+        return None
+    # The key's own algorithm, never the one the token claims
+    return jwt.decode(
+        token,
+        key.key,
+        algorithms=[key.algorithm],
+        audience=settings.JWKS_AUDIENCE,
+        options={"verify_aud": settings.JWKS_AUDIENCE is not None},
+    )
+
+
 def decode_token(token: str) -> Optional[Dict[str, Any]]:
     """
     Decode a JWT token without verification (use with caution).
@@ -0,0 +1,132 @@
+"""
+Per-request latency breakdown.
+
+TimingMiddleware measures each request with perf_counter_ns and reports
+where the time went:
+
+    X-Process-Time: 0.012345
+    Server-Timing: db;dur=3.1;desc="4 queries", cache;dur=0.8,
+                   serialization;dur=0.4, total;dur=12.3
+
+Phases other than db (which comes from app.core.query_stats) are added up in
+a RequestTimings held in a contextvar: Redis calls through the cache circuit
+breaker count as cache, JSON rendering by TimedJSONResponse (orjson) as
+serialization, and callers wrap anything else in `timed(phase)`; such phases
+are reported only for requests that recorded them. Sync code run in the
+threadpool shares the request's RequestTimings, as with QueryStats.
+
+Headers go out with the response start, so for streaming responses the
+numbers cover the time to the first byte.
+
+Usage:
+    with timed("render"):
+        html = template.render(**context)
+"""
+import logging
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from typing import Any, Dict, Iterator, Optional
+
+from fastapi.responses import ORJSONResponse
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.core.query_stats import track_queries
+
+logger = logging.getLogger(__name__)
+
+# Reported in this order, zeros included, so every response has the same shape
+PHASES = ("cache", "serialization")
+
+_current: ContextVar[Optional["RequestTimings"]] = ContextVar("request_timings", default=None)
+
+
+@dataclass
+class RequestTimings:
+    """Time spent per phase in one request, in nanoseconds."""
+    phases: Dict[str, int] = field(default_factory=lambda: dict.fromkeys(PHASES, 0))
+
+    def add(self, phase: str, duration_ns: int) -> None:
+        self.phases[phase] = self.phases.get(phase, 0) + duration_ns
+
+    def ms(self, phase: str) -> float:
+        return self.phases.get(phase, 0) / 1e6
+
+
+def current_timings() -> Optional[RequestTimings]:
+    """RequestTimings of the running request, None outside of one."""
+    return _current.get()
+
+
+def record_phase(phase: str, duration_ns: int) -> None:
+    """Add time to a phase of the current request (no-op outside a request)."""
+    timings = _current.get()
+    if timings is not None:
+        timings.add(phase, duration_ns)
+
+
+@contextmanager
+def timed(phase: str) -> Iterator[None]:
+    """Count the enclosed block's wall time towards a phase."""
+    started = time.perf_counter_ns()
+    try:
+        yield
+    finally:
+        record_phase(phase, time.perf_counter_ns() - started)
+
+
+class TimedJSONResponse(ORJSONResponse):
+    """
+    The app's JSON response: orjson rendering, counted towards the
+    serialization phase.
+    """
+
+    def render(self, content: Any) -> bytes:
+        with timed("serialization"):
+            return super().render(content)
+
+
+class TimingMiddleware:
+    """
+    Pure ASGI middleware adding X-Process-Time and Server-Timing headers.
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        started = time.perf_counter_ns()
+        timings = RequestTimings()
+        token = _current.set(timings)
+        try:
+            with track_queries(f"{scope['method']} {scope['path']}") as query_stats:
+
+                async def send_with_timing(message: Message) -> None:
+                    if message["type"] == "http.response.start":
+                        elapsed_ns = time.perf_counter_ns() - started
+                        headers = MutableHeaders(scope=message)
+                        headers["X-Process-Time"] = str(elapsed_ns / 1e9)
+                        entries = [query_stats.server_timing()]
+                        entries += [f"{phase};dur={timings.ms(phase):.1f}" for phase in timings.phases]
+                        entries.append(f"total;dur={elapsed_ns / 1e6:.1f}")
+                        headers.append("Server-Timing", ", ".join(entries))
+                    await send(message)
+
+                await self.app(scope, receive, send_with_timing)
+        finally:
+            _current.reset(token)
+
+        if query_stats.count:
+            logger.debug(
+                "%s: %d queries in %.1f ms",
+                query_stats.label,
+                query_stats.count,
+                query_stats.total_ms,
+                extra=query_stats.log_fields(),
+            )
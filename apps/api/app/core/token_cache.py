@@ -0,0 +1,277 @@
+"""
+In-process cache of verified JWT claims.
+
+A token is verified (signature and expiry) the first time it is seen; its
+claims are then served from memory, keyed by the token's SHA-256 digest,
+until the token's own `exp`. Repeat requests with the same bearer token
+skip jwt.decode entirely.
+
+Revocation is stored in Redis (so it survives restarts and reaches
+processes that have not seen the token yet) and broadcast over pub/sub so
+every API process evicts the cached claims at once. Claims are only served
+from memory while the revocation listener is subscribed; otherwise every
+request is verified and checked against Redis.
+
+Usage:
+    payload = await verify_token_cached(token)
+    await revoke_token(token)             # logout
+    await revoke_user_tokens(user_id)     # logout everywhere / password change
+"""
+import asyncio
+import hashlib
+import json
+import logging
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Tuple
+
+from app.config import settings
+from app.core.cache import AsyncCache, async_cache
+from app.core.circuit_breaker import CircuitOpenError
+from app.core.security import verify_token
+
+logger = logging.getLogger(__name__)
+
+
+def token_digest(token: str) -> str:
+    """SHA-256 hex digest of a token; the raw token is never stored."""
+    return hashlib.sha256(token.encode()).hexdigest()
+
+
+def revoked_token_key(digest: str) -> str:
+    return f"auth:revoked:{digest}"
+
+
+def revoked_user_key(user_id: Any) -> str:
+    return f"auth:revoked-user:{user_id}"
+
+
+def is_revoked_by(claims: Dict[str, Any], cutoff: Any) -> bool:
+    """
+    Whether a user-wide revocation cutoff (whole epoch seconds) covers a token.
+
+    `iat` has one-second resolution, so only tokens issued in an earlier
+    second are revoked: tokens issued right after the revocation (e.g. the
+    new pair after a password change) must stay valid, at the cost of also
+    sparing tokens issued earlier in that same second.
+    """
+    return int(claims.get("iat", 0)) < int(float(cutoff))
+
+
+class TokenClaimsCache:
+    """
+    Bounded LRU of verified claims, each expiring at its token's `exp`.
+    """
+
+    def __init__(self, max_entries: int):
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[str, Tuple[float, Dict[str, Any]]]" = OrderedDict()
+        self._listeners = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    @property
+    def active(self) -> bool:
+        """Whether claims are served from memory (revocation listener subscribed)."""
+        return self._listeners > 0
+
+    def get(self, digest: str) -> Optional[Dict[str, Any]]:
+        """Claims for a token digest, None on a miss or after `exp`."""
+        if not self.active:
+            return None
+        with self._lock:
+            entry = self._entries.get(digest)
+            if entry is None or entry[0] <= time.time():
+                if entry is not None:
+                    del self._entries[digest]
+                self.misses += 1
+                return None
+            self._entries.move_to_end(digest)
+            self.hits += 1
+            return entry[1]
+
+    def contains(self, digest: str) -> bool:
+        """Whether unexpired claims are held for a digest (not counted as a lookup)."""
+        if not self.active:
+            return False
+        with self._lock:
+            entry = self._entries.get(digest)
+        return entry is not None and entry[0] > time.time()
+
+    def set(self, digest: str, claims: Dict[str, Any]) -> None:
+        """Store verified claims until their `exp` (epoch seconds)."""
+        if not self.active:
+            return
+        with self._lock:
+            self._entries[digest] = (float(claims["exp"]), claims)
+            self._entries.move_to_end(digest)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def evict(self, digest: str) -> None:
+        with self._lock:
+            self._entries.pop(digest, None)
+
+    def evict_user(self, user_id: str, cutoff: int) -> None:
+        """Evict a user's tokens revoked by a cutoff (see is_revoked_by)."""
+        with self._lock:
+            for digest in [
+                digest for digest, (_, claims) in self._entries.items()
+                if str(claims.get("sub")) == user_id and is_revoked_by(claims, cutoff)
+            ]:
+                del self._entries[digest]
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def listener_started(self) -> None:
+        with self._lock:
+            self._listeners += 1
+
+    def listener_stopped(self) -> None:
+        """Stop serving from memory and drop everything; revocations may be missed."""
+        with self._lock:
+            self._listeners = max(0, self._listeners - 1)
+            self._entries.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        """Counters for health checks and metrics."""
+        lookups = self.hits + self.misses
+        return {
+            "active": self.active,
+            "entries": len(self._entries),
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else None,
+        }
+
+    def apply_revocation(self, data: Any) -> None:
+        """Apply a revocation message received over pub/sub."""
+        try:
+            if isinstance(data, bytes):
+                data = data.decode()
+            message = json.loads(data)
+        except (ValueError, UnicodeDecodeError):
+            return
+        if "digest" in message:
+            self.evict(message["digest"])
+        if "user" in message:
+            self.evict_user(str(message["user"]), int(message.get("before", time.time())))
+
+
+claims_cache = TokenClaimsCache(settings.TOKEN_CACHE_MAX_ENTRIES)
+
+
+async def _is_revoked(digest: str, payload: Dict[str, Any]) -> bool:
+    """Check the Redis denylist (one MGET). Fails open if Redis is unavailable."""
+    revoked, revoked_before = await async_cache.get_many(
+        [revoked_token_key(digest), revoked_user_key(payload.get("sub"))]
+    )
+    if revoked:
+        return True
+    return revoked_before is not None and is_revoked_by(payload, revoked_before)
+
+
+async def verify_token_cached(token: str) -> Optional[Dict[str, Any]]:
+    """
+    verify_token with an in-process cache of verified, unrevoked claims.
+
+    Args:
+        token: JWT token to verify
+
+    Returns:
+        Decoded token payload (shared; do not modify) or None if invalid,
+        expired or revoked
+    """
+    if not settings.TOKEN_CACHE_ENABLED:
+        return verify_token(token)
+
+    digest = token_digest(token)
+    payload = claims_cache.get(digest)
+    if payload is not None:
+        return payload
+
+    payload = verify_token(token)
+    if payload is None or "exp" not in payload:
+        return payload
+    if await _is_revoked(digest, payload):
+        return None
+    claims_cache.set(digest, payload)
+    return payload
+
+
+async def _publish(cache: AsyncCache, message: Dict[str, Any]) -> None:
+    try:
+        with cache.breaker.guard():
+            await cache.redis_client.publish(
+                settings.TOKEN_REVOCATION_CHANNEL, json.dumps(message)
+            )
+    except CircuitOpenError:
+        pass
+    except Exception as e:
+        logger.warning("Token revocation publish error: %s", e)
+
+
+async def revoke_token(token: str) -> None:
+    """
+    Revoke one token (e.g. on logout) until it expires.
+
+    Args:
+        token: Access or refresh token
+    """
+    payload = verify_token(token)
+    if payload is None or "exp" not in payload:
+        return  # Invalid or expired already
+    digest = token_digest(token)
+    ttl = max(1, int(float(payload["exp"]) - time.time()))
+    await async_cache.set(revoked_token_key(digest), 1, expire=ttl)
+    claims_cache.evict(digest)
+    await _publish(async_cache, {"digest": digest})
+
+
+async def revoke_user_tokens(user_id: Any) -> None:
+    """
+    Revoke every token issued to a user before the current second (e.g. after a
+    password change).
+
+    Args:
+        user_id: Token subject
+    """
+    # Whole seconds, like iat; see is_revoked_by
+    cutoff = int(time.time())
+    # Long enough to outlive any token issued before now
+    ttl = settings.REFRESH_TOKEN_EXPIRE_DAYS * 86400
+    await async_cache.set(revoked_user_key(user_id), cutoff, expire=ttl)
+    claims_cache.evict_user(str(user_id), cutoff)
+    await _publish(async_cache, {"user": str(user_id), "before": cutoff})
+
+
+async def listen_for_revocations(cache: AsyncCache = async_cache) -> None:
+    """Apply revocation messages forever, resubscribing after errors."""
+    while True:
+        pubsub = cache.redis_client.pubsub(ignore_subscribe_messages=True)
+        subscribed = False
+        try:
+            await pubsub.subscribe(settings.TOKEN_REVOCATION_CHANNEL)
+            claims_cache.listener_started()
+            subscribed = True
+            while True:
+                # Poll with a timeout; see Cache._listen_for_invalidations
+                message = await pubsub.get_message(ignore_subscribe_messages=True, timeout=1.0)
+                if message is not None and message["type"] == "message":
+                    claims_cache.apply_revocation(message["data"])
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.warning("Token revocation listener error: %s", e)
+        finally:
+            if subscribed:
+                claims_cache.listener_stopped()
+            await pubsub.aclose()
+        await asyncio.sleep(1)
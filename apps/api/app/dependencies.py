@@ -1,14 +1,23 @@
 """
 Common FastAPI dependencies.
 """
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, AsyncGenerator, Generator
 from fastapi import Depends, Header
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
-from app.core.database import get_db
-from app.core.security import verify_token
-from app.core.cache import get_cache, Cache
+from app.core.database import (
+    AsyncSessionLocal,
+    SessionLocal,
+    get_db,
+    get_async_db,
+    open_async_read_session,
+    open_read_session,
+)
+from app.core.db_routing import USER_INFO_KEY
+from app.core.token_cache import verify_token_cached
+from app.core.cache import get_cache, AsyncCache
 from app.core.exceptions import (
     InvalidTokenException,
     TokenExpiredException,
@@ -38,7 +47,7 @@ async def get_current_user(
     token = credentials.credentials
 
     # Verify and decode token
-    payload = verify_token(token)
+    payload = await verify_token_cached(token)
 
     if payload is None:
         raise InvalidTokenException()
@@ -79,7 +88,7 @@ async def get_optional_user(
         return None
 
     token = authorization.replace("Bearer ", "")
-    payload = verify_token(token)
+    payload = await verify_token_cached(token)
 
     if payload is None:
         return None
@@ -103,8 +112,69 @@ def get_db_session() -> Session:
     return Depends(get_db)
 
 
-def get_cache_instance() -> Cache:
+def get_async_db_session() -> AsyncSession:
+    """
+    Get async database session.
+    Alias for get_async_db for clearer naming in route dependencies.
+    """
+    return Depends(get_async_db)
+
+
+def get_user_db(
+    current_user: Dict[str, Any] = Depends(get_current_user)
+) -> Generator[Session, None, None]:
+    """
+    Get a primary database session for a write on behalf of the current user.
+
+    Committed writes keep the user's reads (get_user_read_db) on the primary
+    for DB_READ_YOUR_WRITES_TTL seconds, so they see their own changes.
+    """
+    db = SessionLocal()
+    db.info[USER_INFO_KEY] = current_user["id"]
+    try:
+        yield db
+    finally:
+        db.close()
+
+
+async def get_async_user_db(
+    current_user: Dict[str, Any] = Depends(get_current_user)
+) -> AsyncGenerator[AsyncSession, None]:
+    """Async counterpart of get_user_db."""
+    async with AsyncSessionLocal() as db:
+        db.info[USER_INFO_KEY] = current_user["id"]
+        try:
+            yield db
+        except Exception:
+            await db.rollback()
+            raise
+
+
+def get_user_read_db(
+    current_user: Dict[str, Any] = Depends(get_current_user)
+) -> Generator[Session, None, None]:
+    """
+    Get a read-replica session for the current user.
+    Stays on the primary while the user is in a read-your-writes window.
+    """
+    db = open_read_session(current_user["id"])
+    try:
+        yield db
+    finally:
+        db.close()
+
+
+async def get_async_user_read_db(
+    current_user: Dict[str, Any] = Depends(get_current_user)
+) -> AsyncGenerator[AsyncSession, None]:
+    """Async counterpart of get_user_read_db."""
+    db = await open_async_read_session(current_user["id"])
+    async with db:
+        yield db
+
+
+def get_cache_instance() -> AsyncCache:
     """
-    Get cache instance.
+    Get async cache instance.
     """
     return Depends(get_cache)
@@ -3,16 +3,25 @@ Main FastAPI application.
 """
 from fastapi import FastAPI, Request, status
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
+from fastapi.responses import Response
+from fastapi.encoders import jsonable_encoder
 from fastapi.exceptions import RequestValidationError
 from contextlib import asynccontextmanager
+import asyncio
 import time
 import logging
 
 from app.config import settings
 from app.core.exceptions import AppException
-from app.core.database import engine
-from app.core.cache import cache
+from app.core.database import engine, async_engine
+from app.core.cache import async_cache, redis_breaker
+from app.core.timing import TimedJSONResponse, TimingMiddleware
+from app.core.compression import CompressionMiddleware
+from app.core.metrics import MetricsMiddleware, mark_process_dead, render_metrics
+from app.core.token_cache import claims_cache, listen_for_revocations
+from app.core.jwks import jwks_manager
+from app.core.rate_limit import RateLimitMiddleware
+from app.api.v1.routes import dashboard
 
 # Configure logging
 logging.basicConfig(
@@ -34,22 +43,45 @@ async def lifespan(app: FastAPI):
 
     # Test database connection
     try:
-        with engine.connect() as conn:
+        async with async_engine.connect() as conn:
             logger.info("✓ Database connection successful")
     except Exception as e:
         logger.error(f"✗ Database connection failed: {e}")
 
     # Test Redis connection
-    if cache.ping():
+    if await async_cache.ping():
         logger.info("✓ Redis connection successful")
     else:
         logger.warning("✗ Redis connection failed")
 
+    # Keep the in-process cache tier coherent with other replicas
+    async_cache.start_invalidation_listener()
+
+    # Load JWKS signing keys and keep them fresh in the background
+    if jwks_manager is not None:
+        await asyncio.to_thread(jwks_manager.start)
+
+    # Evict revoked tokens from the verified-claims cache
+    revocation_listener = None
+    if settings.TOKEN_CACHE_ENABLED:
+        revocation_listener = asyncio.create_task(listen_for_revocations())
+
     yield
 
     # Shutdown
     logger.info("Shutting down...")
+    if jwks_manager is not None:
+        jwks_manager.stop()
+    if revocation_listener is not None:
+        revocation_listener.cancel()
+        try:
+            await revocation_listener
+        except asyncio.CancelledError:
+            pass
+    await async_cache.close()
+    await async_engine.dispose()
     engine.dispose()
+    mark_process_dead()
 
 
 # Create FastAPI app
@@ -61,9 +93,14 @@ app = FastAPI(
     redoc_url="/redoc" if settings.DEBUG else None,
     openapi_url=f"{settings.API_V1_PREFIX}/openapi.json",
     lifespan=lifespan,
+    default_response_class=TimedJSONResponse,
 )
 
 
+# Rate limiting (added first so CORS headers wrap its 429 responses)
+app.add_middleware(RateLimitMiddleware)
+
+
 # CORS middleware
 app.add_middleware(
     CORSMiddleware,
@@ -71,25 +108,29 @@ app.add_middleware(
     allow_credentials=settings.CORS_ALLOW_CREDENTIALS,
     allow_methods=[settings.CORS_ALLOW_METHODS] if settings.CORS_ALLOW_METHODS == "*" else settings.CORS_ALLOW_METHODS.split(","),
     allow_headers=[settings.CORS_ALLOW_HEADERS] if settings.CORS_ALLOW_HEADERS == "*" else settings.CORS_ALLOW_HEADERS.split(","),
+    expose_headers=["X-RateLimit-Limit", "X-RateLimit-Remaining", "X-RateLimit-Reset", "Retry-After"],
 )
 
 
+# Response compression (inside timing, so compression time is included)
+if settings.COMPRESSION_ENABLED:
+    app.add_middleware(CompressionMiddleware)
+
+
 # Request timing middleware
-@app.middleware("http")
-async def add_process_time_header(request: Request, call_next):
-    """Add X-Process-Time header to all responses."""
-    start_time = time.time()
-    response = await call_next(request)
-    process_time = time.time() - start_time
-    response.headers["X-Process-Time"] = str(process_time)
-    return response
+app.add_middleware(TimingMiddleware)
+
+
+# Prometheus request metrics (outermost, so it sees the whole request)
+if settings.METRICS_ENABLED:
+    app.add_middleware(MetricsMiddleware)
 
 
 # Exception handlers
 @app.exception_handler(AppException)
 async def app_exception_handler(request: Request, exc: AppException):
     """Handle custom application exceptions."""
-    return JSONResponse(
+    return TimedJSONResponse(
         status_code=exc.status_code,
         content={
             "error": {
@@ -106,13 +147,13 @@ async def app_exception_handler(request: Request, exc: AppException):
 @app.exception_handler(RequestValidationError)
 async def validation_exception_handler(request: Request, exc: RequestValidationError):
     """Handle request validation errors."""
-    return JSONResponse(
+    return TimedJSONResponse(
         status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
         content={
             "error": {
                 "code": "VALIDATION_ERROR",
                 "message": "Request validation failed",
-                "details": exc.errors(),
+                "details": jsonable_encoder(exc.errors()),
             },
             "timestamp": time.time(),
             "path": request.url.path,
@@ -128,7 +169,7 @@ async def general_exception_handler(request: Request, exc: Exception):
     # Don't expose internal errors in production
     detail = str(exc) if settings.DEBUG else "Internal server error"
 
-    return JSONResponse(
+    return TimedJSONResponse(
         status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
         content={
             "error": {
@@ -167,22 +208,26 @@ async def health_check():
 
     # Check database
     try:
-        with engine.connect() as conn:
+        async with async_engine.connect() as conn:
             health_status["database"] = "connected"
     except Exception as e:
         health_status["status"] = "unhealthy"
         health_status["database"] = f"error: {str(e)}"
 
     # Check Redis
-    if cache.ping():
+    if await async_cache.ping():
         health_status["redis"] = "connected"
     else:
         health_status["status"] = "unhealthy"
         health_status["redis"] = "disconnected"
+    health_status["redis_circuit"] = redis_breaker.snapshot()
+    health_status["token_cache"] = claims_cache.stats()
+    if jwks_manager is not None:
+        health_status["jwks"] = jwks_manager.snapshot()
 
     status_code = status.HTTP_200_OK if health_status["status"] == "healthy" else status.HTTP_503_SERVICE_UNAVAILABLE
 
-    return JSONResponse(content=health_status, status_code=status_code)
+    return TimedJSONResponse(content=health_status, status_code=status_code)
 
 
 @app.get("/ping")
@@ -191,8 +236,20 @@ async def ping():
     return {"message": "pong"}
 
 
-# API routes will be included here
-# Example:
+@app.get("/metrics", include_in_schema=False)
+def metrics():
+    """
+    Prometheus metrics (all worker processes with PROMETHEUS_MULTIPROC_DIR).
+    Sync, so reading the metric files and the broker runs in the threadpool.
+    """
+    if not settings.METRICS_ENABLED:
+        return Response(status_code=status.HTTP_404_NOT_FOUND)
+    body, content_type = render_metrics()
+    return Response(content=body, media_type=content_type)
+
+
+# API routes
+app.include_router(dashboard.router, prefix=f"{settings.API_V1_PREFIX}/dashboard", tags=["dashboard"])
 # from app.api.v1.routes import auth, profile, jobs
 # app.include_router(auth.router, prefix=f"{settings.API_V1_PREFIX}/auth", tags=["auth"])
 # app.include_router(profile.router, prefix=f"{settings.API_V1_PREFIX}/profile", tags=["profile"])
@@ -7,9 +7,11 @@ This file is also used by Alembic for auto-generating migrations.
 from app.models.user import User
 from app.models.profile import UserProfile
 from app.models.project import Project
-from app.models.job import Job
+from app.models.job import Job, ArchivedJob
 from app.models.application import Application
+from app.models.application_stats import ApplicationStats
 from app.models.cv import GeneratedCV, CoverLetter
+from app.models.llm_usage import LLMUsage, LLMUsageFlush
 from app.models.template import CVTemplate, UserJobPreferences
 
 # Export all models
@@ -18,9 +20,13 @@ __all__ = [
     "UserProfile",
     "Project",
     "Job",
+    "ArchivedJob",
     "Application",
+    "ApplicationStats",
     "GeneratedCV",
     "CoverLetter",
+    "LLMUsage",
+    "LLMUsageFlush",
     "CVTemplate",
     "UserJobPreferences",
 ]
@@ -3,7 +3,7 @@ Application model for tracking job applications.
 """
 from sqlalchemy import Column, String, Date, DateTime, ForeignKey, Text, Index
 from sqlalchemy.dialects.postgresql import UUID, JSONB
-from sqlalchemy.orm import relationship
+from sqlalchemy.orm import column_property, relationship
 from datetime import datetime
 import uuid
 
@@ -17,11 +17,17 @@ class Application(Base):
     __tablename__ = "applications"
 
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
-    user_id = Column(
-        UUID(as_uuid=True),
-        ForeignKey("auth.users.id", ondelete="CASCADE"),
-        nullable=False,
-        index=True
+    # Columns counted in ApplicationStats use active_history: assigning to an
+    # expired attribute loads the value it replaces, so the stats listener
+    # knows what to decrement (see app.models.application_stats)
+    user_id = column_property(
+        Column(
+            UUID(as_uuid=True),
+            ForeignKey("auth.users.id", ondelete="CASCADE"),
+            nullable=False,
+            index=True
+        ),
+        active_history=True,
     )
     job_id = Column(
         UUID(as_uuid=True),
@@ -31,13 +37,16 @@ class Application(Base):
     )
 
     # Status Tracking
-    status = Column(
-        String(50),
-        default='draft',
-        nullable=False,
-        index=True
-    )  # draft, applied, interviewing, offered, rejected, accepted
-    applied_at = Column(DateTime(timezone=True))
+    status = column_property(
+        Column(
+            String(50),
+            default='draft',
+            nullable=False,
+            index=True
+        ),  # draft, applied, interviewing, offered, rejected, accepted
+        active_history=True,
+    )
+    applied_at = column_property(Column(DateTime(timezone=True)), active_history=True)
 
     # Application Materials
     cv_id = Column(UUID(as_uuid=True), ForeignKey("generated_cvs.id"))
@@ -46,7 +55,7 @@ class Application(Base):
     # Notes & Tracking
     notes = Column(Text)
     follow_up_date = Column(Date)
-    interview_dates = Column(JSONB)  # Array of interview schedule
+    interview_dates = column_property(Column(JSONB), active_history=True)  # Array of interview schedule
 
     # External Tracking
     external_application_id = Column(String(255))  # If applied through API
@@ -68,3 +77,11 @@ class Application(Base):
 
 # Create unique constraint on user_id and job_id
 Index('idx_applications_user_job', Application.user_id, Application.job_id, unique=True)
+
+# Keyset pagination of a user's applications, newest first
+Index(
+    'idx_applications_user_created',
+    Application.user_id,
+    Application.created_at.desc(),
+    Application.id.desc(),
+)
@@ -0,0 +1,192 @@
+"""
+Per-user application statistics, maintained incrementally.
+
+Every flush that inserts, updates or deletes Application rows adds the
+difference to the affected users' ApplicationStats row in the same
+transaction (INSERT ... ON CONFLICT DO UPDATE SET n = n + delta), so the
+counters commit or roll back together with the applications themselves.
+
+Writes that bypass the ORM unit of work (bulk/Core UPDATE or DELETE, FK
+cascades in the database) and in-place mutation of interview_dates are not
+seen; app.services.application_stats.repair_application_stats recomputes
+the rows from the applications table.
+"""
+from collections import defaultdict
+from datetime import date, datetime, timezone
+from typing import Any, Dict, Optional
+
+from sqlalchemy import Column, Integer, Float, DateTime, ForeignKey, event, func, inspect
+from sqlalchemy.dialects.postgresql import UUID, insert
+from sqlalchemy.orm import Session
+
+from app.core.database import Base
+from app.models.application import Application
+
+STATUSES = ("draft", "applied", "interviewing", "offered", "rejected", "accepted")
+
+# Application attributes the statistics are derived from
+_TRACKED = ("user_id", "status", "applied_at", "interview_dates")
+
+
+class ApplicationStats(Base):
+    """
+    Application counters of one user, read by primary key.
+    """
+    __tablename__ = "application_stats"
+
+    user_id = Column(
+        UUID(as_uuid=True),
+        ForeignKey("auth.users.id", ondelete="CASCADE"),
+        primary_key=True
+    )
+
+    # Status breakdown
+    total = Column(Integer, nullable=False, default=0, server_default="0")
+    draft = Column(Integer, nullable=False, default=0, server_default="0")
+    applied = Column(Integer, nullable=False, default=0, server_default="0")
+    interviewing = Column(Integer, nullable=False, default=0, server_default="0")
+    offered = Column(Integer, nullable=False, default=0, server_default="0")
+    rejected = Column(Integer, nullable=False, default=0, server_default="0")
+    accepted = Column(Integer, nullable=False, default=0, server_default="0")
+
+    # Funnel timing: applications with both applied_at and an interview date
+    interviews_tracked = Column(Integer, nullable=False, default=0, server_default="0")
+    days_to_interview_sum = Column(Float, nullable=False, default=0, server_default="0")
+
+    updated_at = Column(DateTime(timezone=True), nullable=False, default=datetime.utcnow, server_default=func.now())
+
+    @property
+    def status_counts(self) -> Dict[str, int]:
+        return {status: getattr(self, status) for status in STATUSES}
+
+    @property
+    def avg_days_to_interview(self) -> Optional[float]:
+        if not self.interviews_tracked:
+            return None
+        return self.days_to_interview_sum / self.interviews_tracked
+
+    def __repr__(self):
+        return f"<ApplicationStats(user_id={self.user_id}, total={self.total})>"
+
+
+# Counter columns, i.e. everything contributions are added to
+COUNTERS = ("total", *STATUSES, "interviews_tracked", "days_to_interview_sum")
+
+
+def _as_utc(value: Any) -> Optional[datetime]:
+    if isinstance(value, str):
+        try:
+            value = datetime.fromisoformat(value)
+        except ValueError:
+            return None
+    if isinstance(value, date) and not isinstance(value, datetime):
+        value = datetime(value.year, value.month, value.day)
+    if not isinstance(value, datetime):
+        return None
+    return value if value.tzinfo else value.replace(tzinfo=timezone.utc)
+
+
+def first_interview_at(interview_dates: Any) -> Optional[datetime]:
+    """
+    Earliest interview in an Application.interview_dates list.
+
+    Entries are ISO 8601 strings or objects with a "date" or "scheduled_at"
+    key; entries that cannot be parsed are ignored.
+    """
+    if not isinstance(interview_dates, list):
+        return None
+    found = []
+    for entry in interview_dates:
+        if isinstance(entry, dict):
+            entry = entry.get("date") or entry.get("scheduled_at")
+        moment = _as_utc(entry)
+        if moment is not None:
+            found.append(moment)
+    return min(found) if found else None
+
+
+def contribution(status: Optional[str], applied_at: Any, interview_dates: Any) -> Dict[str, float]:
+    """What one application adds to its user's counters."""
+    delta: Dict[str, float] = {"total": 1}
+    status = status or "draft"  # Column default, not yet applied to pending objects
+    if status in STATUSES:
+        delta[status] = 1
+    applied = _as_utc(applied_at)
+    interview = first_interview_at(interview_dates)
+    if applied is not None and interview is not None and interview >= applied:
+        delta["interviews_tracked"] = 1
+        delta["days_to_interview_sum"] = (interview - applied).total_seconds() / 86400
+    return delta
+
+
+def _old_value(application: Application, key: str) -> Any:
+    history = inspect(application).attrs[key].history
+    if history.deleted:
+        return history.deleted[0]
+    if history.unchanged:
+        return history.unchanged[0]
+    return getattr(application, key)
+
+
+def _previous(application: Application) -> Dict[str, float]:
+    return contribution(
+        _old_value(application, "status"),
+        _old_value(application, "applied_at"),
+        _old_value(application, "interview_dates"),
+    )
+
+
+def _current(application: Application) -> Dict[str, float]:
+    return contribution(application.status, application.applied_at, application.interview_dates)
+
+
+def _add(deltas: Dict[Any, Dict[str, float]], user_id: Any, values: Dict[str, float], sign: int):
+    if user_id is None:
+        return
+    for name, value in values.items():
+        deltas[user_id][name] = deltas[user_id].get(name, 0) + sign * value
+
+
+def upsert_increments(session: Session, user_id: Any, delta: Dict[str, float]) -> None:
+    """Add delta to a user's counters, creating the row if needed."""
+    stmt = insert(ApplicationStats).values(user_id=user_id, updated_at=func.now(), **delta)
+    table = ApplicationStats.__table__
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[table.c.user_id],
+        set_={
+            **{name: table.c[name] + stmt.excluded[name] for name in delta},
+            "updated_at": func.now(),
+        },
+    )
+    session.execute(stmt)
+
+
+@event.listens_for(Session, "before_flush")
+def _track_application_changes(session: Session, flush_context: Any, instances: Any) -> None:
+    """Turn pending Application changes into counter increments."""
+    deltas: Dict[Any, Dict[str, float]] = defaultdict(dict)
+
+    for obj in session.new:
+        if isinstance(obj, Application):
+            user_id = obj.user_id if obj.user_id is not None else getattr(obj.user, "id", None)
+            _add(deltas, user_id, _current(obj), 1)
+
+    for obj in session.dirty:
+        if not isinstance(obj, Application):
+            continue
+        state = inspect(obj)
+        if not any(state.attrs[key].history.has_changes() for key in _TRACKED):
+            continue
+        _add(deltas, _old_value(obj, "user_id"), _previous(obj), -1)
+        _add(deltas, obj.user_id, _current(obj), 1)
+
+    for obj in session.deleted:
+        if isinstance(obj, Application):
+            _add(deltas, _old_value(obj, "user_id"), _previous(obj), -1)
+
+    # Fixed order so concurrent flushes lock stats rows consistently
+    for user_id in sorted(deltas, key=str):
+        delta = {name: value for name, value in deltas[user_id].items() if value}
+        if delta:
+            upsert_increments(session, user_id, delta)
+
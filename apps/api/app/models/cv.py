@@ -1,7 +1,7 @@
 """
 Generated CV model for AI-generated CVs.
 """
-from sqlalchemy import Column, String, Integer, Boolean, DateTime, ForeignKey, Text
+from sqlalchemy import Column, String, Integer, Boolean, DateTime, ForeignKey, Text, Index
 from sqlalchemy.dialects.postgresql import UUID, JSONB, ARRAY
 from sqlalchemy.orm import relationship
 from datetime import datetime
@@ -97,3 +97,12 @@ class CoverLetter(Base):
 
     def __repr__(self):
         return f"<CoverLetter(id={self.id}, user_id={self.user_id}, tone={self.tone})>"
+
+
+# Keyset pagination of a user's CVs, newest first
+Index(
+    'idx_generated_cvs_user_created',
+    GeneratedCV.user_id,
+    GeneratedCV.created_at.desc(),
+    GeneratedCV.id.desc(),
+)
@@ -1,9 +1,10 @@
 """
 Job model for scraped job postings.
 """
-from sqlalchemy import Column, String, Integer, Float, Boolean, DateTime, Text, Index
-from sqlalchemy.dialects.postgresql import UUID, JSONB, ARRAY
-from sqlalchemy.orm import relationship
+from sqlalchemy import Column, String, Integer, Float, Boolean, DateTime, Text, Index, Computed
+from sqlalchemy import DDL, event, func
+from sqlalchemy.dialects.postgresql import UUID, JSONB, ARRAY, TSVECTOR
+from sqlalchemy.orm import relationship, deferred
 from datetime import datetime
 import uuid
 
@@ -57,6 +58,19 @@ class Job(Base):
     parsed_requirements = Column(JSONB)  # Structured extraction of requirements
     relevance_score = Column(Float)  # Match score with user profile
 
+    # Full-text search document, maintained by Postgres (title > company/skills > description).
+    # Deferred so regular job queries don't load it.
+    search_vector = deferred(Column(
+        TSVECTOR,
+        Computed(
+            "setweight(to_tsvector('english', coalesce(title, '')), 'A') || "
+            "setweight(to_tsvector('english', coalesce(company, '') || ' ' || "
+            "coalesce(immutable_array_to_string(required_skills, ' '), '')), 'B') || "
+            "setweight(to_tsvector('english', coalesce(description, '')), 'C')",
+            persisted=True,
+        ),
+    ))
+
     # Timestamps
     created_at = Column(DateTime(timezone=True), nullable=False, default=datetime.utcnow)
     updated_at = Column(DateTime(timezone=True), nullable=False, default=datetime.utcnow, onupdate=datetime.utcnow)
@@ -70,11 +84,46 @@ class Job(Base):
 
 # Create indexes
 Index('idx_jobs_external_source', Job.external_id, Job.source, unique=True)
-Index('idx_jobs_posted_date', Job.posted_date.desc())
+Index('idx_jobs_posted_date', Job.posted_date.desc(), Job.id.desc())  # Keyset pagination order
 Index('idx_jobs_skills', Job.required_skills, postgresql_using='gin')
 Index('idx_jobs_title_company', Job.title, Job.company)
+Index('idx_jobs_fts', Job.search_vector, postgresql_using='gin')
+# Expiry sweeper lookups (see app.services.job_archive)
+Index('idx_jobs_active_expires', Job.expires_at, postgresql_where=Job.is_active)
+Index('idx_jobs_inactive_updated', Job.updated_at, postgresql_where=~Job.is_active)
+
+
+class ArchivedJob(Base):
+    """
+    Cold copy of an inactive job moved out of the jobs table.
+
+    The full row is kept as a JSON document in `data`; a few columns are
+    copied out for inspection. Read through app.services.job_archive.get_job.
+    """
+    __tablename__ = "jobs_archive"
 
-# Full-text search index will be created in migration
-# CREATE INDEX idx_jobs_fts ON jobs USING GIN(
-#   to_tsvector('english', title || ' ' || company || ' ' || description)
-# );
+    id = Column(UUID(as_uuid=True), primary_key=True)
+    external_id = Column(String(255))
+    source = Column(String(50), nullable=False)
+    title = Column(String(255), nullable=False)
+    company = Column(String(255), nullable=False)
+    posted_date = Column(DateTime(timezone=True))
+    expires_at = Column(DateTime(timezone=True))
+    data = Column(JSONB, nullable=False)  # to_jsonb() of the jobs row, without search_vector
+    archived_at = Column(DateTime(timezone=True), nullable=False, server_default=func.now())
+
+    def __repr__(self):
+        return f"<ArchivedJob(id={self.id}, title={self.title}, company={self.company})>"
+
+
+# search_vector depends on this wrapper (array_to_string itself is not IMMUTABLE).
+# Created by the 6160ff3dd928 migration; also needed for init_db().
+event.listen(
+    Job.__table__,
+    "before_create",
+    DDL(
+        "CREATE OR REPLACE FUNCTION immutable_array_to_string(text[], text) "
+        "RETURNS text LANGUAGE sql IMMUTABLE PARALLEL SAFE "
+        "AS $$ SELECT array_to_string($1, $2) $$"
+    ),
+)
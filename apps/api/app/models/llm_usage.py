@@ -0,0 +1,68 @@
+"""
+LLM token usage per user, day, provider and model.
+
+Rows are written only by the periodic flush in app.services.ai.usage, which
+adds batched Redis counters (INSERT ... ON CONFLICT DO UPDATE SET n = n + delta);
+live budget checks read the Redis counters, not this table. Each flushed
+batch is recorded in llm_usage_flushes in the same transaction, so a batch
+is never added twice.
+"""
+from datetime import datetime
+
+from sqlalchemy import Column, String, Integer, BigInteger, Date, DateTime, ForeignKey, Index, func
+from sqlalchemy.dialects.postgresql import UUID
+
+from app.core.database import Base
+
+
+class LLMUsage(Base):
+    """
+    Tokens one user spent on one model in one (UTC) day.
+    """
+    __tablename__ = "llm_usage"
+
+    user_id = Column(
+        UUID(as_uuid=True),
+        ForeignKey("auth.users.id", ondelete="CASCADE"),
+        primary_key=True
+    )
+    day = Column(Date, primary_key=True)
+    provider = Column(String(20), primary_key=True)  # "openai", "anthropic"
+    model = Column(String(100), primary_key=True)
+
+    input_tokens = Column(BigInteger, nullable=False, default=0, server_default="0")
+    output_tokens = Column(BigInteger, nullable=False, default=0, server_default="0")
+    requests = Column(Integer, nullable=False, default=0, server_default="0")
+
+    updated_at = Column(DateTime(timezone=True), nullable=False, default=datetime.utcnow, server_default=func.now())
+
+    __table_args__ = (
+        # Top consumers over a date range
+        Index("idx_llm_usage_day", "day"),
+    )
+
+    @property
+    def total_tokens(self) -> int:
+        return self.input_tokens + self.output_tokens
+
+    def __repr__(self):
+        return f"<LLMUsage(user_id={self.user_id}, day={self.day}, model={self.model})>"
+
+
+class LLMUsageFlush(Base):
+    """
+    A Redis usage batch already added to llm_usage.
+    """
+    __tablename__ = "llm_usage_flushes"
+
+    batch_id = Column(String(32), primary_key=True)
+    rows = Column(Integer, nullable=False)
+    flushed_at = Column(DateTime(timezone=True), nullable=False, default=datetime.utcnow, server_default=func.now())
+
+    __table_args__ = (
+        # Pruning old records
+        Index("idx_llm_usage_flushes_flushed_at", "flushed_at"),
+    )
+
+    def __repr__(self):
+        return f"<LLMUsageFlush(batch_id={self.batch_id}, rows={self.rows})>"
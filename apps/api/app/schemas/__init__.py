@@ -21,6 +21,16 @@ from app.schemas.project import (
     ProjectUpdate,
     ProjectResponse,
 )
+from app.schemas.pagination import CursorPage
+from app.schemas.dashboard import (
+    DashboardProfile,
+    DashboardProject,
+    DashboardJob,
+    DashboardApplication,
+    DashboardDocument,
+    DashboardStats,
+    DashboardResponse,
+)
 
 __all__ = [
     # User schemas
@@ -40,4 +50,14 @@ __all__ = [
     "ProjectCreate",
     "ProjectUpdate",
     "ProjectResponse",
+    # Pagination
+    "CursorPage",
+    # Dashboard schemas
+    "DashboardProfile",
+    "DashboardProject",
+    "DashboardJob",
+    "DashboardApplication",
+    "DashboardDocument",
+    "DashboardStats",
+    "DashboardResponse",
 ]
@@ -0,0 +1,90 @@
+"""
+Pydantic schemas for the dashboard bootstrap payload.
+"""
+from pydantic import BaseModel, UUID4
+from typing import Optional, List, Dict
+from datetime import date, datetime
+
+
+class DashboardProfile(BaseModel):
+    """Profile fields shown on the dashboard."""
+    id: UUID4
+    full_name: str
+    location: Optional[str] = None
+    target_roles: Optional[List[str]] = None
+    desired_salary_min: Optional[int] = None
+    desired_salary_max: Optional[int] = None
+
+    model_config = {"from_attributes": True}
+
+
+class DashboardProject(BaseModel):
+    """Project summary."""
+    id: UUID4
+    title: str
+    description: Optional[str] = None
+    technologies: Optional[List[str]] = None
+    is_featured: bool = False
+
+    model_config = {"from_attributes": True}
+
+
+class DashboardJob(BaseModel):
+    """Job summary, without the description."""
+    id: UUID4
+    title: str
+    company: str
+    company_logo_url: Optional[str] = None
+    location: Optional[str] = None
+    remote_type: Optional[str] = None
+    source_url: str
+    posted_date: Optional[datetime] = None
+    is_active: Optional[bool] = None
+
+    model_config = {"from_attributes": True}
+
+
+class DashboardApplication(BaseModel):
+    """Application summary with its job."""
+    id: UUID4
+    status: str
+    applied_at: Optional[datetime] = None
+    follow_up_date: Optional[date] = None
+    cv_id: Optional[UUID4] = None
+    cover_letter_id: Optional[UUID4] = None
+    updated_at: datetime
+    job: DashboardJob
+
+    model_config = {"from_attributes": True}
+
+
+class DashboardDocument(BaseModel):
+    """Generated CV or cover letter summary (content is fetched separately)."""
+    id: UUID4
+    job_id: Optional[UUID4] = None
+    ai_model: Optional[str] = None
+    created_at: datetime
+
+    model_config = {"from_attributes": True}
+
+
+class DashboardStats(BaseModel):
+    """Application counters, maintained on every write."""
+    total: int = 0
+    status_counts: Dict[str, int] = {}
+    interviews_tracked: int = 0
+    avg_days_to_interview: Optional[float] = None
+
+    model_config = {"from_attributes": True}
+
+
+class DashboardResponse(BaseModel):
+    """Everything the frontend needs after login, in one payload."""
+    user_id: UUID4
+    email: str
+    profile: Optional[DashboardProfile] = None
+    projects: List[DashboardProject] = []
+    applications: List[DashboardApplication] = []
+    stats: DashboardStats = DashboardStats()
+    generated_cvs: List[DashboardDocument] = []
+    cover_letters: List[DashboardDocument] = []
@@ -0,0 +1,20 @@
+"""
+Pydantic schemas for cursor-paginated responses.
+"""
+from pydantic import BaseModel
+from typing import Generic, List, Optional, TypeVar
+
+T = TypeVar("T")
+
+
+class CursorPage(BaseModel, Generic[T]):
+    """
+    One page of a keyset-paginated listing.
+
+    Pass next_cursor/prev_cursor back as the `cursor` query parameter;
+    they are null at either end of the listing.
+    """
+    items: List[T]
+    next_cursor: Optional[str] = None
+    prev_cursor: Optional[str] = None
+    total_estimate: Optional[int] = None  # Planner estimate, not an exact count
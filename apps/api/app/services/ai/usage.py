@@ -0,0 +1,417 @@
+"""
+LLM token accounting and per-user budgets.
+
+Every generation records its input and output tokens in Redis with one
+MULTI/EXEC round trip:
+
+    llm:usage:<user>:day:<YYYY-MM-DD>   total tokens today (UTC), read by budget checks
+    llm:usage:<user>:month:<YYYY-MM>    total tokens this month
+    llm:usage:pending                   hash of per (user, day, provider, model) deltas
+
+flush_usage (Celery beat, every LLM_USAGE_FLUSH_INTERVAL seconds) renames the
+pending hash aside and adds it to the llm_usage table in one transaction, so
+Postgres sees one upsert per user and model per interval rather than one
+write per generation. A failed flush leaves the renamed hash in place and the
+next run retries it before taking new deltas. The renamed hash carries a
+batch id that is recorded in llm_usage_flushes in the same transaction, so a
+batch whose commit succeeded but whose Redis copy could not be deleted is
+dropped on the retry instead of being added twice.
+
+Budgets are checked when a generation is queued, before any provider call:
+past LLM_BUDGET_DOWNGRADE_RATIO of the daily or monthly budget the request
+is switched to the provider's economy model; at the budget it is refused.
+The check reads the live Redis counters and fails open if Redis is down.
+
+Usage:
+    await enqueue_generation(generate_cv_task, user_id, job_id, options)  # may raise
+    record_usage(user_id, "openai", "gpt-4o", input_tokens, output_tokens)  # in the worker
+    top_consumers(db, since=date.today().replace(day=1))
+"""
+import logging
+import uuid
+from dataclasses import dataclass
+from datetime import date, datetime, time, timedelta, timezone
+from typing import Any, Dict, List, Optional, Tuple
+
+from sqlalchemy import delete, func, select
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from app.config import settings
+from app.core.cache import async_cache, cache
+from app.core.circuit_breaker import CircuitOpenError
+from app.core.exceptions import TokenBudgetExceededException
+from app.models.llm_usage import LLMUsage, LLMUsageFlush
+from app.models.user import User
+
+logger = logging.getLogger(__name__)
+
+PENDING_KEY = "llm:usage:pending"
+FLUSHING_KEY = "llm:usage:flushing"
+FLUSH_LOCK_KEY = "llm:usage:flush-lock"
+BATCH_FIELD = "batch"  # Field of FLUSHING_KEY holding the batch id
+
+# How long applied batch ids are kept (far longer than any retry takes)
+_FLUSH_RECORD_TTL = timedelta(days=7)
+
+# Counter lifetimes: long enough to outlast their period
+_DAY_TTL = 2 * 86400
+_MONTH_TTL = 32 * 86400
+
+# Pending hash field suffixes -> llm_usage columns
+_FIELDS = {"in": "input_tokens", "out": "output_tokens", "n": "requests"}
+
+
+def _now() -> datetime:
+    return datetime.now(timezone.utc)
+
+
+def day_key(user_id: Any, day: date) -> str:
+    return f"llm:usage:{user_id}:day:{day.isoformat()}"
+
+
+def month_key(user_id: Any, day: date) -> str:
+    return f"llm:usage:{user_id}:month:{day:%Y-%m}"
+
+
+def default_model(provider: str) -> str:
+    return settings.ANTHROPIC_DEFAULT_MODEL if provider == "anthropic" else settings.OPENAI_DEFAULT_MODEL
+
+
+def economy_model(provider: str) -> str:
+    return settings.ANTHROPIC_ECONOMY_MODEL if provider == "anthropic" else settings.OPENAI_ECONOMY_MODEL
+
+
+def record_usage(
+    user_id: Any,
+    provider: str,
+    model: str,
+    input_tokens: int,
+    output_tokens: int,
+) -> None:
+    """
+    Record the tokens of one completed LLM call.
+
+    Called from the generation workers. If Redis is unavailable the usage is
+    logged and dropped rather than failing the generation.
+
+    Args:
+        user_id: User the generation was for
+        provider: "openai" or "anthropic"
+        model: Model that served the call
+        input_tokens: Prompt tokens reported by the provider
+        output_tokens: Completion tokens reported by the provider
+    """
+    today = _now().date()
+    total = input_tokens + output_tokens
+    field = f"{user_id}|{today.isoformat()}|{provider}|{model}"
+    try:
+        with cache.breaker.guard():
+            pipe = cache.redis_client.pipeline(transaction=True)
+            pipe.incrby(day_key(user_id, today), total)
+            pipe.expire(day_key(user_id, today), _DAY_TTL)
+            pipe.incrby(month_key(user_id, today), total)
+            pipe.expire(month_key(user_id, today), _MONTH_TTL)
+            pipe.hincrby(PENDING_KEY, f"{field}|in", input_tokens)
+            pipe.hincrby(PENDING_KEY, f"{field}|out", output_tokens)
+            pipe.hincrby(PENDING_KEY, f"{field}|n", 1)
+            pipe.execute()
+    except Exception as e:
+        logger.warning(
+            "Dropped LLM usage for user %s (%s %s, %d tokens): %s",
+            user_id, provider, model, total, e,
+        )
+
+
+def _parse_pending(raw: Dict[bytes, bytes]) -> Dict[Tuple[uuid.UUID, date, str, str], Dict[str, int]]:
+    rows: Dict[Tuple[uuid.UUID, date, str, str], Dict[str, int]] = {}
+    for field, value in raw.items():
+        if field == BATCH_FIELD.encode():
+            continue
+        try:
+            # A field Postgres would reject must not block every later flush
+            user_id, day, provider, model, suffix = field.decode().split("|")
+            key = (uuid.UUID(user_id), date.fromisoformat(day), provider, model)
+            row = rows.setdefault(key, {})
+            row[_FIELDS[suffix]] = int(value)
+        except (ValueError, KeyError, UnicodeDecodeError):
+            logger.warning("Skipping malformed LLM usage field %r", field)
+    return rows
+
+
+def _upsert(rows: List[Dict[str, Any]]):
+    stmt = insert(LLMUsage).values(rows)
+    table = LLMUsage.__table__
+    return stmt.on_conflict_do_update(
+        index_elements=[table.c.user_id, table.c.day, table.c.provider, table.c.model],
+        set_={
+            **{name: table.c[name] + stmt.excluded[name] for name in _FIELDS.values()},
+            "updated_at": func.now(),
+        },
+    )
+
+
+def _claim_batch(redis_client) -> Optional[Tuple[str, Dict[bytes, bytes]]]:
+    """
+    Move pending deltas aside and tag them with a batch id (lock held).
+
+    Returns:
+        (batch id, raw hash), or None if there is nothing to flush
+    """
+    # A leftover FLUSHING_KEY is a failed run's batch: flush it first
+    if not redis_client.exists(FLUSHING_KEY):
+        if not redis_client.exists(PENDING_KEY):
+            return None
+        redis_client.rename(PENDING_KEY, FLUSHING_KEY)
+    # HSETNX keeps the id of a retried batch
+    redis_client.hsetnx(FLUSHING_KEY, BATCH_FIELD, uuid.uuid4().hex)
+    raw = redis_client.hgetall(FLUSHING_KEY)
+    return raw[BATCH_FIELD.encode()].decode(), raw
+
+
+def flush_usage(db: Session, batch_size: Optional[int] = None) -> int:
+    """
+    Move pending usage deltas from Redis into the llm_usage table.
+
+    Runs under a Redis lock so overlapping runs never add the same deltas
+    twice. All rows are committed in one transaction together with the
+    batch id; the Redis copy is deleted only after the commit, and a batch
+    whose id is already recorded is deleted without being added again.
+    Redis calls go through the cache circuit breaker; while it is open the
+    run is skipped.
+
+    Args:
+        db: Database session (primary)
+        batch_size: Rows per upsert statement (default LLM_USAGE_FLUSH_BATCH_SIZE)
+
+    Returns:
+        Number of (user, day, provider, model) rows written
+    """
+    batch_size = batch_size or settings.LLM_USAGE_FLUSH_BATCH_SIZE
+    redis_client = cache.redis_client
+    lock = redis_client.lock(FLUSH_LOCK_KEY, timeout=max(60, settings.LLM_USAGE_FLUSH_INTERVAL * 5))
+    try:
+        with cache.breaker.guard():
+            if not lock.acquire(blocking=False):
+                return 0
+    except CircuitOpenError:
+        return 0
+    try:
+        with cache.breaker.guard():
+            claimed = _claim_batch(redis_client)
+        if claimed is None:
+            return 0
+        batch_id, raw = claimed
+        parsed = _parse_pending(raw)
+        rows = [
+            {"user_id": user_id, "day": day, "provider": provider, "model": model,
+             **{name: counts.get(name, 0) for name in _FIELDS.values()}}
+            for (user_id, day, provider, model), counts in sorted(parsed.items())
+        ]
+        try:
+            recorded = db.execute(
+                insert(LLMUsageFlush)
+                .values(batch_id=batch_id, rows=len(rows))
+                .on_conflict_do_nothing(index_elements=[LLMUsageFlush.batch_id])
+                .returning(LLMUsageFlush.batch_id)
+            ).first()
+            if recorded is None:
+                logger.warning("LLM usage batch %s was already flushed, dropping it", batch_id)
+                db.rollback()
+                rows = []
+            else:
+                for start in range(0, len(rows), batch_size):
+                    db.execute(_upsert(rows[start:start + batch_size]))
+                db.execute(
+                    delete(LLMUsageFlush).where(LLMUsageFlush.flushed_at < _now() - _FLUSH_RECORD_TTL)
+                )
+                db.commit()
+        except Exception:
+            db.rollback()
+            raise
+        try:
+            with cache.breaker.guard():
+                redis_client.delete(FLUSHING_KEY)
+        except Exception as e:
+            # Committed: the next run finds the batch id recorded and drops it
+            logger.warning("Could not delete flushed LLM usage batch %s: %s", batch_id, e)
+        return len(rows)
+    finally:
+        try:
+            with cache.breaker.guard():
+                lock.release()
+        except Exception:
+            pass  # Expired meanwhile, or Redis unavailable (the lock times out)
+
+
+@dataclass
+class BudgetDecision:
+    """Provider and model a generation may run with."""
+    provider: str
+    model: str
+    downgraded: bool
+    daily_used: int
+    monthly_used: int
+
+
+def _seconds_until(moment: datetime) -> int:
+    return max(1, int((moment - _now()).total_seconds()))
+
+
+def _next_day(today: date) -> datetime:
+    return datetime.combine(today + timedelta(days=1), time.min, tzinfo=timezone.utc)
+
+
+def _next_month(today: date) -> datetime:
+    first = (today.replace(day=1) + timedelta(days=32)).replace(day=1)
+    return datetime.combine(first, time.min, tzinfo=timezone.utc)
+
+
+async def get_token_usage(user_id: Any) -> Tuple[int, int]:
+    """
+    Tokens a user has spent today and this month (one MGET).
+
+    Returns:
+        (daily, monthly); zeros if Redis is unavailable
+    """
+    today = _now().date()
+    try:
+        with async_cache.breaker.guard():
+            daily, monthly = await async_cache.redis_client.mget(
+                [day_key(user_id, today), month_key(user_id, today)]
+            )
+    except CircuitOpenError:
+        return 0, 0
+    except Exception as e:
+        logger.warning("Token usage lookup failed, allowing request: %s", e)
+        return 0, 0
+    return int(daily or 0), int(monthly or 0)
+
+
+async def check_budget(
+    user_id: Any,
+    provider: Optional[str] = None,
+    model: Optional[str] = None,
+) -> BudgetDecision:
+    """
+    Decide whether a user may start a generation, and with which model.
+
+    Args:
+        user_id: User requesting the generation
+        provider: Requested provider (default AI_DEFAULT_PROVIDER)
+        model: Requested model (default: the provider's default model)
+
+    Returns:
+        The model to use, the economy model if the user is near a budget
+
+    Raises:
+        TokenBudgetExceededException: Daily or monthly budget used up
+    """
+    provider = provider or settings.AI_DEFAULT_PROVIDER
+    model = model or default_model(provider)
+    daily, monthly = await get_token_usage(user_id)
+    today = _now().date()
+
+    if daily >= settings.LLM_DAILY_TOKEN_BUDGET:
+        raise TokenBudgetExceededException("daily", _seconds_until(_next_day(today)))
+    if monthly >= settings.LLM_MONTHLY_TOKEN_BUDGET:
+        raise TokenBudgetExceededException("monthly", _seconds_until(_next_month(today)))
+
+    ratio = settings.LLM_BUDGET_DOWNGRADE_RATIO
+    near_budget = (
+        daily >= settings.LLM_DAILY_TOKEN_BUDGET * ratio
+        or monthly >= settings.LLM_MONTHLY_TOKEN_BUDGET * ratio
+    )
+    cheaper = economy_model(provider)
+    if near_budget and model != cheaper:
+        return BudgetDecision(provider, cheaper, True, daily, monthly)
+    return BudgetDecision(provider, model, False, daily, monthly)
+
+
+async def enqueue_generation(task: Any, user_id: Any, job_id: Any, options: Optional[dict] = None):
+    """
+    Queue an AI generation task after checking the user's token budget.
+
+    The chosen provider and model are passed to the task in options, so the
+    worker never runs a model the budget check did not allow.
+
+    Args:
+        task: generate_cv_task or generate_cover_letter_task
+        user_id: User requesting the generation
+        job_id: Job to generate for
+        options: Task options; "provider" and "model" are requests, not guarantees
+
+    Returns:
+        Celery AsyncResult
+
+    Raises:
+        TokenBudgetExceededException: Budget used up; nothing is queued
+    """
+    options = dict(options or {})
+    decision = await check_budget(user_id, options.get("provider"), options.get("model"))
+    if decision.downgraded:
+        logger.info(
+            "User %s near token budget (day %d, month %d): %s -> %s",
+            user_id, decision.daily_used, decision.monthly_used,
+            options.get("model") or default_model(decision.provider), decision.model,
+        )
+    options.update(provider=decision.provider, model=decision.model)
+    return task.delay(str(user_id), str(job_id), options)
+
+
+def top_consumers_query(since: date, until: Optional[date] = None, limit: int = 20):
+    """Users by total tokens over [since, until], largest first."""
+    total = func.sum(LLMUsage.input_tokens + LLMUsage.output_tokens)
+    stmt = (
+        select(
+            LLMUsage.user_id,
+            User.email,
+            func.sum(LLMUsage.input_tokens).label("input_tokens"),
+            func.sum(LLMUsage.output_tokens).label("output_tokens"),
+            total.label("total_tokens"),
+            func.sum(LLMUsage.requests).label("requests"),
+        )
+        .join(User, User.id == LLMUsage.user_id)
+        .where(LLMUsage.day >= since)  # idx_llm_usage_day
+        .group_by(LLMUsage.user_id, User.email)
+        .order_by(total.desc())
+        .limit(limit)
+    )
+    if until is not None:
+        stmt = stmt.where(LLMUsage.day <= until)
+    return stmt
+
+
+def top_consumers(
+    db: Session,
+    since: date,
+    until: Optional[date] = None,
+    limit: int = 20,
+) -> List[Dict[str, Any]]:
+    """
+    Heaviest token users over a date range, for the admin view.
+
+    Reflects flushed usage only (at most LLM_USAGE_FLUSH_INTERVAL behind).
+
+    Args:
+        db: Database session
+        since: First day (UTC), inclusive
+        until: Last day (UTC), inclusive (default: no upper bound)
+        limit: Number of users
+
+    Returns:
+        Rows with user_id, email, input_tokens, output_tokens, total_tokens, requests
+    """
+    return [dict(row._mapping) for row in db.execute(top_consumers_query(since, until, limit))]
+
+
+async def atop_consumers(
+    db: AsyncSession,
+    since: date,
+    until: Optional[date] = None,
+    limit: int = 20,
+) -> List[Dict[str, Any]]:
+    """Async counterpart of top_consumers."""
+    result = await db.execute(top_consumers_query(since, until, limit))
+    return [dict(row._mapping) for row in result]
@@ -0,0 +1,161 @@
+"""
+Reading and repairing per-user application statistics.
+
+The counters themselves are kept up to date on every flush (see
+app.models.application_stats); this module reads them by primary key and
+rebuilds them from the applications table when they may have drifted.
+
+Usage:
+    stats = await aget_application_stats(db, user_id)
+    stats.status_counts, stats.avg_days_to_interview
+"""
+import logging
+import math
+import uuid
+from typing import Any, Dict, Iterable, List, Optional
+
+from sqlalchemy import func, select, union
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from app.config import settings
+from app.models.application import Application
+from app.models.application_stats import COUNTERS, ApplicationStats, contribution
+
+logger = logging.getLogger(__name__)
+
+
+def get_application_stats(db: Session, user_id: Any) -> ApplicationStats:
+    """
+    Get a user's application statistics (one primary-key lookup).
+
+    Returns:
+        Stored statistics, or an all-zero transient row for users without applications
+    """
+    stats = db.get(ApplicationStats, user_id)
+    return stats if stats is not None else _empty(user_id)
+
+
+async def aget_application_stats(db: AsyncSession, user_id: Any) -> ApplicationStats:
+    """Async counterpart of get_application_stats."""
+    stats = await db.get(ApplicationStats, user_id)
+    return stats if stats is not None else _empty(user_id)
+
+
+def _empty(user_id: Any) -> ApplicationStats:
+    return ApplicationStats(user_id=user_id, **{name: 0 for name in COUNTERS})
+
+
+def _recompute(rows: Iterable[Any]) -> Dict[Any, Dict[str, float]]:
+    totals: Dict[Any, Dict[str, float]] = {}
+    for row in rows:
+        counters = totals.setdefault(row.user_id, {name: 0 for name in COUNTERS})
+        for name, value in contribution(row.status, row.applied_at, row.interview_dates).items():
+            counters[name] += value
+    return totals
+
+
+def _differs(stored: Optional[Any], expected: Dict[str, float]) -> bool:
+    if stored is None:
+        return True
+    return any(
+        not math.isclose(getattr(stored, name), value, abs_tol=1e-6)
+        for name, value in expected.items()
+    )
+
+
+def _repair_batch(db: Session, user_ids: List[Any]) -> int:
+    """Recompute one batch of users in its own transaction; returns rows corrected."""
+    table = ApplicationStats.__table__
+
+    # Lock the stats rows (creating missing ones) before reading the
+    # applications: concurrent flushes then either committed already, and are
+    # counted below, or wait and add their increment on top of the result.
+    db.execute(
+        insert(ApplicationStats)
+        .values([{"user_id": user_id} for user_id in user_ids])
+        .on_conflict_do_nothing(index_elements=[table.c.user_id])
+    )
+    stored = {
+        row.user_id: row
+        for row in db.execute(
+            select(*table.c)
+            .where(table.c.user_id.in_(user_ids))
+            .order_by(table.c.user_id)
+            .with_for_update()
+        )
+    }
+    totals = _recompute(
+        db.execute(
+            select(
+                Application.user_id,
+                Application.status,
+                Application.applied_at,
+                Application.interview_dates,
+            ).where(Application.user_id.in_(user_ids))
+        )
+    )
+
+    corrected = []
+    for user_id in user_ids:
+        expected = totals.get(user_id, {name: 0 for name in COUNTERS})
+        if _differs(stored.get(user_id), expected):
+            corrected.append({"user_id": user_id, **expected})
+    if corrected:
+        stmt = insert(ApplicationStats).values(corrected)
+        db.execute(
+            stmt.on_conflict_do_update(
+                index_elements=[table.c.user_id],
+                set_={
+                    **{name: stmt.excluded[name] for name in COUNTERS},
+                    "updated_at": func.now(),
+                },
+            )
+        )
+    db.commit()
+    return len(corrected)
+
+
+def repair_application_stats(
+    db: Session,
+    user_ids: Optional[Iterable[Any]] = None,
+    batch_size: Optional[int] = None,
+) -> Dict[str, int]:
+    """
+    Recompute application statistics from the applications table.
+
+    Users are processed in batches, each committed separately, and only rows
+    that differ from the recomputed values are written.
+
+    Args:
+        db: Database session (primary)
+        user_ids: Users to repair (default: every user with applications or stats)
+        batch_size: Users per transaction (default APPLICATION_STATS_REPAIR_BATCH_SIZE)
+
+    Returns:
+        Number of users checked and of rows corrected
+    """
+    batch_size = batch_size or settings.APPLICATION_STATS_REPAIR_BATCH_SIZE
+    if user_ids is None:
+        user_ids = db.scalars(
+            union(select(Application.user_id), select(ApplicationStats.user_id))
+        ).all()
+        db.commit()
+    ordered = sorted({uuid.UUID(str(user_id)) for user_id in user_ids}, key=str)
+
+    corrected = 0
+    for start in range(0, len(ordered), batch_size):
+        try:
+            corrected += _repair_batch(db, ordered[start:start + batch_size])
+        except Exception:
+            db.rollback()
+            raise
+
+    if corrected:
+        logger.warning(
+            "Application stats drifted for %d of %d users; repaired",
+            corrected,
+            len(ordered),
+        )
+    return {"users": len(ordered), "corrected": corrected}
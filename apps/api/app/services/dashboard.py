@@ -0,0 +1,250 @@
+"""
+Dashboard aggregate loader.
+
+Loads a user with their profile, projects, applications (with jobs),
+generated CVs and cover letters in a fixed number of queries, whatever the
+size of each collection:
+
+    1. users LEFT JOIN user_profiles
+    2. projects WHERE user_id IN (...)
+    3. applications JOIN jobs WHERE user_id IN (...)
+    4. generated_cvs WHERE user_id IN (...)
+    5. cover_letters WHERE user_id IN (...)
+    6. application_stats by primary key
+
+Only the columns the dashboard shows are selected; large text and JSONB
+columns (job descriptions, CV content, cover letter bodies) stay in the
+database. Any other relationship access raises instead of lazy loading, so
+the query count cannot silently grow.
+
+Cached payloads are tagged user:<id> and dropped when a session that
+changed the user, their profile, projects, applications, generated CVs or
+cover letters commits. Job writes (which use bulk statements the session
+cannot see) call mark_job_dashboards_stale before committing.
+
+Usage:
+    payload = await get_dashboard(user_id)  # cached
+    payload = await load_dashboard(db, user_id)
+    mark_job_dashboards_stale(db, job_ids); db.commit()
+"""
+import asyncio
+import uuid
+from typing import Any, Dict, Iterable, List
+
+from sqlalchemy import event, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session, joinedload, load_only, raiseload, selectinload
+from sqlalchemy.orm.attributes import instance_dict
+
+from app.config import settings
+from app.core.cache import async_cache, cache
+from app.core.database import open_async_read_session
+from app.core.exceptions import ResourceNotFoundException
+from app.models.application import Application
+from app.models.application_stats import ApplicationStats
+from app.models.cv import CoverLetter, GeneratedCV
+from app.models.job import Job
+from app.models.profile import UserProfile
+from app.models.project import Project
+from app.models.user import User
+from app.schemas.dashboard import DashboardResponse
+from app.services.application_stats import aget_application_stats
+
+# Session.info key: users whose dashboards go stale when the session commits
+STALE_USERS_INFO_KEY = "stale_dashboards"
+
+# Rows shown on their user's dashboard (ApplicationStats is keyed by user_id)
+_USER_OWNED_MODELS = (UserProfile, Project, Application, ApplicationStats, GeneratedCV, CoverLetter)
+
+# Invalidations scheduled from AsyncSession commits, referenced until done
+_pending_invalidations: set = set()
+
+
+def dashboard_cache_key(user_id: Any) -> str:
+    """Cache key of a user's dashboard payload (tagged user:<id>)."""
+    return f"user:{user_id}:dashboard"
+
+
+def build_dashboard_query(user_id: Any):
+    """User query with every dashboard collection eagerly loaded."""
+    return (
+        select(User)
+        .where(User.id == user_id)
+        .options(
+            load_only(User.id, User.email),
+            # One-to-one: joined into the user query itself
+            joinedload(User.profile).load_only(
+                UserProfile.id,
+                UserProfile.full_name,
+                UserProfile.location,
+                UserProfile.target_roles,
+                UserProfile.desired_salary_min,
+                UserProfile.desired_salary_max,
+            ),
+            selectinload(User.projects).load_only(
+                Project.id,
+                Project.title,
+                Project.description,
+                Project.technologies,
+                Project.is_featured,
+            ),
+            # Many-to-one job joined into the applications query; the
+            # description and other long text columns are not selected
+            selectinload(User.applications)
+            .load_only(
+                Application.id,
+                Application.status,
+                Application.applied_at,
+                Application.follow_up_date,
+                Application.cv_id,
+                Application.cover_letter_id,
+                Application.updated_at,
+            )
+            .joinedload(Application.job, innerjoin=True)
+            .load_only(
+                Job.id,
+                Job.title,
+                Job.company,
+                Job.company_logo_url,
+                Job.location,
+                Job.remote_type,
+                Job.source_url,
+                Job.posted_date,
+                Job.is_active,
+            ),
+            selectinload(User.generated_cvs).load_only(
+                GeneratedCV.id,
+                GeneratedCV.job_id,
+                GeneratedCV.ai_model,
+                GeneratedCV.created_at,
+            ),
+            selectinload(User.cover_letters).load_only(
+                CoverLetter.id,
+                CoverLetter.job_id,
+                CoverLetter.ai_model,
+                CoverLetter.created_at,
+            ),
+            raiseload("*"),
+        )
+    )
+
+
+def _to_payload(user: User, stats: ApplicationStats) -> Dict[str, Any]:
+    applications = sorted(user.applications, key=lambda a: a.updated_at, reverse=True)
+    response = DashboardResponse(
+        user_id=user.id,
+        email=user.email,
+        profile=user.profile,
+        projects=sorted(user.projects, key=lambda p: (not p.is_featured, p.title)),
+        applications=applications,
+        stats=stats,
+        generated_cvs=sorted(user.generated_cvs, key=lambda c: c.created_at, reverse=True),
+        cover_letters=sorted(user.cover_letters, key=lambda c: c.created_at, reverse=True),
+    )
+    return response.model_dump(mode="json")
+
+
+async def load_dashboard(db: AsyncSession, user_id: Any) -> Dict[str, Any]:
+    """
+    Load a user's dashboard from the database.
+
+    Args:
+        db: Database session
+        user_id: User ID
+
+    Returns:
+        JSON-ready DashboardResponse payload
+
+    Raises:
+        ResourceNotFoundException: If the user does not exist
+    """
+    user_id = uuid.UUID(str(user_id))
+    user = (await db.scalars(build_dashboard_query(user_id))).unique().one_or_none()
+    if user is None:
+        raise ResourceNotFoundException("User")
+    return _to_payload(user, await aget_application_stats(db, user.id))
+
+
+async def get_dashboard(user_id: Any) -> Dict[str, Any]:
+    """
+    Cached load_dashboard.
+
+    Stored for DASHBOARD_CACHE_TTL seconds under the user:<id> tag, so
+    invalidating that tag after a write refreshes it immediately. Misses are
+    loaded through a read session of their own (replica unless the user
+    wrote recently), since early refreshes outlive the request.
+    """
+    user_id = str(user_id)
+
+    async def compute() -> Dict[str, Any]:
+        async with await open_async_read_session(user_id) as db:
+            return await load_dashboard(db, user_id)
+
+    return await async_cache.get_or_compute(
+        dashboard_cache_key(user_id),
+        compute,
+        expire=settings.DASHBOARD_CACHE_TTL,
+        tags=[f"user:{user_id}"],
+    )
+
+
+def user_tags(user_ids: Iterable[Any]) -> List[str]:
+    """user:<id> cache tags for a set of users."""
+    return [f"user:{user_id}" for user_id in sorted({str(user_id) for user_id in user_ids})]
+
+
+def mark_dashboards_stale(db: Session, user_ids: Iterable[Any]) -> None:
+    """Drop these users' cached dashboards once the session commits."""
+    db.info.setdefault(STALE_USERS_INFO_KEY, set()).update(str(user_id) for user_id in user_ids)
+
+
+def mark_job_dashboards_stale(db: Session, job_ids: Iterable[Any]) -> None:
+    """
+    Drop the cached dashboards of everyone who applied to any of the jobs
+    once the session commits. Call it before committing the job change.
+    """
+    job_ids = list(job_ids)
+    if not job_ids:
+        return
+    user_ids = db.scalars(
+        select(Application.user_id).where(Application.job_id.in_(job_ids)).distinct()
+    ).all()
+    mark_dashboards_stale(db, user_ids)
+
+
+@event.listens_for(Session, "after_flush")
+def _collect_stale_dashboards(session: Session, flush_context: Any) -> None:
+    """Remember the users whose dashboard rows this flush wrote."""
+    user_ids = set()
+    for obj in (*session.new, *session.dirty, *session.deleted):
+        # Read loaded state only: a lazy load here would break AsyncSession
+        if isinstance(obj, User):
+            user_ids.add(instance_dict(obj).get("id"))
+        elif isinstance(obj, _USER_OWNED_MODELS):
+            user_ids.add(instance_dict(obj).get("user_id"))
+    user_ids.discard(None)
+    if user_ids:
+        mark_dashboards_stale(session, user_ids)
+
+
+@event.listens_for(Session, "after_rollback")
+def _forget_stale_dashboards(session: Session) -> None:
+    session.info.pop(STALE_USERS_INFO_KEY, None)
+
+
+@event.listens_for(Session, "after_commit")
+def _invalidate_stale_dashboards(session: Session) -> None:
+    """Invalidate the user:<id> tags collected during the transaction."""
+    user_ids = session.info.pop(STALE_USERS_INFO_KEY, None)
+    if not user_ids:
+        return
+    tags = user_tags(user_ids)
+    try:
+        loop = asyncio.get_running_loop()
+    except RuntimeError:
+        cache.invalidate_tags(*tags)
+        return
+    # AsyncSession commits run on the event loop; don't block it on Redis
+    task = loop.create_task(async_cache.invalidate_tags(*tags))
+    _pending_invalidations.add(task)
+    task.add_done_callback(_pending_invalidations.discard)
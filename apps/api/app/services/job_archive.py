@@ -0,0 +1,242 @@
+"""
+Expiry and archival of jobs (hot/cold split).
+
+The jobs table holds the hot set. The sweeper keeps it small in two steps,
+each run as many short transactions of JOB_SWEEP_BATCH_SIZE rows:
+
+    1. deactivate_expired_jobs: active jobs past expires_at get is_active = false
+    2. archive_inactive_jobs: jobs inactive for JOB_ARCHIVE_AFTER_DAYS move to
+       jobs_archive (DELETE ... RETURNING into INSERT, one statement)
+
+Batches lock their rows with FOR UPDATE SKIP LOCKED, so they never wait on
+(or block for long) a scraper upsert or a concurrent sweeper run.
+
+Deactivating a job changes the dashboards of users who applied to it; their
+cached dashboards are dropped when the batch commits.
+
+Jobs still referenced by applications, generated CVs, cover letters or user
+job preferences are never archived: they stay in the jobs table (inactive),
+so those records keep joining to them. get_job falls back to the archive for
+everything else, e.g. old links to a posting.
+
+Usage:
+    job = get_job(db, job_id)  # hot row, or a detached copy rebuilt from the archive
+"""
+import logging
+import uuid
+from datetime import datetime, timedelta, timezone
+from typing import Any, Callable, Dict, List, Optional
+
+from sqlalchemy import DateTime, delete, exists, func, insert, literal_column, not_, select, update
+from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from app.config import settings
+from app.models.application import Application
+from app.models.cv import CoverLetter, GeneratedCV
+from app.models.job import ArchivedJob, Job
+from app.models.template import UserJobPreferences
+from app.services.dashboard import mark_job_dashboards_stale
+
+logger = logging.getLogger(__name__)
+
+# Columns copied out of the document into jobs_archive
+_ARCHIVE_COLUMNS = ("id", "external_id", "source", "title", "company", "posted_date", "expires_at")
+
+
+def hot_jobs():
+    """Base query for job listings: active jobs only."""
+    return select(Job).where(Job.is_active)
+
+
+def _deactivate_batch(batch_size: int):
+    expired = (
+        select(Job.id)
+        .where(Job.is_active, Job.expires_at < func.now())
+        .order_by(Job.expires_at)  # idx_jobs_active_expires
+        .limit(batch_size)
+        .with_for_update(skip_locked=True)
+    )
+    return (
+        update(Job)
+        .where(Job.id.in_(expired.scalar_subquery()))
+        .values(is_active=False, updated_at=func.now())
+        .returning(Job.id)
+        .execution_options(synchronize_session=False)
+    )
+
+
+def _archive_batch(batch_size: int, cutoff: datetime):
+    unreferenced = [
+        not_(exists().where(model.job_id == Job.id))
+        for model in (Application, GeneratedCV, CoverLetter, UserJobPreferences)
+    ]
+    candidates = (
+        select(Job.id)
+        .where(not_(Job.is_active), Job.updated_at < cutoff, *unreferenced)
+        .order_by(Job.updated_at)  # idx_jobs_inactive_updated
+        .limit(batch_size)
+        .with_for_update(skip_locked=True)
+    )
+    document = func.to_jsonb(literal_column(Job.__tablename__)).op("-")("search_vector")
+    moved = (
+        delete(Job)
+        .where(Job.id.in_(candidates.scalar_subquery()))
+        .returning(*[Job.__table__.c[name] for name in _ARCHIVE_COLUMNS], document.label("data"))
+        .cte("moved")
+    )
+    columns = [*_ARCHIVE_COLUMNS, "data"]
+    return insert(ArchivedJob).from_select(columns, select(*[moved.c[name] for name in columns]))
+
+
+def _run_batches(
+    db: Session,
+    make_statement,
+    batch_size: int,
+    max_batches: int,
+    on_batch: Optional[Callable[[Session, List[Any]], None]] = None,
+) -> int:
+    """
+    Execute and commit a batch statement until it affects fewer rows than batch_size.
+
+    With on_batch, the statement must return the affected ids; on_batch gets
+    them before each commit.
+    """
+    total = 0
+    for _ in range(max_batches):
+        try:
+            result = db.execute(make_statement())
+            if on_batch is None:
+                affected = result.rowcount
+            else:
+                ids = result.scalars().all()
+                affected = len(ids)
+                on_batch(db, ids)
+            db.commit()
+        except Exception:
+            db.rollback()
+            raise
+        total += affected
+        if affected < batch_size:
+            break
+    return total
+
+
+def deactivate_expired_jobs(
+    db: Session,
+    batch_size: Optional[int] = None,
+    max_batches: Optional[int] = None,
+) -> int:
+    """
+    Mark active jobs whose expires_at has passed as inactive.
+
+    Commits after every batch.
+
+    Args:
+        db: Database session (primary)
+        batch_size: Rows per transaction (default JOB_SWEEP_BATCH_SIZE)
+        max_batches: Stop after this many batches (default JOB_SWEEP_MAX_BATCHES)
+
+    Returns:
+        Number of jobs deactivated
+    """
+    batch_size = batch_size or settings.JOB_SWEEP_BATCH_SIZE
+    max_batches = max_batches or settings.JOB_SWEEP_MAX_BATCHES
+    return _run_batches(
+        db,
+        lambda: _deactivate_batch(batch_size),
+        batch_size,
+        max_batches,
+        on_batch=mark_job_dashboards_stale,
+    )
+
+
+def archive_inactive_jobs(
+    db: Session,
+    older_than_days: Optional[int] = None,
+    batch_size: Optional[int] = None,
+    max_batches: Optional[int] = None,
+) -> int:
+    """
+    Move unreferenced jobs inactive for longer than the retention window to jobs_archive.
+
+    Commits after every batch.
+
+    Args:
+        db: Database session (primary)
+        older_than_days: Retention in the hot table (default JOB_ARCHIVE_AFTER_DAYS)
+        batch_size: Rows per transaction (default JOB_SWEEP_BATCH_SIZE)
+        max_batches: Stop after this many batches (default JOB_SWEEP_MAX_BATCHES)
+
+    Returns:
+        Number of jobs archived
+    """
+    days = settings.JOB_ARCHIVE_AFTER_DAYS if older_than_days is None else older_than_days
+    cutoff = datetime.now(timezone.utc) - timedelta(days=days)
+    batch_size = batch_size or settings.JOB_SWEEP_BATCH_SIZE
+    max_batches = max_batches or settings.JOB_SWEEP_MAX_BATCHES
+    return _run_batches(db, lambda: _archive_batch(batch_size, cutoff), batch_size, max_batches)
+
+
+def sweep_jobs(db: Session) -> Dict[str, int]:
+    """Deactivate expired jobs, then archive old inactive ones."""
+    counts = {
+        "deactivated": deactivate_expired_jobs(db),
+        "archived": archive_inactive_jobs(db),
+    }
+    logger.info(
+        "Job sweep: %d deactivated, %d archived",
+        counts["deactivated"],
+        counts["archived"],
+        extra=counts,
+    )
+    return counts
+
+
+def _restore(archived: ArchivedJob) -> Job:
+    """Rebuild a detached Job from its archived document."""
+    values: Dict[str, Any] = {}
+    for column in Job.__table__.columns:
+        if column.computed is not None or column.name not in archived.data:
+            continue
+        value = archived.data[column.name]
+        if value is not None:
+            if isinstance(column.type, DateTime):
+                value = datetime.fromisoformat(value)
+            elif isinstance(column.type, UUID):
+                value = uuid.UUID(value)
+        values[column.name] = value
+    return Job(**values)
+
+
+def get_job(db: Session, job_id: Any) -> Optional[Job]:
+    """
+    Get a job by id from the hot table, falling back to the archive.
+
+    Archived jobs come back as detached, read-only Job instances; do not add
+    them to a session.
+
+    Args:
+        db: Database session
+        job_id: Job ID
+
+    Returns:
+        Job, or None if it exists in neither table
+    """
+    job = db.get(Job, job_id)
+    if job is None:
+        archived = db.get(ArchivedJob, job_id)
+        if archived is not None:
+            job = _restore(archived)
+    return job
+
+
+async def aget_job(db: AsyncSession, job_id: Any) -> Optional[Job]:
+    """Async counterpart of get_job."""
+    job = await db.get(Job, job_id)
+    if job is None:
+        archived = await db.get(ArchivedJob, job_id)
+        if archived is not None:
+            job = _restore(archived)
+    return job
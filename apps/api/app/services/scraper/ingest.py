@@ -0,0 +1,168 @@
+"""
+Bulk ingestion of scraped job postings.
+
+Usage:
+    counts = bulk_upsert_jobs(db, postings)
+    db.commit()
+    counts["linkedin"].inserted
+"""
+import uuid
+from dataclasses import dataclass, asdict
+from datetime import datetime, timezone
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from sqlalchemy import func, literal_column, tuple_
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.orm import Session
+
+from app.config import settings
+from app.models.job import Job
+from app.services.dashboard import mark_job_dashboards_stale
+
+# PostgreSQL accepts at most 65535 bind parameters per statement
+MAX_BIND_PARAMS = 65535
+
+# Never overwritten on conflict: identity, conflict target and insert-only metadata
+_INSERT_ONLY_COLUMNS = {"id", "external_id", "source", "created_at", "updated_at", "scraped_at"}
+
+# Generated columns (search_vector) are maintained by Postgres
+_COLUMNS = {column.name for column in Job.__table__.columns if column.computed is None}
+
+
+@dataclass
+class IngestCounts:
+    """Outcome of an ingestion run for one source."""
+    inserted: int = 0
+    updated: int = 0
+    unchanged: int = 0
+
+    def as_dict(self) -> Dict[str, int]:
+        return asdict(self)
+
+
+def bulk_upsert_jobs(
+    db: Session,
+    postings: Iterable[Dict[str, Any]],
+    chunk_size: Optional[int] = None,
+) -> Dict[str, IngestCounts]:
+    """
+    Insert new postings and update changed ones with INSERT ... ON CONFLICT.
+
+    Postings are matched on (external_id, source), the idx_jobs_external_source
+    unique index. On conflict only the supplied columns are written, and only
+    when at least one of them differs from the stored row; updated_at is
+    bumped for those rows alone. Postings without an external_id cannot be
+    matched and are always inserted.
+
+    Duplicate postings (same external_id and source) are merged into one
+    before anything is written, later values winning, so each posting is
+    written and counted once.
+
+    The caller owns the transaction (commit or rollback afterwards); cached
+    dashboards showing an updated posting are dropped when it commits.
+
+    Args:
+        db: Database session
+        postings: Job column values keyed by column name; each needs at least
+            source, source_url, title, company and description
+        chunk_size: Rows per statement (defaults to SCRAPER_UPSERT_CHUNK_SIZE)
+
+    Returns:
+        Counts of inserted, updated and unchanged rows per source
+
+    Raises:
+        ValueError: If a posting contains a key that is not a Job column
+    """
+    chunk_size = chunk_size or settings.SCRAPER_UPSERT_CHUNK_SIZE
+    counts: Dict[str, IngestCounts] = {}
+
+    # Dedupe on the conflict target across the whole batch: a single statement
+    # cannot update the same row twice, and separate statements would count it twice.
+    unique: Dict[Any, Dict[str, Any]] = {}
+    for posting in postings:
+        unknown = set(posting) - _COLUMNS
+        if unknown:
+            raise ValueError(f"Unknown job columns: {', '.join(sorted(unknown))}")
+        if posting.get("external_id") is None:
+            unique[object()] = posting
+        else:
+            dedupe_key = (posting["external_id"], posting["source"])
+            unique[dedupe_key] = {**unique.get(dedupe_key, {}), **posting}
+
+    # Group by column set: a multi-row VALUES list needs the same columns in
+    # every row, and a missing key must not overwrite the stored value with NULL.
+    groups: Dict[Tuple[str, ...], List[Dict[str, Any]]] = {}
+    for posting in unique.values():
+        groups.setdefault(tuple(sorted(posting)), []).append(posting)
+
+    now = datetime.now(timezone.utc)
+    for columns, rows in groups.items():
+        # Column defaults fill in the other columns, so budget for all of them
+        size = max(1, min(chunk_size, MAX_BIND_PARAMS // len(_COLUMNS)))
+        for start in range(0, len(rows), size):
+            _upsert_chunk(db, columns, rows[start:start + size], now, counts)
+
+    return counts
+
+
+def _upsert_chunk(
+    db: Session,
+    columns: Tuple[str, ...],
+    rows: List[Dict[str, Any]],
+    now: datetime,
+    counts: Dict[str, IngestCounts],
+) -> None:
+    """Upsert one chunk and add its outcome to counts."""
+    values = [
+        {
+            "id": uuid.uuid4(),
+            "scraped_at": now,
+            "created_at": now,
+            "updated_at": now,
+            **row,
+        }
+        for row in rows
+    ]
+
+    stmt = insert(Job).values(values)
+    updatable = [name for name in columns if name not in _INSERT_ONLY_COLUMNS]
+    if updatable:
+        current = tuple_(*[Job.__table__.c[name] for name in updatable])
+        incoming = tuple_(*[stmt.excluded[name] for name in updatable])
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[Job.external_id, Job.source],
+            set_={
+                **{name: stmt.excluded[name] for name in updatable},
+                "updated_at": func.now(),
+            },
+            where=current.is_distinct_from(incoming),
+        )
+    else:
+        stmt = stmt.on_conflict_do_nothing(index_elements=[Job.external_id, Job.source])
+
+    # xmax is 0 only for freshly inserted row versions. Rows skipped by the
+    # WHERE clause (or DO NOTHING) are not returned at all.
+    stmt = stmt.returning(Job.id, Job.source, literal_column("(xmax = 0)").label("inserted"))
+
+    submitted: Dict[str, int] = {}
+    for row in rows:
+        submitted[row["source"]] = submitted.get(row["source"], 0) + 1
+
+    written: Dict[str, IngestCounts] = {}
+    updated_ids = []
+    for job_id, source, inserted in db.execute(stmt):
+        source_counts = written.setdefault(source, IngestCounts())
+        if inserted:
+            source_counts.inserted += 1
+        else:
+            source_counts.updated += 1
+            updated_ids.append(job_id)
+    # Changed postings show on their applicants' dashboards
+    mark_job_dashboards_stale(db, updated_ids)
+
+    for source, total in submitted.items():
+        source_counts = counts.setdefault(source, IngestCounts())
+        chunk_counts = written.get(source, IngestCounts())
+        source_counts.inserted += chunk_counts.inserted
+        source_counts.updated += chunk_counts.updated
+        source_counts.unchanged += total - chunk_counts.inserted - chunk_counts.updated
@@ -0,0 +1,181 @@
+"""
+Full-text job search over the weighted jobs.search_vector column.
+
+Usage:
+    params = JobSearchParams(query='python "data engineer" -intern', remote_types=["remote"])
+    results = await search_jobs(db, params)
+    for hit in results.hits:
+        hit.job, hit.rank
+    results.facets["experience_level"]  # {"senior": 120, "mid": 87, ...}
+"""
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Sequence
+
+from sqlalchemy import Select, and_, cast, func, literal, select, true
+from sqlalchemy.dialects.postgresql import REGCONFIG
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from app.config import settings
+from app.models.job import Job
+
+# Text search configuration; must match the one in Job.search_vector
+TS_CONFIG = "english"
+
+# ts_rank_cd normalization: divide by 1 + log(document length), so long
+# descriptions don't outrank focused postings
+RANK_NORMALIZATION = 1
+
+# Facet bucket for jobs without a value
+UNSPECIFIED = "unspecified"
+
+
+@dataclass
+class JobSearchParams:
+    """Search text plus filters; empty filters are not applied."""
+    query: str = ""  # websearch syntax: "quoted phrases", OR, -excluded
+    remote_types: Sequence[str] = ()
+    experience_levels: Sequence[str] = ()
+    salary_min: Optional[int] = None
+    salary_max: Optional[int] = None
+    active_only: bool = True
+    limit: int = 20
+    offset: int = 0
+
+
+@dataclass
+class JobSearchHit:
+    job: Job
+    rank: float
+
+
+@dataclass
+class JobSearchResults:
+    """
+    One page of hits plus facet counts over all matches.
+
+    Each facet is counted with every filter except its own, so the counts
+    tell the client what selecting another value would return.
+    """
+    hits: List[JobSearchHit]
+    total: int
+    facets: Dict[str, Dict[str, int]] = field(default_factory=dict)
+
+
+def _facet_counts(matched: Any, column_name: str, condition: Any) -> Select:
+    """jsonb {value: count} for one facet column of the matched set."""
+    column = func.coalesce(matched.c[column_name], UNSPECIFIED)
+    buckets = (
+        select(column.label("value"), func.count().label("n"))
+        .where(condition)
+        .group_by(column)
+        .subquery()
+    )
+    counts = func.jsonb_object_agg(buckets.c.value, buckets.c.n)
+    return select(func.coalesce(counts, func.jsonb_build_object())).scalar_subquery()
+
+
+def build_search_query(params: JobSearchParams) -> Select:
+    """
+    Build the single statement returning a page of hits and all facets.
+
+    Rows are (facets, Job, rank). There is always at least one row; when the
+    page is empty its Job and rank are NULL, so facets still come back.
+    """
+    text = params.query.strip()
+    conditions = []
+    if text:
+        tsquery = func.websearch_to_tsquery(cast(TS_CONFIG, REGCONFIG), text)
+        conditions.append(Job.search_vector.op("@@")(tsquery))
+        rank = func.ts_rank_cd(Job.search_vector, tsquery, RANK_NORMALIZATION)
+    else:
+        rank = literal(0.0)
+    if params.active_only:
+        conditions.append(Job.is_active.is_(True))
+    # Salary range overlaps the requested one; a posting missing one bound
+    # is compared on the other
+    if params.salary_min is not None:
+        conditions.append(func.coalesce(Job.salary_max, Job.salary_min) >= params.salary_min)
+    if params.salary_max is not None:
+        conditions.append(func.coalesce(Job.salary_min, Job.salary_max) <= params.salary_max)
+
+    matched = (
+        select(
+            Job.id,
+            Job.remote_type,
+            Job.experience_level,
+            Job.posted_date,
+            rank.label("rank"),
+        )
+        .where(*conditions)
+        .cte("matched")
+    )
+
+    remote_filter = (
+        matched.c.remote_type.in_(params.remote_types) if params.remote_types else true()
+    )
+    experience_filter = (
+        matched.c.experience_level.in_(params.experience_levels)
+        if params.experience_levels else true()
+    )
+    both = and_(remote_filter, experience_filter)
+
+    facets = select(
+        func.jsonb_build_object(
+            "total",
+            select(func.count()).where(both).select_from(matched).scalar_subquery(),
+            "remote_type",
+            _facet_counts(matched, "remote_type", experience_filter),
+            "experience_level",
+            _facet_counts(matched, "experience_level", remote_filter),
+        ).label("facets")
+    ).subquery("facets")
+
+    limit = max(1, min(params.limit, settings.PAGINATION_MAX_LIMIT))
+    page = (
+        select(matched.c.id, matched.c.rank, matched.c.posted_date)
+        .where(both)
+        .order_by(matched.c.rank.desc(), matched.c.posted_date.desc().nulls_last(), matched.c.id)
+        .limit(limit)
+        .offset(max(0, params.offset))
+        .subquery("page")
+    )
+
+    return (
+        select(facets.c.facets, Job, page.c.rank)
+        .select_from(facets)
+        .outerjoin(page, true())
+        .outerjoin(Job, Job.id == page.c.id)
+        .order_by(page.c.rank.desc(), page.c.posted_date.desc().nulls_last(), page.c.id)
+    )
+
+
+def _to_results(rows: Sequence[Any]) -> JobSearchResults:
+    facets = dict(rows[0].facets) if rows else {}
+    total = int(facets.pop("total", 0))
+    hits = [JobSearchHit(job=row.Job, rank=float(row.rank)) for row in rows if row.Job is not None]
+    return JobSearchResults(hits=hits, total=total, facets=facets)
+
+
+def search_jobs_sync(db: Session, params: JobSearchParams) -> JobSearchResults:
+    """Sync counterpart of search_jobs."""
+    return _to_results(db.execute(build_search_query(params)).all())
+
+
+async def search_jobs(db: AsyncSession, params: JobSearchParams) -> JobSearchResults:
+    """
+    Search jobs by relevance with filters and facet counts in one round trip.
+
+    Matching uses websearch_to_tsquery against the GIN-indexed search_vector
+    and ranks with ts_rank_cd (title matches weigh most, then company and
+    skills, then description). Without query text, every job passing the
+    filters matches and the newest come first.
+
+    Args:
+        db: Database session
+        params: Search text, filters and page
+
+    Returns:
+        Hits for the requested page, total match count and facets
+    """
+    return _to_results((await db.execute(build_search_query(params))).all())
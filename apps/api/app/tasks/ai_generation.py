@@ -1,6 +1,10 @@
 """
 Celery tasks for AI generation.
 To be implemented in Phase 3.
+
+Queue these with app.services.ai.usage.enqueue_generation, which checks the
+user's token budget first and sets options["provider"] and options["model"];
+report each provider call's tokens with record_usage.
 """
 from app.tasks.celery_app import celery_app
 
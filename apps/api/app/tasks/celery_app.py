@@ -2,7 +2,17 @@
 Celery application configuration.
 """
 from celery import Celery
+from celery.schedules import crontab
+from celery.signals import (
+    task_postrun,
+    task_prerun,
+    worker_process_init,
+    worker_process_shutdown,
+    worker_ready,
+)
 from app.config import settings
+from app.core import metrics
+from app.core.cache import cache
 
 # Create Celery app
 celery_app = Celery(
@@ -25,14 +35,57 @@ celery_app.conf.update(
     imports=[
         "app.tasks.scraping",
         "app.tasks.ai_generation",
+        "app.tasks.maintenance",
     ],
 )
 
 # Optional: Configure periodic tasks with Celery Beat
 celery_app.conf.beat_schedule = {
+    "sweep-jobs": {
+        "task": "sweep_jobs",
+        "schedule": settings.JOB_SWEEP_INTERVAL,
+        "options": {"expires": settings.JOB_SWEEP_INTERVAL},  # Don't pile up missed runs
+    },
+    "flush-llm-usage": {
+        "task": "flush_llm_usage",
+        "schedule": settings.LLM_USAGE_FLUSH_INTERVAL,
+        "options": {"expires": settings.LLM_USAGE_FLUSH_INTERVAL},
+    },
+    "repair-application-stats": {
+        "task": "repair_application_stats",
+        "schedule": crontab(hour=3, minute=30),
+    },
     # Example: Run job scraping daily at 9 AM
     # "daily-job-scraping": {
     #     "task": "app.tasks.scraping.scheduled_scrape",
     #     "schedule": crontab(hour=9, minute=0),
     # },
 }
+
+
+@worker_process_init.connect
+def start_cache_invalidation_listener(**kwargs):
+    """Keep each worker process's in-process cache tier coherent."""
+    cache.start_invalidation_listener()
+
+
+@worker_ready.connect
+def start_metrics_server(**kwargs):
+    """Expose task metrics from the worker's main process, if configured."""
+    if settings.METRICS_ENABLED and settings.CELERY_METRICS_PORT:
+        metrics.start_worker_server(settings.CELERY_METRICS_PORT)
+
+
+@worker_process_shutdown.connect
+def drop_process_metrics(pid=None, **kwargs):
+    metrics.mark_process_dead(pid)
+
+
+@task_prerun.connect
+def record_task_start(task_id=None, task=None, **kwargs):
+    metrics.task_started(task_id, task.name)
+
+
+@task_postrun.connect
+def record_task_runtime(task_id=None, state=None, **kwargs):
+    metrics.task_finished(task_id, state or "UNKNOWN")
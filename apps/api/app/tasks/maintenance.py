@@ -0,0 +1,59 @@
+"""
+Celery tasks for database housekeeping.
+"""
+from app.tasks.celery_app import celery_app
+from app.core.database import SessionLocal
+from app.services.ai.usage import flush_usage
+from app.services.application_stats import repair_application_stats
+from app.services.job_archive import sweep_jobs
+
+
+@celery_app.task(name="sweep_jobs")
+def sweep_jobs_task():
+    """
+    Deactivate expired jobs and archive old inactive ones.
+    Scheduled by Celery Beat every JOB_SWEEP_INTERVAL seconds.
+
+    Returns:
+        Deactivated and archived counts
+    """
+    db = SessionLocal()
+    try:
+        return sweep_jobs(db)
+    finally:
+        db.close()
+
+
+@celery_app.task(name="repair_application_stats")
+def repair_application_stats_task(user_ids: list = None):
+    """
+    Recompute per-user application statistics from the applications table.
+    Scheduled nightly by Celery Beat; can also be run for specific users.
+
+    Args:
+        user_ids: Users to repair (optional, default all)
+
+    Returns:
+        Users checked and rows corrected
+    """
+    db = SessionLocal()
+    try:
+        return repair_application_stats(db, user_ids)
+    finally:
+        db.close()
+
+
+@celery_app.task(name="flush_llm_usage")
+def flush_llm_usage_task():
+    """
+    Add LLM token usage buffered in Redis to the llm_usage table.
+    Scheduled by Celery Beat every LLM_USAGE_FLUSH_INTERVAL seconds.
+
+    Returns:
+        Number of usage rows written
+    """
+    db = SessionLocal()
+    try:
+        return flush_usage(db)
+    finally:
+        db.close()
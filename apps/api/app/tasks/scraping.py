@@ -3,6 +3,8 @@ Celery tasks for job scraping.
 To be implemented in Phase 4.
 """
 from app.tasks.celery_app import celery_app
+from app.core.database import SessionLocal
+from app.services.scraper.ingest import bulk_upsert_jobs
 
 
 @celery_app.task(name="scrape_jobs")
@@ -10,6 +12,32 @@ def scrape_jobs_task(user_id: str, sources: list, preferences: dict):
     """
     Scrape jobs from multiple sources.
     Implementation coming in Phase 4.
+
+    Scraped postings should be stored with bulk_upsert_jobs (or by chaining
+    ingest_jobs_task), not one db.add() per posting.
     """
     # TODO: Implement in Phase 4
     return {"status": "not_implemented", "message": "Coming in Phase 4"}
+
+
+@celery_app.task(name="ingest_jobs")
+def ingest_jobs_task(postings: list):
+    """
+    Store a batch of scraped postings with a chunked bulk upsert.
+
+    Args:
+        postings: Job column values keyed by column name
+
+    Returns:
+        Inserted, updated and unchanged counts per source
+    """
+    db = SessionLocal()
+    try:
+        counts = bulk_upsert_jobs(db, postings)
+        db.commit()
+    except Exception:
+        db.rollback()
+        raise
+    finally:
+        db.close()
+    return {source: source_counts.as_dict() for source, source_counts in counts.items()}
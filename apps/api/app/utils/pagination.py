@@ -0,0 +1,295 @@
+"""
+Keyset (cursor) pagination.
+
+Pages are selected with a row-value comparison on the sort key, e.g.
+`WHERE (posted_date, id) < (:posted_date, :id) ORDER BY posted_date DESC,
+id DESC LIMIT :n`, which an index on the same columns answers directly, so
+page 1000 costs the same as page 1. Cursors are opaque, HMAC-signed
+tokens; clients cannot forge or alter them.
+
+Usage:
+    page = paginate(db, select(Job).where(Job.is_active), JOB_ORDER, limit, cursor)
+    page = await apaginate(db, select(Application).where(...), APPLICATION_ORDER, limit, cursor)
+"""
+import base64
+import hashlib
+import hmac
+import json
+from dataclasses import dataclass, field
+from datetime import date, datetime
+from typing import Any, Generic, List, Optional, Sequence, Tuple, TypeVar
+from uuid import UUID
+
+from sqlalchemy import Select, tuple_
+from sqlalchemy.engine import Dialect
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import InstrumentedAttribute, Session
+
+from app.config import settings
+from app.core.exceptions import ValidationException
+from app.models.application import Application
+from app.models.cv import GeneratedCV
+from app.models.job import Job
+
+T = TypeVar("T")
+
+NEXT = "next"
+PREV = "prev"
+
+
+@dataclass(frozen=True)
+class KeysetOrder:
+    """
+    A unique sort key for keyset pagination.
+
+    The last column must make the key unique (usually the primary key), and
+    an index should cover the columns in this order and direction. Rows
+    whose key columns are NULL cannot be compared; exclude them via
+    `filters` or use NOT NULL columns.
+    """
+    name: str  # Bound into cursors so they only work on this order
+    columns: Tuple[InstrumentedAttribute, ...]
+    descending: bool = True
+    filters: Tuple[Any, ...] = field(default=())
+
+
+# (posted_date DESC, id DESC), served by idx_jobs_posted_date
+JOB_ORDER = KeysetOrder(
+    "jobs",
+    (Job.posted_date, Job.id),
+    filters=(Job.posted_date.is_not(None),),
+)
+
+# (created_at DESC, id DESC), served by the per-user *_user_created indexes
+# once the query filters on user_id
+APPLICATION_ORDER = KeysetOrder("applications", (Application.created_at, Application.id))
+GENERATED_CV_ORDER = KeysetOrder("generated_cvs", (GeneratedCV.created_at, GeneratedCV.id))
+
+
+@dataclass
+class Page(Generic[T]):
+    """One page of results plus cursors for its neighbours."""
+    items: List[T]
+    next_cursor: Optional[str] = None
+    prev_cursor: Optional[str] = None
+    total_estimate: Optional[int] = None
+
+
+def _b64encode(data: bytes) -> str:
+    return base64.urlsafe_b64encode(data).rstrip(b"=").decode()
+
+
+def _b64decode(data: str) -> bytes:
+    return base64.urlsafe_b64decode(data + "=" * (-len(data) % 4))
+
+
+def _signature(payload: bytes) -> bytes:
+    return hmac.new(settings.SECRET_KEY.encode(), payload, hashlib.sha256).digest()[:16]
+
+
+def _dump_value(value: Any) -> Any:
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    if isinstance(value, UUID):
+        return str(value)
+    return value
+
+
+def _load_value(column: InstrumentedAttribute, value: Any) -> Any:
+    if value is None:
+        return None
+    python_type = column.type.python_type
+    if python_type is datetime:
+        return datetime.fromisoformat(value)
+    if python_type is date:
+        return date.fromisoformat(value)
+    if python_type is UUID:
+        return UUID(value)
+    return python_type(value)
+
+
+def encode_cursor(order: KeysetOrder, direction: str, item: Any) -> str:
+    """
+    Build a signed cursor pointing just past `item` in `direction`.
+
+    Args:
+        order: Sort key of the listing
+        direction: NEXT or PREV
+        item: ORM instance at the edge of the current page
+
+    Returns:
+        Opaque URL-safe cursor
+    """
+    values = [_dump_value(getattr(item, column.key)) for column in order.columns]
+    payload = json.dumps([order.name, direction, values], separators=(",", ":")).encode()
+    return f"{_b64encode(payload)}.{_b64encode(_signature(payload))}"
+
+
+def decode_cursor(order: KeysetOrder, cursor: str) -> Tuple[str, List[Any]]:
+    """
+    Verify and unpack a cursor.
+
+    Returns:
+        Direction and key values
+
+    Raises:
+        ValidationException: If the cursor is malformed, tampered with or
+            belongs to a different listing
+    """
+    try:
+        encoded_payload, encoded_signature = cursor.split(".", 1)
+        payload = _b64decode(encoded_payload)
+        if not hmac.compare_digest(_signature(payload), _b64decode(encoded_signature)):
+            raise ValueError("bad signature")
+        name, direction, values = json.loads(payload)
+        if name != order.name or direction not in (NEXT, PREV):
+            raise ValueError("cursor does not match this listing")
+        if len(values) != len(order.columns):
+            raise ValueError("wrong number of key values")
+        return direction, [_load_value(c, v) for c, v in zip(order.columns, values)]
+    except (ValueError, TypeError) as e:
+        raise ValidationException("Invalid cursor", field="cursor") from e
+
+
+def _page_query(
+    stmt: Select,
+    order: KeysetOrder,
+    limit: int,
+    cursor: Optional[str],
+) -> Tuple[Select, str, bool]:
+    """Apply the keyset condition, order and limit; returns (query, direction, has_cursor)."""
+    stmt = stmt.where(*order.filters)
+    direction = NEXT
+    if cursor:
+        direction, values = decode_cursor(order, cursor)
+        key = tuple_(*order.columns)
+        # Moving forward along a descending order means smaller keys
+        forward_smaller = order.descending
+        smaller = forward_smaller if direction == NEXT else not forward_smaller
+        stmt = stmt.where(key < tuple_(*values) if smaller else key > tuple_(*values))
+
+    # Walking backwards reverses the order; results are flipped back afterwards
+    descending = order.descending if direction == NEXT else not order.descending
+    stmt = stmt.order_by(
+        *[column.desc() if descending else column.asc() for column in order.columns]
+    )
+    return stmt.limit(limit + 1), direction, bool(cursor)
+
+
+def _build_page(
+    rows: Sequence[Any],
+    order: KeysetOrder,
+    limit: int,
+    direction: str,
+    has_cursor: bool,
+) -> Page:
+    """Trim the probe row, restore display order and build neighbour cursors."""
+    items = list(rows[:limit])
+    has_more = len(rows) > limit
+    if direction == PREV:
+        items.reverse()
+        has_next, has_prev = True, has_more
+    else:
+        has_next, has_prev = has_more, has_cursor
+    return Page(
+        items=items,
+        next_cursor=encode_cursor(order, NEXT, items[-1]) if items and has_next else None,
+        prev_cursor=encode_cursor(order, PREV, items[0]) if items and has_prev else None,
+    )
+
+
+def _clamp(limit: int) -> int:
+    return max(1, min(limit, settings.PAGINATION_MAX_LIMIT))
+
+
+def _explain_sql(stmt: Select, dialect: Dialect) -> str:
+    """Render the count query for EXPLAIN with bound values inlined."""
+    compiled = stmt.order_by(None).compile(
+        dialect=dialect,
+        compile_kwargs={"literal_binds": True},
+    )
+    return f"EXPLAIN (FORMAT JSON) {compiled}"
+
+
+def _plan_rows(plan: Any) -> int:
+    # psycopg2 parses the JSON plan, asyncpg returns it as text
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+    return int(plan[0]["Plan"]["Plan Rows"])
+
+
+def paginate(
+    db: Session,
+    stmt: Select,
+    order: KeysetOrder,
+    limit: int = 20,
+    cursor: Optional[str] = None,
+    estimate_total: bool = False,
+) -> Page:
+    """
+    Fetch one page of an ORM entity query.
+
+    Args:
+        db: Database session
+        stmt: Entity query with filters but without ORDER BY/LIMIT,
+            e.g. select(Job).where(Job.is_active)
+        order: Sort key of the listing
+        limit: Page size, capped at PAGINATION_MAX_LIMIT
+        cursor: next_cursor or prev_cursor of a previous page (optional)
+        estimate_total: Include the planner's row estimate for the whole
+            listing instead of running COUNT(*)
+
+    Returns:
+        Page of entities
+    """
+    limit = _clamp(limit)
+    query, direction, has_cursor = _page_query(stmt, order, limit, cursor)
+    page = _build_page(db.scalars(query).all(), order, limit, direction, has_cursor)
+    if estimate_total:
+        page.total_estimate = estimate_count(db, stmt.where(*order.filters))
+    return page
+
+
+async def apaginate(
+    db: AsyncSession,
+    stmt: Select,
+    order: KeysetOrder,
+    limit: int = 20,
+    cursor: Optional[str] = None,
+    estimate_total: bool = False,
+) -> Page:
+    """Async counterpart of paginate."""
+    limit = _clamp(limit)
+    query, direction, has_cursor = _page_query(stmt, order, limit, cursor)
+    rows = (await db.scalars(query)).all()
+    page = _build_page(rows, order, limit, direction, has_cursor)
+    if estimate_total:
+        page.total_estimate = await aestimate_count(db, stmt.where(*order.filters))
+    return page
+
+
+def estimate_count(db: Session, stmt: Select) -> Optional[int]:
+    """
+    Estimate how many rows a query returns from planner statistics.
+
+    Much cheaper than COUNT(*) on large tables, but only as accurate as the
+    latest ANALYZE; meant for "about N results" displays.
+
+    Returns:
+        Estimated row count, None if it could not be estimated
+    """
+    try:
+        conn = db.connection()
+        return _plan_rows(conn.exec_driver_sql(_explain_sql(stmt, conn.dialect)).scalar())
+    except Exception:
+        return None
+
+
+async def aestimate_count(db: AsyncSession, stmt: Select) -> Optional[int]:
+    """Async counterpart of estimate_count."""
+    try:
+        conn = await db.connection()
+        result = await conn.exec_driver_sql(_explain_sql(stmt, conn.dialect))
+        return _plan_rows(result.scalar())
+    except Exception:
+        return None
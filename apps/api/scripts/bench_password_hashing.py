@@ -0,0 +1,88 @@
+"""
+Password hashing microbenchmark.
+
+Reports bcrypt hashes/sec on one core and through the async executor, for
+the configured BCRYPT_ROUNDS (or --rounds), to pick a work factor and
+PASSWORD_HASH_WORKERS for the target hardware. Aim for roughly 100-300 ms
+per hash on production CPUs.
+
+Usage (from apps/api):
+    python scripts/bench_password_hashing.py
+    python scripts/bench_password_hashing.py --rounds 10 11 12 13 --seconds 3
+"""
+import argparse
+import asyncio
+import os
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from passlib.context import CryptContext  # noqa: E402
+
+from app.config import settings  # noqa: E402
+from app.core import security  # noqa: E402
+
+PASSWORD = "correct horse battery staple"
+
+
+def bench_single(context: CryptContext, seconds: float) -> float:
+    """Hashes/sec on the calling thread, i.e. one core."""
+    count = 0
+    started = time.perf_counter()
+    while time.perf_counter() - started < seconds:
+        context.hash(PASSWORD)
+        count += 1
+    return count / (time.perf_counter() - started)
+
+
+async def bench_executor(seconds: float) -> tuple:
+    """Hashes/sec through get_password_hash_async, plus event loop lag."""
+    count = 0
+    max_lag = 0.0
+    deadline = time.perf_counter() + seconds
+
+    async def worker():
+        nonlocal count
+        while time.perf_counter() < deadline:
+            await security.get_password_hash_async(PASSWORD)
+            count += 1
+
+    async def lag_probe():
+        # How late a 10 ms sleep wakes up tells how blocked the loop was
+        nonlocal max_lag
+        while time.perf_counter() < deadline:
+            before = time.perf_counter()
+            await asyncio.sleep(0.01)
+            max_lag = max(max_lag, time.perf_counter() - before - 0.01)
+
+    started = time.perf_counter()
+    await asyncio.gather(lag_probe(), *[worker() for _ in range(settings.PASSWORD_HASH_WORKERS * 2)])
+    return count / (time.perf_counter() - started), max_lag
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument("--rounds", type=int, nargs="+", default=[settings.BCRYPT_ROUNDS])
+    parser.add_argument("--seconds", type=float, default=2.0, help="Duration per measurement")
+    args = parser.parse_args()
+
+    print(f"cpus={os.cpu_count()} PASSWORD_HASH_WORKERS={settings.PASSWORD_HASH_WORKERS}")
+    print(f"{'rounds':>6} {'ms/hash':>8} {'hashes/s/core':>14}")
+    for rounds in args.rounds:
+        context = CryptContext(schemes=["bcrypt"], bcrypt__rounds=rounds)
+        rate = bench_single(context, args.seconds)
+        print(f"{rounds:>6} {1000 / rate:>8.1f} {rate:>14.1f}")
+
+    rate, lag = asyncio.run(bench_executor(args.seconds))
+    cores = min(settings.PASSWORD_HASH_WORKERS, os.cpu_count() or 1)
+    print(
+        f"executor (BCRYPT_ROUNDS={settings.BCRYPT_ROUNDS}): {rate:.1f} hashes/s total, "
+        f"{rate / cores:.1f} per core, "
+        f"max event loop lag {lag * 1000:.1f} ms"
+    )
+
+
+if __name__ == "__main__":
+    main()
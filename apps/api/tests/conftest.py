@@ -0,0 +1,49 @@
+"""
+Shared fixtures: Redis-backed caches on an in-memory fakeredis server.
+"""
+import fakeredis
+import fakeredis.aioredis
+import pytest
+import redis
+import redis.asyncio
+
+from app.core.cache import AsyncCache, Cache
+from app.core.circuit_breaker import CircuitBreaker
+from app.core.local_cache import TTLCache
+
+
+@pytest.fixture
+def redis_server() -> fakeredis.FakeServer:
+    return fakeredis.FakeServer()
+
+
+@pytest.fixture
+def breaker() -> CircuitBreaker:
+    return CircuitBreaker("test-redis", failure_threshold=3, recovery_timeout=30)
+
+
+@pytest.fixture
+def fallback() -> TTLCache:
+    return TTLCache(max_entries=100, ttl=60)
+
+
+@pytest.fixture
+def cache(monkeypatch, redis_server, breaker, fallback) -> Cache:
+    """Sync Cache talking to fakeredis, with its own breaker and fallback."""
+    monkeypatch.setattr(
+        redis, "from_url", lambda *args, **kwargs: fakeredis.FakeRedis(server=redis_server)
+    )
+    return Cache(breaker=breaker, fallback=fallback)
+
+
+@pytest.fixture
+async def async_cache(monkeypatch, redis_server, breaker, fallback) -> AsyncCache:
+    """AsyncCache on the same fakeredis server as `cache`."""
+    monkeypatch.setattr(
+        redis.asyncio,
+        "from_url",
+        lambda *args, **kwargs: fakeredis.aioredis.FakeRedis(server=redis_server),
+    )
+    client = AsyncCache(breaker=breaker, fallback=fallback)
+    yield client
+    await client.close()
@@ -0,0 +1,149 @@
+"""
+Tests for the before_flush listener that keeps ApplicationStats in step with
+Application changes.
+"""
+import uuid
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.dialects.postgresql import JSONB
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.orm import sessionmaker
+
+from app.models import application_stats
+from app.models.application import Application
+from app.models.application_stats import contribution
+
+
+@compiles(JSONB, "sqlite")
+def _jsonb_on_sqlite(type_, compiler, **kw):
+    return "JSON"
+
+
+@pytest.fixture
+def increments(monkeypatch):
+    """Deltas the listener upserts, as (user_id, delta) pairs."""
+    recorded = []
+    monkeypatch.setattr(
+        application_stats,
+        "upsert_increments",
+        lambda session, user_id, delta: recorded.append((user_id, delta)),
+    )
+    return recorded
+
+
+@pytest.fixture
+def session():
+    engine = create_engine("sqlite://", execution_options={"schema_translate_map": {"auth": None}})
+    Application.__table__.create(engine)
+    with sessionmaker(engine)() as session:
+        yield session
+    engine.dispose()
+
+
+def new_application(user_id, **values) -> Application:
+    return Application(user_id=user_id, job_id=uuid.uuid4(), **values)
+
+
+def test_insert_adds_the_application(session, increments):
+    user_id = uuid.uuid4()
+    session.add(new_application(user_id, status="applied"))
+    session.add(new_application(user_id))  # Column default: draft
+    session.flush()
+
+    assert increments == [(user_id, {"total": 2, "applied": 1, "draft": 1})]
+
+
+def test_status_change_moves_the_count(session, increments):
+    user_id = uuid.uuid4()
+    application = new_application(user_id, status="applied")
+    session.add(application)
+    session.commit()
+    increments.clear()
+
+    # Attributes are expired by the commit: the old status must still be seen
+    application.status = "interviewing"
+    session.flush()
+
+    assert increments == [(user_id, {"applied": -1, "interviewing": 1})]
+
+
+def test_untracked_changes_are_ignored(session, increments):
+    application = new_application(uuid.uuid4(), status="applied")
+    session.add(application)
+    session.commit()
+    increments.clear()
+
+    application.notes = "Follow up next week"
+    session.flush()
+
+    assert increments == []
+
+
+def test_delete_subtracts_the_application(session, increments):
+    user_id = uuid.uuid4()
+    application = new_application(user_id, status="rejected")
+    session.add(application)
+    session.commit()
+    increments.clear()
+
+    session.delete(application)
+    session.flush()
+
+    assert increments == [(user_id, {"total": -1, "rejected": -1})]
+
+
+def test_reassigned_application_moves_between_users(session, increments):
+    old_user, new_user = sorted([uuid.uuid4(), uuid.uuid4()], key=str)
+    application = new_application(old_user, status="offered")
+    session.add(application)
+    session.commit()
+    increments.clear()
+
+    application.user_id = new_user
+    session.flush()
+
+    assert increments == [
+        (old_user, {"total": -1, "offered": -1}),
+        (new_user, {"total": 1, "offered": 1}),
+    ]
+
+
+def test_interview_timing_is_tracked(session, increments):
+    user_id = uuid.uuid4()
+    applied_at = datetime(2026, 10, 1, tzinfo=timezone.utc)
+    application = new_application(user_id, status="applied", applied_at=applied_at)
+    session.add(application)
+    session.commit()
+    increments.clear()
+
+    application.status = "interviewing"
+    application.interview_dates = [{"date": (applied_at + timedelta(days=3)).isoformat()}]
+    session.flush()
+
+    assert increments == [
+        (
+            user_id,
+            {"applied": -1, "interviewing": 1, "interviews_tracked": 1, "days_to_interview_sum": 3.0},
+        )
+    ]
+
+
+@pytest.mark.parametrize(
+    "status, applied_at, interview_dates, expected",
+    [
+        (None, None, None, {"total": 1, "draft": 1}),
+        ("unknown", None, None, {"total": 1}),
+        (
+            "interviewing",
+            "2026-10-01T00:00:00+00:00",
+            ["2026-10-03T12:00:00+00:00", "bad", {"scheduled_at": "2026-10-02T00:00:00Z"}],
+            {"total": 1, "interviewing": 1, "interviews_tracked": 1, "days_to_interview_sum": 1.0},
+        ),
+        # Interviews before the application date are not counted
+        ("interviewing", "2026-10-05", ["2026-10-01"], {"total": 1, "interviewing": 1}),
+    ],
+)
+def test_contribution(status, applied_at, interview_dates, expected):
+    assert contribution(status, applied_at, interview_dates) == expected
@@ -0,0 +1,58 @@
+"""
+Tests for the asyncio Redis cache client.
+"""
+import asyncio
+
+import redis
+
+from app.core.cache import AsyncCache, get_cache
+
+
+async def test_set_get_delete(async_cache):
+    assert await async_cache.get("profile:1") is None
+
+    assert await async_cache.set("profile:1", {"name": "Ada"}, expire=60)
+    assert await async_cache.get("profile:1") == {"name": "Ada"}
+    assert await async_cache.exists("profile:1")
+
+    assert await async_cache.delete("profile:1")
+    assert await async_cache.get("profile:1") is None
+    assert not await async_cache.exists("profile:1")
+
+
+async def test_expire_sets_a_ttl(async_cache):
+    await async_cache.set("profile:1", "x", expire=60)
+    await async_cache.set("profile:2", "x")
+
+    assert 0 < await async_cache.redis_client.ttl("profile:1") <= 60
+    assert await async_cache.redis_client.ttl("profile:2") == -1
+
+
+async def test_sync_and_async_clients_share_entries(cache, async_cache):
+    cache.set("profile:1", {"name": "Ada"}, expire=60)
+    assert await async_cache.get("profile:1") == {"name": "Ada"}
+
+    await async_cache.set("profile:2", [1, 2], expire=60)
+    assert cache.get("profile:2") == [1, 2]
+
+
+async def test_calls_do_not_block_each_other(async_cache):
+    await asyncio.gather(*(async_cache.set(f"job:{i}", i, expire=60) for i in range(50)))
+
+    values = await asyncio.gather(*(async_cache.get(f"job:{i}") for i in range(50)))
+
+    assert values == list(range(50))
+
+
+async def test_redis_errors_are_misses(async_cache, monkeypatch):
+    async def unavailable(*args, **kwargs):
+        raise redis.ConnectionError("down")
+
+    monkeypatch.setattr(async_cache.redis_client, "get", unavailable)
+
+    assert await async_cache.get("profile:1") is None
+    assert await async_cache.ping() is True  # Only get is down
+
+
+def test_get_cache_returns_the_async_client():
+    assert isinstance(get_cache(), AsyncCache)
@@ -0,0 +1,85 @@
+"""
+Tests for the async engine configuration and the get_async_db dependency.
+"""
+import pytest
+from sqlalchemy import Column, Integer, String, select
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+from sqlalchemy.orm import declarative_base
+
+from app.config import Settings
+from app.core import database
+from app.core.database import get_async_db
+
+Model = declarative_base()
+
+
+class Note(Model):
+    __tablename__ = "notes"
+    id = Column(Integer, primary_key=True)
+    text = Column(String(100))
+
+
+@pytest.fixture
+async def engine(monkeypatch):
+    engine = create_async_engine("sqlite+aiosqlite://")
+    async with engine.begin() as conn:
+        await conn.run_sync(Model.metadata.create_all)
+    # The app's own session factory, pointed at SQLite
+    monkeypatch.setitem(database.AsyncSessionLocal.kw, "bind", engine)
+    yield engine
+    await engine.dispose()
+
+
+async def count_notes(engine) -> int:
+    async with AsyncSession(engine) as db:
+        return len((await db.scalars(select(Note))).all())
+
+
+async def test_dependency_yields_a_session_and_closes_it(engine):
+    dependency = get_async_db()
+    db = await anext(dependency)
+    assert isinstance(db, AsyncSession)
+    db.add(Note(text="saved"))
+    await db.commit()
+
+    with pytest.raises(StopAsyncIteration):
+        await anext(dependency)
+
+    assert not db.in_transaction()
+    assert await count_notes(engine) == 1
+
+
+async def test_uncommitted_work_is_rolled_back_on_error(engine):
+    dependency = get_async_db()
+    db = await anext(dependency)
+    db.add(Note(text="lost"))
+    await db.flush()
+
+    with pytest.raises(RuntimeError):
+        await dependency.athrow(RuntimeError("handler failed"))
+
+    assert await count_notes(engine) == 0
+
+
+async def test_attributes_stay_loaded_after_commit(engine):
+    async for db in get_async_db():
+        note = Note(text="kept")
+        db.add(note)
+        await db.commit()
+
+        # No implicit refresh (which would need an await) after commit
+        assert note.text == "kept"
+        assert note.id is not None
+
+
+@pytest.mark.parametrize(
+    "url, expected",
+    [
+        ("postgresql://u:p@db/app", "postgresql+asyncpg://u:p@db/app"),
+        ("postgres://u:p@db/app", "postgresql+asyncpg://u:p@db/app"),
+        ("postgresql+psycopg2://u:p@db/app?sslmode=require", "postgresql+asyncpg://u:p@db/app?ssl=require"),
+        ("sqlite+aiosqlite://", "sqlite+aiosqlite://"),
+    ],
+)
+def test_to_async_url(url, expected):
+    assert Settings.to_async_url(url) == expected
@@ -0,0 +1,96 @@
+"""
+Tests for batched cache operations and pipelines.
+"""
+import pytest
+
+from app.core.local_cache import LocalCache
+
+
+@pytest.fixture
+def mget_calls(cache, monkeypatch):
+    calls = []
+    mget = cache.redis_client.mget
+
+    def counted(keys):
+        calls.append(list(keys))
+        return mget(keys)
+
+    monkeypatch.setattr(cache.redis_client, "mget", counted)
+    return calls
+
+
+def test_get_many_is_dense_and_ordered(cache, mget_calls):
+    cache.set("job:1", "a")
+    cache.set("job:3", "c")
+
+    assert cache.get_many(["job:3", "job:2", "job:1"]) == ["c", None, "a"]
+    assert mget_calls == [["job:3", "job:2", "job:1"]]
+    assert cache.get_many([]) == []
+
+
+def test_get_many_only_asks_redis_for_l1_misses(cache, mget_calls):
+    cache.local = LocalCache({"profile": 10}, ttl=30)
+    cache.local.listener_started()
+    cache.local.set("profile:1", "local")
+    cache.set("profile:2", "remote")
+
+    assert cache.get_many(["profile:1", "profile:2"]) == ["local", "remote"]
+    assert mget_calls == [["profile:2"]]
+
+
+def test_set_many_with_per_key_ttls(cache):
+    assert cache.set_many({"job:1": 1, "job:2": 2, "job:3": 3}, expire={"job:1": 60, "job:2": 600})
+
+    assert cache.get_many(["job:1", "job:2", "job:3"]) == [1, 2, 3]
+    assert 0 < cache.redis_client.ttl("job:1") <= 60
+    assert 60 < cache.redis_client.ttl("job:2") <= 600
+    assert cache.redis_client.ttl("job:3") == -1
+    assert cache.set_many({})
+
+
+def test_delete_many_counts_deleted_keys(cache):
+    cache.set_many({"job:1": 1, "job:2": 2})
+
+    assert cache.delete_many(["job:1", "job:2", "job:3"]) == 2
+    assert cache.delete_many([]) == 0
+    assert cache.get_many(["job:1", "job:2"]) == [None, None]
+
+
+def test_pipeline_results_follow_queue_order(cache):
+    cache.set("job:1", {"title": "Engineer"})
+
+    with cache.pipeline() as pipe:
+        pipe.get("job:1").set("job:2", [1, 2], expire=60).exists("job:2").get("job:3").delete("job:1")
+
+    assert pipe.results == [{"title": "Engineer"}, True, True, None, True]
+    assert cache.get("job:1") is None
+    assert cache.get("job:2") == [1, 2]
+
+
+def test_pipeline_execute_inside_the_block(cache):
+    with cache.pipeline() as pipe:
+        pipe.set("job:1", 1)
+        assert pipe.execute() == [True]
+        pipe.get("job:1")
+
+    assert pipe.results == [True, 1]
+
+
+def test_pipeline_is_discarded_on_error(cache):
+    with pytest.raises(RuntimeError):
+        with cache.pipeline() as pipe:
+            pipe.set("job:1", 1)
+            raise RuntimeError("abort")
+
+    assert cache.get("job:1") is None
+
+
+async def test_async_batch_operations(async_cache):
+    assert await async_cache.set_many({"job:1": 1, "job:2": 2}, expire=60)
+    assert await async_cache.get_many(["job:2", "job:0", "job:1"]) == [2, None, 1]
+
+    async with async_cache.pipeline() as pipe:
+        pipe.get("job:1").delete("job:2")
+
+    assert pipe.results == [1, True]
+    assert await async_cache.delete_many(["job:1", "job:2"]) == 1
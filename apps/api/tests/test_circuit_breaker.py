@@ -0,0 +1,228 @@
+"""
+Tests for the circuit breaker state machine and the cache's use of it.
+"""
+import fakeredis
+import pytest
+import redis
+
+from app.config import settings
+from app.core.cache import REDIS_FAILURE_EXCEPTIONS
+from app.core.circuit_breaker import CircuitBreaker, CircuitOpenError
+from app.core.local_cache import LocalCache
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch) -> FakeClock:
+    clock = FakeClock()
+    monkeypatch.setattr("app.core.circuit_breaker.time.monotonic", clock)
+    return clock
+
+
+@pytest.fixture
+def breaker(clock) -> CircuitBreaker:
+    return CircuitBreaker(
+        "test",
+        failure_threshold=3,
+        recovery_timeout=30,
+        failure_exceptions=REDIS_FAILURE_EXCEPTIONS,
+    )
+
+
+def fail(breaker: CircuitBreaker) -> None:
+    with pytest.raises(redis.ConnectionError):
+        with breaker.guard():
+            raise redis.ConnectionError("down")
+
+
+def succeed(breaker: CircuitBreaker) -> None:
+    with breaker.guard():
+        pass
+
+
+def test_opens_after_consecutive_failures(breaker):
+    fail(breaker)
+    fail(breaker)
+    assert breaker.state == CircuitBreaker.CLOSED
+
+    fail(breaker)
+
+    assert breaker.state == CircuitBreaker.OPEN
+    with pytest.raises(CircuitOpenError):
+        succeed(breaker)
+
+
+def test_success_resets_the_failure_count(breaker):
+    fail(breaker)
+    fail(breaker)
+    succeed(breaker)
+    fail(breaker)
+    fail(breaker)
+
+    assert breaker.state == CircuitBreaker.CLOSED
+
+
+def test_half_open_after_recovery_timeout_allows_one_probe(breaker, clock):
+    for _ in range(3):
+        fail(breaker)
+    clock.now += 29.9
+    assert not breaker.allow_request()
+
+    clock.now += 0.1
+
+    assert breaker.state == CircuitBreaker.HALF_OPEN
+    assert breaker.allow_request()
+    assert not breaker.allow_request()  # The probe is still in flight
+
+
+def test_successful_probe_closes(breaker, clock):
+    for _ in range(3):
+        fail(breaker)
+    clock.now += 30
+
+    succeed(breaker)
+
+    assert breaker.state == CircuitBreaker.CLOSED
+    assert breaker.snapshot()["consecutive_failures"] == 0
+
+
+def test_failed_probe_reopens_for_a_full_timeout(breaker, clock):
+    for _ in range(3):
+        fail(breaker)
+    clock.now += 30
+
+    fail(breaker)
+
+    assert breaker.state == CircuitBreaker.OPEN
+    clock.now += 29
+    assert breaker.state == CircuitBreaker.OPEN
+    clock.now += 1
+    assert breaker.state == CircuitBreaker.HALF_OPEN
+
+
+def test_other_exceptions_release_the_probe_without_counting(breaker, clock):
+    for _ in range(3):
+        fail(breaker)
+    clock.now += 30
+
+    with pytest.raises(ValueError):
+        with breaker.guard():
+            raise ValueError("bad input, not a Redis failure")
+
+    assert breaker.state == CircuitBreaker.HALF_OPEN
+    succeed(breaker)
+    assert breaker.state == CircuitBreaker.CLOSED
+
+
+def test_listeners_see_each_transition(breaker, clock):
+    transitions = []
+    breaker.on_state_change(lambda old, new: transitions.append((old, new)))
+
+    for _ in range(3):
+        fail(breaker)
+    clock.now += 30
+    succeed(breaker)
+
+    assert transitions == [
+        (CircuitBreaker.CLOSED, CircuitBreaker.OPEN),
+        (CircuitBreaker.OPEN, CircuitBreaker.HALF_OPEN),
+        (CircuitBreaker.HALF_OPEN, CircuitBreaker.CLOSED),
+    ]
+
+
+class TestCacheWithOpenBreaker:
+    @pytest.fixture
+    def failing_cache(self, cache, monkeypatch):
+        def unavailable(*args, **kwargs):
+            raise redis.ConnectionError("connection refused")
+
+        for command in ("get", "set", "setex", "delete"):
+            monkeypatch.setattr(cache.redis_client, command, unavailable)
+        return cache
+
+    def test_failures_open_the_breaker_and_use_the_fallback(self, failing_cache):
+        assert failing_cache.set("job:1", {"title": "Engineer"}, expire=60) is False
+
+        assert failing_cache.get("job:1") == {"title": "Engineer"}  # From the fallback
+        failing_cache.get("job:2")
+        assert failing_cache.breaker.state == CircuitBreaker.OPEN
+
+    def test_open_breaker_skips_redis(self, failing_cache, monkeypatch):
+        for _ in range(3):
+            failing_cache.get("job:1")
+        calls = []
+        monkeypatch.setattr(failing_cache.redis_client, "get", lambda key: calls.append(key))
+
+        assert failing_cache.get("job:1") is None
+        assert calls == []
+
+
+class TestHalfOpenWrites:
+    """The half-open probe is a single write; its L1 invalidation must still go out."""
+
+    @pytest.fixture
+    def subscriber(self, redis_server):
+        pubsub = fakeredis.FakeRedis(server=redis_server).pubsub(ignore_subscribe_messages=True)
+        pubsub.subscribe(settings.CACHE_INVALIDATION_CHANNEL)
+        pubsub.get_message(timeout=0.1)  # Consume the subscribe confirmation
+        yield pubsub
+        pubsub.close()
+
+    @pytest.fixture
+    def half_open(self, breaker, clock):
+        for _ in range(3):
+            fail(breaker)
+        clock.now += 30
+        return breaker
+
+    @staticmethod
+    def published(subscriber):
+        messages = []
+        while (message := subscriber.get_message(timeout=0.1)) is not None:
+            messages.append(message["data"].decode())
+        return messages
+
+    def test_set_publishes_the_invalidation(self, cache, half_open, subscriber):
+        cache.local = LocalCache({"job": 10}, ttl=60)
+
+        assert cache.set("job:1", {"title": "Engineer"}, expire=60) is True
+
+        assert half_open.state == CircuitBreaker.CLOSED
+        assert self.published(subscriber) == [LocalCache.invalidation_message(["job:1"], [])]
+
+    def test_set_many_publishes_the_invalidation(self, cache, half_open, subscriber):
+        cache.local = LocalCache({"job": 10}, ttl=60)
+
+        assert cache.set_many({"job:1": 1, "job:2": 2}, expire=60) is True
+
+        assert half_open.state == CircuitBreaker.CLOSED
+        assert self.published(subscriber) == [
+            LocalCache.invalidation_message(["job:1", "job:2"], [])
+        ]
+
+    async def test_async_set_publishes_the_invalidation(self, async_cache, half_open, subscriber):
+        async_cache.local = LocalCache({"job": 10}, ttl=60)
+
+        assert await async_cache.set("job:1", {"title": "Engineer"}, expire=60) is True
+
+        assert half_open.state == CircuitBreaker.CLOSED
+        assert self.published(subscriber) == [LocalCache.invalidation_message(["job:1"], [])]
+
+    async def test_async_set_many_publishes_the_invalidation(
+        self, async_cache, half_open, subscriber
+    ):
+        async_cache.local = LocalCache({"job": 10}, ttl=60)
+
+        assert await async_cache.set_many({"job:1": 1, "job:2": 2}, expire=60) is True
+
+        assert half_open.state == CircuitBreaker.CLOSED
+        assert self.published(subscriber) == [
+            LocalCache.invalidation_message(["job:1", "job:2"], [])
+        ]
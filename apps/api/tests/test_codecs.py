@@ -0,0 +1,102 @@
+"""
+Tests for the cache value codecs.
+"""
+import json
+import os
+from datetime import datetime, timezone
+from decimal import Decimal
+
+import pytest
+
+from app.core import codecs
+from app.core.codecs import COMPRESSED_FLAG, CODECS, UnserializableValue, decode, encode
+from app.core.local_cache import MISSING
+
+VALUES = [
+    None,
+    True,
+    0,
+    -17,
+    2**40,
+    3.25,
+    "",
+    "zürich ✓",
+    [],
+    [1, "two", None, [3.5]],
+    {"id": "abc", "tags": ["python", "sql"], "nested": {"score": 0.75, "ok": False}},
+]
+
+
+@pytest.mark.parametrize("codec_name", sorted(CODECS))
+@pytest.mark.parametrize("value", VALUES, ids=repr)
+def test_round_trip(codec_name, value):
+    encoded = encode(value, codec_name)
+    assert encoded[0] & ~COMPRESSED_FLAG == CODECS[codec_name].header
+    assert decode(encoded) == value
+
+
+@pytest.mark.parametrize("codec_name", sorted(CODECS))
+def test_large_payloads_are_compressed(monkeypatch, codec_name):
+    monkeypatch.setattr(codecs.settings, "CACHE_COMPRESSION_MIN_BYTES", 256)
+    value = {"description": "Senior Python engineer. " * 200}
+
+    encoded = encode(value, codec_name)
+
+    assert encoded[0] & COMPRESSED_FLAG
+    assert len(encoded) < len(json.dumps(value))
+    assert decode(encoded) == value
+
+
+def test_incompressible_payload_is_stored_plain(monkeypatch):
+    monkeypatch.setattr(codecs.settings, "CACHE_COMPRESSION_MIN_BYTES", 16)
+    value = os.urandom(256)
+
+    encoded = encode(value, "msgpack")
+
+    assert not encoded[0] & COMPRESSED_FLAG
+    assert decode(encoded) == value
+
+
+def test_msgpack_keeps_bytes():
+    assert decode(encode({"blob": b"\x00\xff"}, "msgpack")) == {"blob": b"\x00\xff"}
+
+
+def test_legacy_entries_are_read():
+    value = {"user": "abc", "count": 3}
+    assert decode(json.dumps(value).encode()) == value
+    assert decode(encode(value, codecs.LEGACY_CODEC)) == value
+
+
+@pytest.mark.parametrize("codec_name", [*sorted(CODECS), codecs.LEGACY_CODEC])
+@pytest.mark.parametrize(
+    "value",
+    [datetime.now(timezone.utc), Decimal("1.10"), {1, 2}, object()],
+    ids=lambda value: type(value).__name__,
+)
+def test_non_plain_values_are_rejected(codec_name, value):
+    # Stringifying them would hand back a different type on the next read
+    with pytest.raises(UnserializableValue):
+        encode({"value": value}, codec_name)
+
+
+def test_register_codec_rejects_taken_headers():
+    with pytest.raises(ValueError):
+        codecs.register_codec("copy", CODECS["json"].header, json.dumps, json.loads)
+    with pytest.raises(ValueError):
+        codecs.register_codec("newline", 0x0A, json.dumps, json.loads)
+
+
+class TestCacheSet:
+    def test_set_and_get(self, cache):
+        assert cache.set("job:1", {"title": "Engineer"}, expire=60)
+        assert cache.get("job:1") == {"title": "Engineer"}
+
+    def test_unserializable_value_is_not_cached(self, cache):
+        assert cache.set("job:1", {"seen": datetime.now(timezone.utc)}) is False
+        assert cache.get("job:1") is None
+        assert cache.fallback.get("job:1") is MISSING
+
+    def test_set_many_skips_unserializable_values(self, cache):
+        assert cache.set_many({"a": 1, "b": {1, 2}}) is False
+        assert cache.get_many(["a", "b"]) == [1, None]
+
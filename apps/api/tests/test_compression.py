@@ -0,0 +1,172 @@
+"""
+Tests for Accept-Encoding negotiation and the compression middleware.
+"""
+import gzip
+import zlib
+from typing import Optional
+
+import brotli
+import pytest
+from starlette.datastructures import Headers
+
+from app.core.compression import CompressionMiddleware, is_compressible, negotiate_encoding
+
+
+@pytest.mark.parametrize(
+    "accept_encoding, expected",
+    [
+        ("", None),
+        ("identity", None),
+        ("gzip", "gzip"),
+        ("br", "br"),
+        ("gzip, deflate, br", "br"),  # Tie: brotli preferred
+        ("gzip;q=1.0, br;q=0.5", "gzip"),
+        ("br;q=0, gzip", "gzip"),
+        ("br;q=0, gzip;q=0", None),
+        ("*", "br"),
+        ("*;q=0.1, gzip;q=0.5", "gzip"),
+        ("gzip;q=0, *", "br"),
+        ("GZIP", "gzip"),
+        ("gzip;q=bogus, br;q=0.2", "br"),
+        ("deflate", None),
+    ],
+)
+def test_negotiate_encoding(accept_encoding, expected):
+    assert negotiate_encoding(accept_encoding) == expected
+
+
+@pytest.mark.parametrize(
+    "status, headers, expected",
+    [
+        (200, {"content-type": "application/json"}, True),
+        (200, {"content-type": "text/html; charset=utf-8"}, True),
+        (200, {"content-type": "application/pdf"}, False),
+        (200, {"content-type": "image/png"}, False),
+        (200, {"content-type": "text/event-stream"}, False),
+        (200, {"content-type": "application/json", "content-encoding": "gzip"}, False),
+        (200, {"content-type": "application/json", "cache-control": "no-transform"}, False),
+        (204, {}, False),
+        (206, {"content-type": "application/json"}, False),
+        (304, {}, False),
+    ],
+)
+def test_is_compressible(status, headers, expected):
+    assert is_compressible(status, Headers(headers)) is expected
+
+
+def json_app(
+    body: bytes,
+    chunks: int = 1,
+    etag: Optional[str] = None,
+    content_type: bytes = b"application/json",
+):
+    async def app(scope, receive, send):
+        headers = [
+            (b"content-type", content_type),
+            (b"content-length", str(len(body)).encode()),
+        ]
+        if etag:
+            headers.append((b"etag", etag.encode()))
+        await send({"type": "http.response.start", "status": 200, "headers": headers})
+        size = len(body) // chunks
+        for i in range(chunks):
+            last = i == chunks - 1
+            chunk = body[i * size:] if last else body[i * size:(i + 1) * size]
+            await send({"type": "http.response.body", "body": chunk, "more_body": not last})
+
+    return app
+
+
+async def call(app, accept_encoding: str):
+    messages = []
+
+    async def receive():
+        return {"type": "http.request", "body": b""}
+
+    async def send(message):
+        messages.append(message)
+
+    scope = {
+        "type": "http",
+        "method": "GET",
+        "path": "/",
+        "headers": [(b"accept-encoding", accept_encoding.encode())],
+    }
+    await app(scope, receive, send)
+    headers = Headers(raw=messages[0]["headers"])
+    body = b"".join(message.get("body", b"") for message in messages[1:])
+    return headers, body
+
+
+BODY = b'{"jobs": [' + b",".join(b'{"title": "Python engineer"}' for _ in range(200)) + b"]}"
+
+
+@pytest.mark.parametrize(
+    "accept_encoding, encoding, decompress",
+    [("br", "br", brotli.decompress), ("gzip", "gzip", gzip.decompress)],
+)
+async def test_large_responses_are_compressed(accept_encoding, encoding, decompress):
+    headers, body = await call(CompressionMiddleware(json_app(BODY), minimum_size=500), accept_encoding)
+
+    assert headers["content-encoding"] == encoding
+    assert headers["vary"] == "Accept-Encoding"
+    assert int(headers["content-length"]) == len(body) < len(BODY)
+    assert decompress(body) == BODY
+
+
+async def test_small_responses_are_sent_as_is():
+    headers, body = await call(CompressionMiddleware(json_app(b'{"ok": true}'), minimum_size=500), "br")
+
+    assert "content-encoding" not in headers
+    assert body == b'{"ok": true}'
+
+
+@pytest.mark.parametrize("accept_encoding", ["identity", "", "deflate"])
+async def test_identity_requests_are_not_compressed(accept_encoding):
+    headers, body = await call(CompressionMiddleware(json_app(BODY), minimum_size=500), accept_encoding)
+
+    assert "content-encoding" not in headers
+    assert headers["vary"] == "Accept-Encoding"  # A br/gzip client would get another variant
+    assert body == BODY
+
+
+async def test_small_responses_still_vary():
+    headers, _ = await call(CompressionMiddleware(json_app(b'{"ok": true}'), minimum_size=500), "br")
+
+    assert headers["vary"] == "Accept-Encoding"
+
+
+async def test_incompressible_types_do_not_vary():
+    app = json_app(BODY, content_type=b"image/png")
+    for accept_encoding in ("br", "identity"):
+        headers, _ = await call(CompressionMiddleware(app, minimum_size=500), accept_encoding)
+
+        assert "vary" not in headers
+
+
+async def test_compressed_responses_get_a_weak_etag():
+    headers, _ = await call(CompressionMiddleware(json_app(BODY, etag='"v1"'), minimum_size=500), "br")
+
+    assert headers["etag"] == 'W/"v1"'
+
+
+@pytest.mark.parametrize(
+    "etag, accept_encoding, expected",
+    [('W/"v1"', "br", 'W/"v1"'), ('"v1"', "identity", '"v1"')],
+)
+async def test_etag_is_kept_when_already_weak_or_uncompressed(etag, accept_encoding, expected):
+    headers, _ = await call(
+        CompressionMiddleware(json_app(BODY, etag=etag), minimum_size=500), accept_encoding
+    )
+
+    assert headers["etag"] == expected
+
+
+async def test_streamed_responses_are_compressed_without_a_length():
+    headers, body = await call(
+        CompressionMiddleware(json_app(BODY, chunks=4), minimum_size=500), "gzip"
+    )
+
+    assert headers["content-encoding"] == "gzip"
+    assert "content-length" not in headers
+    assert zlib.decompress(body, 31) == BODY
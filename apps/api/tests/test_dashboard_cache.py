@@ -0,0 +1,176 @@
+"""
+Tests for dashboard caching and its invalidation when a session commits.
+"""
+import asyncio
+import contextlib
+import uuid
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.dialects.postgresql import JSONB
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.orm import sessionmaker
+
+from app.models import application_stats
+from app.models.application import Application
+from app.services import dashboard
+from app.services.dashboard import (
+    STALE_USERS_INFO_KEY,
+    dashboard_cache_key,
+    get_dashboard,
+    mark_dashboards_stale,
+    mark_job_dashboards_stale,
+)
+
+
+@compiles(JSONB, "sqlite")
+def _jsonb_on_sqlite(type_, compiler, **kw):
+    return "JSON"
+
+
+@pytest.fixture(autouse=True)
+def no_stats(monkeypatch):
+    # ApplicationStats upserts are Postgres-only and covered elsewhere
+    monkeypatch.setattr(application_stats, "upsert_increments", lambda session, user_id, delta: None)
+
+
+@pytest.fixture
+def session(monkeypatch, cache):
+    monkeypatch.setattr(dashboard, "cache", cache)
+    engine = create_engine("sqlite://", execution_options={"schema_translate_map": {"auth": None}})
+    Application.__table__.create(engine)
+    with sessionmaker(engine)() as session:
+        yield session
+    engine.dispose()
+
+
+def cache_dashboard(cache, user_id) -> str:
+    key = dashboard_cache_key(user_id)
+    cache.set(key, {"user_id": str(user_id)}, expire=60, tags=[f"user:{user_id}"])
+    return key
+
+
+def test_commit_drops_dashboard_of_changed_user(session, cache):
+    user_id, other_id = uuid.uuid4(), uuid.uuid4()
+    key = cache_dashboard(cache, user_id)
+    other_key = cache_dashboard(cache, other_id)
+
+    session.add(Application(user_id=user_id, job_id=uuid.uuid4()))
+    session.flush()
+    assert cache.exists(key)  # nothing is dropped before the commit
+
+    session.commit()
+
+    assert not cache.exists(key)
+    assert cache.exists(other_key)
+    assert STALE_USERS_INFO_KEY not in session.info
+
+
+def test_update_and_delete_drop_dashboard(session, cache):
+    user_id = uuid.uuid4()
+    application = Application(user_id=user_id, job_id=uuid.uuid4())
+    session.add(application)
+    session.commit()
+
+    key = cache_dashboard(cache, user_id)
+    application.notes = "Called back"
+    session.commit()
+    assert not cache.exists(key)
+
+    key = cache_dashboard(cache, user_id)
+    session.delete(application)
+    session.commit()
+    assert not cache.exists(key)
+
+
+def test_rollback_keeps_dashboard(session, cache):
+    user_id = uuid.uuid4()
+    key = cache_dashboard(cache, user_id)
+
+    session.add(Application(user_id=user_id, job_id=uuid.uuid4()))
+    session.flush()
+    session.rollback()
+    session.commit()
+
+    assert cache.exists(key)
+    assert STALE_USERS_INFO_KEY not in session.info
+
+
+def test_marked_users_are_dropped_on_commit(session, cache):
+    user_id = uuid.uuid4()
+    key = cache_dashboard(cache, user_id)
+
+    mark_dashboards_stale(session, [user_id])
+    assert cache.exists(key)
+    session.commit()
+
+    assert not cache.exists(key)
+
+
+def test_job_change_drops_dashboards_of_applicants(session, cache):
+    job_id = uuid.uuid4()
+    applicants = [uuid.uuid4(), uuid.uuid4()]
+    bystander = uuid.uuid4()
+    session.add_all([Application(user_id=user_id, job_id=job_id) for user_id in applicants])
+    session.add(Application(user_id=bystander, job_id=uuid.uuid4()))
+    session.commit()
+    keys = [cache_dashboard(cache, user_id) for user_id in applicants]
+    bystander_key = cache_dashboard(cache, bystander)
+
+    mark_job_dashboards_stale(session, [job_id])
+    session.commit()
+
+    assert not any(cache.exists(key) for key in keys)
+    assert cache.exists(bystander_key)
+
+
+def test_no_jobs_marks_nothing(session):
+    mark_job_dashboards_stale(session, [])
+
+    assert STALE_USERS_INFO_KEY not in session.info
+
+
+async def test_commit_on_event_loop_invalidates_without_blocking(session, monkeypatch, async_cache):
+    monkeypatch.setattr(dashboard, "async_cache", async_cache)
+    monkeypatch.setattr(dashboard, "cache", None)  # must not be used on the loop
+    user_id = uuid.uuid4()
+    key = dashboard_cache_key(user_id)
+    await async_cache.set(key, {"user_id": str(user_id)}, expire=60, tags=[f"user:{user_id}"])
+
+    session.add(Application(user_id=user_id, job_id=uuid.uuid4()))
+    session.commit()
+    await asyncio.gather(*dashboard._pending_invalidations)
+
+    assert not await async_cache.exists(key)
+    assert not dashboard._pending_invalidations
+
+
+@pytest.fixture
+def loads(monkeypatch, async_cache):
+    """User IDs passed to load_dashboard, with the read session stubbed out."""
+    recorded = []
+
+    async def load_dashboard(db, user_id):
+        recorded.append(user_id)
+        return {"user_id": user_id, "version": len(recorded)}
+
+    async def open_async_read_session(user_id=None):
+        return contextlib.nullcontext()
+
+    monkeypatch.setattr(dashboard, "async_cache", async_cache)
+    monkeypatch.setattr(dashboard, "load_dashboard", load_dashboard)
+    monkeypatch.setattr(dashboard, "open_async_read_session", open_async_read_session)
+    return recorded
+
+
+async def test_dashboard_is_cached_until_user_tag_invalidated(loads, async_cache):
+    user_id = uuid.uuid4()
+
+    first = await get_dashboard(user_id)
+    second = await get_dashboard(user_id)
+    assert first == second == {"user_id": str(user_id), "version": 1}
+    assert loads == [str(user_id)]
+
+    await async_cache.invalidate_tags(f"user:{user_id}")
+
+    assert (await get_dashboard(user_id))["version"] == 2
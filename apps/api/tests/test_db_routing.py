@@ -0,0 +1,200 @@
+"""
+Tests for read-replica routing and read-your-writes.
+"""
+import asyncio
+import logging
+
+import pytest
+from sqlalchemy import Column, Integer, String, create_engine, select, text, update
+from sqlalchemy.orm import declarative_base, sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from app.config import settings
+from app.core import database, db_routing
+from app.core.db_routing import (
+    REPLICA_INFO_KEY,
+    USER_INFO_KEY,
+    ReplicaRouter,
+    RoutingSession,
+    ryw_key,
+)
+
+Model = declarative_base()
+
+
+class Note(Model):
+    __tablename__ = "notes"
+    id = Column(Integer, primary_key=True)
+    text = Column(String(100))
+
+
+def sqlite_engine(served_by: str):
+    """An in-memory database holding one note saying which server it is."""
+    engine = create_engine("sqlite://", poolclass=StaticPool)
+    Model.metadata.create_all(engine)
+    with engine.begin() as conn:
+        conn.execute(Note.__table__.insert().values(id=1, text=served_by))
+    return engine
+
+
+@pytest.fixture
+def primary():
+    return sqlite_engine("primary")
+
+
+@pytest.fixture
+def replica():
+    return sqlite_engine("replica")
+
+
+@pytest.fixture
+def caches(monkeypatch, cache, async_cache):
+    monkeypatch.setattr(db_routing, "cache", cache)
+    monkeypatch.setattr(db_routing, "async_cache", async_cache)
+    monkeypatch.setattr(database, "cache", cache)
+
+
+@pytest.fixture
+def read_session(primary, replica, caches):
+    def open_session(user_id=None, with_replica=True):
+        db = sessionmaker(class_=RoutingSession, bind=primary, autoflush=False)()
+        if with_replica:
+            db.info[REPLICA_INFO_KEY] = replica
+        if user_id is not None:
+            db.info[USER_INFO_KEY] = user_id
+        return db
+
+    return open_session
+
+
+def served_by(db) -> str:
+    return db.scalar(select(Note.text).where(Note.id == 1))
+
+
+class TestRoutingSession:
+    def test_reads_go_to_the_replica(self, read_session):
+        with read_session() as db:
+            assert served_by(db) == "replica"
+
+    def test_without_a_replica_reads_go_to_the_primary(self, read_session):
+        with read_session(with_replica=False) as db:
+            assert served_by(db) == "primary"
+
+    def test_session_stays_on_the_primary_once_it_writes(self, read_session):
+        with read_session() as db:
+            db.add(Note(id=2, text="new"))
+            db.flush()
+
+            assert served_by(db) == "primary"
+            assert db.get(Note, 2).text == "new"
+
+    def test_direct_dml_pins_to_the_primary(self, read_session, primary):
+        with read_session() as db:
+            db.execute(update(Note).where(Note.id == 1).values(text="primary, updated"))
+
+            assert served_by(db) == "primary, updated"
+
+    def test_locking_reads_go_to_the_primary(self, read_session):
+        with read_session() as db:
+            assert db.scalar(select(Note.text).with_for_update()) == "primary"
+            assert served_by(db) == "primary"
+
+
+class TestReadYourWrites:
+    def test_commit_starts_a_window_for_the_user(self, read_session, cache):
+        with read_session(user_id="u1") as db:
+            db.add(Note(id=2, text="new"))
+            db.commit()
+
+        assert cache.get(ryw_key("u1")) == 1
+        assert 0 < cache.redis_client.ttl(ryw_key("u1")) <= settings.DB_READ_YOUR_WRITES_TTL
+
+    def test_no_window_without_a_write(self, read_session, cache):
+        with read_session(user_id="u1") as db:
+            served_by(db)
+            db.commit()
+
+        assert cache.get(ryw_key("u1")) is None
+
+    def test_no_window_for_rolled_back_writes(self, read_session, cache):
+        with read_session(user_id="u1") as db:
+            db.add(Note(id=2, text="new"))
+            db.flush()
+            db.rollback()
+            db.commit()
+
+        assert cache.get(ryw_key("u1")) is None
+
+    async def test_commit_on_the_event_loop_sets_the_marker_in_the_background(
+        self, read_session, async_cache
+    ):
+        with read_session(user_id="u1") as db:
+            db.add(Note(id=2, text="new"))
+            db.commit()
+
+        assert db_routing._pending_markers
+        await asyncio.gather(*db_routing._pending_markers)
+        assert await async_cache.get(ryw_key("u1")) == 1
+
+    def test_read_sessions_skip_the_replica_during_the_window(
+        self, primary, replica, caches, cache, monkeypatch
+    ):
+        router = ReplicaRouter([replica], max_lag=5, check_interval=60)
+        monkeypatch.setattr(router, "_check", lambda index: True)
+        monkeypatch.setattr(database, "replica_router", router)
+        monkeypatch.setitem(database.ReadSessionLocal.kw, "bind", primary)
+
+        with database.open_read_session("u1") as db:
+            assert served_by(db) == "replica"
+        cache.set(ryw_key("u1"), 1, expire=10)
+        with database.open_read_session("u1") as db:
+            assert served_by(db) == "primary"
+        with database.open_read_session("u2") as db:
+            assert served_by(db) == "replica"
+
+
+class TestReplicaRouter:
+    @pytest.fixture
+    def lag(self, monkeypatch):
+        """Make the lag query report a fixed number of seconds."""
+        def set_lag(seconds):
+            monkeypatch.setattr(
+                db_routing, "REPLICA_LAG_SQL", text("SELECT :lag").bindparams(lag=seconds)
+            )
+
+        return set_lag
+
+    def test_healthy_replica_is_chosen(self, replica, lag):
+        lag(1.5)
+        router = ReplicaRouter([replica], max_lag=5, check_interval=60)
+
+        assert router.choose() is replica
+
+    def test_lagging_replica_is_skipped(self, replica, lag, caplog):
+        lag(30)
+        router = ReplicaRouter([replica], max_lag=5, check_interval=60)
+
+        with caplog.at_level(logging.WARNING, logger="app.core.db_routing"):
+            assert router.choose() is None
+            assert router.choose() is None
+
+        assert len(caplog.records) == 1  # Logged on the transition only
+
+    def test_unreachable_replica_is_skipped(self):
+        broken = create_engine("sqlite:////nonexistent/dir/replica.db")
+        router = ReplicaRouter([broken], max_lag=5, check_interval=60)
+
+        assert router.choose() is None
+
+    def test_health_is_cached_for_the_check_interval(self, replica, lag, monkeypatch):
+        now = [100.0]
+        monkeypatch.setattr("app.core.db_routing.time.monotonic", lambda: now[0])
+        router = ReplicaRouter([replica], max_lag=5, check_interval=10)
+        lag(30)
+        assert router.choose() is None
+
+        lag(0)
+        now[0] += 5
+        assert router.choose() is None  # Still the cached measurement
+        now[0] += 5
+        assert router.choose() is replica
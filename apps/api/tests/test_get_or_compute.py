@@ -0,0 +1,181 @@
+"""
+Tests for get_or_compute single-flight, early refresh and tag invalidation.
+"""
+import asyncio
+import threading
+import time
+
+import pytest
+
+from app.core.cache import _envelope
+from app.core.local_cache import MISSING, LocalCache
+
+
+def test_miss_computes_and_stores(cache):
+    assert cache.get_or_compute("job:1", lambda: {"title": "Engineer"}, expire=60) == {
+        "title": "Engineer"
+    }
+    assert cache.get_or_compute("job:1", lambda: pytest.fail("recomputed"), expire=60) == {
+        "title": "Engineer"
+    }
+
+
+def test_concurrent_misses_share_one_computation(cache):
+    calls = []
+    started = threading.Event()
+
+    def compute():
+        calls.append(1)
+        started.set()
+        time.sleep(0.2)
+        return {"n": len(calls)}
+
+    results = []
+    threads = [
+        threading.Thread(target=lambda: results.append(cache.get_or_compute("k", compute, 60)))
+        for _ in range(8)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert calls == [1]
+    assert results == [{"n": 1}] * 8
+
+
+def test_leader_error_reaches_the_waiters(cache):
+    entered = threading.Event()
+
+    def compute():
+        entered.set()
+        time.sleep(0.1)
+        raise RuntimeError("database down")
+
+    errors = []
+
+    def call():
+        try:
+            cache.get_or_compute("k", compute, 60)
+        except RuntimeError as e:
+            errors.append(str(e))
+
+    leader = threading.Thread(target=call)
+    leader.start()
+    entered.wait()
+    waiter = threading.Thread(target=call)
+    waiter.start()
+    leader.join()
+    waiter.join()
+
+    assert errors == ["database down", "database down"]
+
+
+def test_expired_entry_is_refreshed(cache):
+    cache.set("k", _envelope("old", expire=60, compute_time=0.01), expire=120)
+    assert cache.get_or_compute("k", lambda: "new", expire=60) == "old"
+
+    cache.set("k", {**_envelope("old", 60, 0.01), "x": time.time() - 1}, expire=120)
+    assert cache.get_or_compute("k", lambda: "new", expire=60) == "new"
+
+
+def test_values_shaped_like_an_envelope_are_not_unwrapped(cache):
+    lookalike = {"v": "value", "x": time.time() + 60, "d": 0.01}
+
+    assert cache.get_or_compute("k", lambda: lookalike, expire=60) == lookalike
+    assert cache.get_or_compute("k", lambda: "recomputed", expire=60) == lookalike
+
+
+def test_unmarked_entries_are_misses(cache):
+    cache.set("k", {"v": "old", "x": time.time() + 60, "d": 0.01}, expire=120)
+
+    assert cache.get_or_compute("k", lambda: "new", expire=60) == "new"
+    assert cache.get_or_compute("k", lambda: "newer", expire=60) == "new"
+
+
+def test_expire_function_can_skip_caching(cache):
+    assert cache.get_or_compute("k", lambda: None, expire=lambda value: None) is None
+    assert cache.get("k") is None
+
+
+class TestAsync:
+    async def test_concurrent_misses_share_one_computation(self, async_cache):
+        calls = 0
+
+        async def compute():
+            nonlocal calls
+            calls += 1
+            await asyncio.sleep(0.05)
+            return [calls]
+
+        results = await asyncio.gather(
+            *[async_cache.get_or_compute("k", compute, 60) for _ in range(10)]
+        )
+
+        assert calls == 1
+        assert results == [[1]] * 10
+
+    async def test_cancelled_leader_does_not_fail_waiters(self, async_cache):
+        async def compute():
+            await asyncio.sleep(0.1)
+            return "value"
+
+        leader = asyncio.create_task(async_cache.get_or_compute("k", compute, 60))
+        await asyncio.sleep(0.01)
+        waiter = asyncio.create_task(async_cache.get_or_compute("k", compute, 60))
+        await asyncio.sleep(0.01)
+        leader.cancel()
+
+        assert await waiter == "value"
+        with pytest.raises(asyncio.CancelledError):
+            await leader
+
+    async def test_sync_compute_runs_off_the_event_loop(self, async_cache):
+        loop_thread = threading.get_ident()
+
+        value = await async_cache.get_or_compute("k", threading.get_ident, 60)
+
+        assert value != loop_thread
+
+    async def test_stale_entry_is_served_while_refreshing(self, async_cache):
+        await async_cache.set("k", {**_envelope("old", 60, 0.01), "x": time.time() - 1}, expire=120)
+
+        assert await async_cache.get_or_compute("k", lambda: "new", 60) == "old"
+        await asyncio.gather(*async_cache._flight_tasks)
+        assert await async_cache.get_or_compute("k", lambda: "newer", 60) == "new"
+
+
+class TestInvalidateTags:
+    def test_removes_tagged_keys_from_every_tier(self, cache):
+        cache.set("a", 1, tags=["user:1"])
+        cache.set("b", 2, tags=["user:2"])
+        cache.fallback.set("a", 1)
+
+        assert cache.invalidate_tags("user:1") == 1
+
+        assert cache.get("a") is None
+        assert cache.get("b") == 2
+        assert cache.fallback.get("a") is MISSING
+
+    def test_redis_failure_clears_local_tiers(self, cache, monkeypatch):
+        cache.local = LocalCache({"memo": 10}, ttl=60)
+        cache.local.listener_started()
+        cache.local.set("memo:a", 1)
+        cache.fallback.set("other", 2)
+
+        def unavailable(*args, **kwargs):
+            raise ConnectionError("down")
+
+        monkeypatch.setattr(cache, "_invalidate_tags", unavailable)
+
+        assert cache.invalidate_tags("user:1") == 0
+        assert cache.local.get("memo:a") is MISSING
+        assert cache.fallback.get("other") is MISSING
+
+    def test_pipeline_delete_evicts_the_fallback_copy(self, cache):
+        cache.fallback.set("a", "stale")
+
+        with cache.pipeline() as pipe:
+            pipe.delete("a")
+
+        assert cache.fallback.get("a") is MISSING
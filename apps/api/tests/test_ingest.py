@@ -0,0 +1,77 @@
+"""
+Tests for bulk ingestion of scraped job postings.
+"""
+import pytest
+
+from app.services.scraper import ingest
+from app.services.scraper.ingest import bulk_upsert_jobs
+
+
+@pytest.fixture
+def statements(monkeypatch):
+    """Rows passed to each upsert statement, as (columns, rows) pairs."""
+    recorded = []
+    monkeypatch.setattr(
+        ingest,
+        "_upsert_chunk",
+        lambda db, columns, rows, now, counts: recorded.append((columns, rows)),
+    )
+    return recorded
+
+
+def posting(external_id, **values):
+    return {
+        "external_id": external_id,
+        "source": "linkedin",
+        "source_url": f"https://example.com/jobs/{external_id}",
+        "title": "Engineer",
+        "company": "Acme",
+        "description": "Build things",
+        **values,
+    }
+
+
+def test_duplicates_with_different_columns_are_written_once(statements):
+    bulk_upsert_jobs(None, [
+        posting("1", salary_min=100000),
+        posting("2"),
+        posting("1", title="Senior Engineer"),
+    ])
+
+    rows = [row for _, group in statements for row in group]
+    assert sorted(row["external_id"] for row in rows) == ["1", "2"]
+    merged = next(row for row in rows if row["external_id"] == "1")
+    assert merged["title"] == "Senior Engineer"
+    assert merged["salary_min"] == 100000
+
+
+def test_same_external_id_from_other_sources_is_kept(statements):
+    bulk_upsert_jobs(None, [posting("1"), posting("1", source="indeed")])
+
+    rows = [row for _, group in statements for row in group]
+    assert sorted(row["source"] for row in rows) == ["indeed", "linkedin"]
+
+
+def test_postings_without_external_id_are_never_merged(statements):
+    bulk_upsert_jobs(None, [posting(None), posting(None)])
+
+    assert sum(len(rows) for _, rows in statements) == 2
+
+
+def test_rows_are_grouped_by_column_set(statements):
+    bulk_upsert_jobs(None, [posting("1"), posting("2", salary_min=1), posting("3")])
+
+    assert sorted(len(rows) for _, rows in statements) == [1, 2]
+    for columns, rows in statements:
+        assert all(tuple(sorted(row)) == columns for row in rows)
+
+
+def test_chunks_respect_the_chunk_size(statements):
+    bulk_upsert_jobs(None, [posting(str(i)) for i in range(5)], chunk_size=2)
+
+    assert [len(rows) for _, rows in statements] == [2, 2, 1]
+
+
+def test_unknown_columns_are_rejected(statements):
+    with pytest.raises(ValueError, match="salary_band"):
+        bulk_upsert_jobs(None, [posting("1", salary_band="high")])
@@ -0,0 +1,92 @@
+"""
+Tests for SCAN-based pattern clearing and tag-based invalidation.
+"""
+import pytest
+
+from app.config import settings
+from app.core.cache import tag_key
+from app.core.local_cache import MISSING
+
+
+@pytest.fixture(autouse=True)
+def small_scan_batches(monkeypatch):
+    monkeypatch.setattr(settings, "CACHE_SCAN_BATCH_SIZE", 3)
+
+
+@pytest.fixture
+def no_keys_command(cache, async_cache, monkeypatch):
+    def blocked(*args, **kwargs):
+        raise AssertionError("KEYS blocks Redis")
+
+    monkeypatch.setattr(cache.redis_client, "keys", blocked)
+    monkeypatch.setattr(async_cache.redis_client, "keys", blocked)
+
+
+class TestClearPattern:
+    def test_deletes_matches_over_several_batches(self, cache, no_keys_command):
+        for i in range(10):
+            cache.set(f"jobs:search:{i}", i)
+        cache.set("jobs:detail:1", "kept")
+
+        assert cache.clear_pattern("jobs:search:*") == 10
+
+        assert cache.get_many([f"jobs:search:{i}" for i in range(10)]) == [None] * 10
+        assert cache.get("jobs:detail:1") == "kept"
+
+    async def test_async(self, async_cache, no_keys_command):
+        for i in range(10):
+            await async_cache.set(f"jobs:search:{i}", i)
+        await async_cache.set("jobs:detail:1", "kept")
+
+        assert await async_cache.clear_pattern("jobs:search:*") == 10
+
+        assert await async_cache.get("jobs:search:0") is None
+        assert await async_cache.get("jobs:detail:1") == "kept"
+
+    def test_drops_matching_fallback_entries(self, cache):
+        cache.fallback.set("jobs:search:1", "stale", None)
+
+        cache.clear_pattern("jobs:search:*")
+
+        assert cache.fallback.get("jobs:search:1") is MISSING
+
+
+class TestTags:
+    def test_invalidate_removes_tagged_keys_only(self, cache):
+        cache.set("dashboard:u1", "d", expire=60, tags=["user:u1"])
+        cache.set("profile:u1", "p", expire=60, tags=["user:u1", "profile"])
+        cache.set("dashboard:u2", "d", expire=60, tags=["user:u2"])
+
+        assert cache.invalidate_tags("user:u1") == 2
+
+        assert cache.get("dashboard:u1") is None
+        assert cache.get("profile:u1") is None
+        assert cache.get("dashboard:u2") == "d"
+        assert not cache.redis_client.exists(tag_key("user:u1"))
+
+    def test_several_tags_at_once(self, cache):
+        cache.set("a", 1, tags=["x"])
+        cache.set("b", 2, tags=["y"])
+
+        assert cache.invalidate_tags("x", "y") == 2
+        assert cache.invalidate_tags("x") == 0
+        assert cache.invalidate_tags() == 0
+
+    def test_tag_set_lives_as_long_as_its_newest_member(self, cache):
+        cache.set("a", 1, expire=60, tags=["t"])
+        cache.set("b", 1, expire=600, tags=["t"])
+        cache.set("c", 1, expire=30, tags=["t"])
+
+        assert 300 < cache.redis_client.ttl(tag_key("t")) <= 600
+
+        cache.set("d", 1, tags=["t"])  # Never expires
+        assert cache.redis_client.ttl(tag_key("t")) == -1
+
+    async def test_async(self, async_cache):
+        await async_cache.set("dashboard:u1", "d", expire=60, tags=["user:u1"])
+        await async_cache.set("dashboard:u2", "d", expire=60, tags=["user:u2"])
+
+        assert await async_cache.invalidate_tags("user:u1") == 1
+
+        assert await async_cache.get("dashboard:u1") is None
+        assert await async_cache.get("dashboard:u2") == "d"
@@ -0,0 +1,166 @@
+"""
+Tests for the batched job sweeper and the archive fallback of get_job.
+"""
+import uuid
+from datetime import datetime, timezone
+from types import SimpleNamespace
+
+import pytest
+from sqlalchemy.dialects import postgresql
+
+from app.models.job import ArchivedJob, Job
+from app.services import job_archive
+from app.services.job_archive import (
+    _archive_batch,
+    _deactivate_batch,
+    _restore,
+    _run_batches,
+    deactivate_expired_jobs,
+    get_job,
+)
+
+
+def sql(statement) -> str:
+    return " ".join(str(statement.compile(dialect=postgresql.dialect())).split())
+
+
+class FakeSession:
+    """Session stand-in returning one canned result per execute call."""
+
+    def __init__(self, batches):
+        self.batches = list(batches)
+        self.calls = []
+        self.rows = {}
+
+    def execute(self, statement):
+        self.calls.append("execute")
+        batch = self.batches.pop(0)
+        if isinstance(batch, Exception):
+            raise batch
+        return SimpleNamespace(
+            rowcount=len(batch),
+            scalars=lambda: SimpleNamespace(all=lambda: list(batch)),
+        )
+
+    def commit(self):
+        self.calls.append("commit")
+
+    def rollback(self):
+        self.calls.append("rollback")
+
+    def get(self, model, key):
+        return self.rows.get((model, key))
+
+
+def test_deactivate_batch_locks_a_bounded_set_of_expired_rows():
+    statement = sql(_deactivate_batch(500))
+
+    assert statement.startswith("UPDATE jobs SET is_active=")
+    assert "WHERE jobs.is_active AND jobs.expires_at < now()" in statement
+    assert "ORDER BY jobs.expires_at LIMIT %(param_1)s FOR UPDATE SKIP LOCKED" in statement
+    assert statement.endswith("RETURNING jobs.id")
+
+
+def test_archive_batch_moves_unreferenced_rows_in_one_statement():
+    statement = sql(_archive_batch(500, datetime(2026, 1, 1, tzinfo=timezone.utc)))
+
+    assert statement.startswith("WITH moved AS (DELETE FROM jobs")
+    assert "INSERT INTO jobs_archive (id, external_id, source, title, company, posted_date, expires_at, data)" in statement
+    assert "to_jsonb(jobs) - %(to_jsonb_1)s AS data" in statement
+    assert "NOT jobs.is_active AND jobs.updated_at <" in statement
+    for table in ("applications", "generated_cvs", "cover_letters", "user_job_preferences"):
+        assert f"NOT (EXISTS (SELECT * FROM {table} WHERE {table}.job_id = jobs.id))" in statement
+    assert "ORDER BY jobs.updated_at LIMIT" in statement
+    assert "FOR UPDATE SKIP LOCKED" in statement
+
+
+def test_batches_stop_at_first_short_batch():
+    db = FakeSession([[1, 2], [3, 4], [5], [6, 7]])
+
+    total = _run_batches(db, lambda: None, batch_size=2, max_batches=10)
+
+    assert total == 5
+    assert db.calls == ["execute", "commit"] * 3
+    assert db.batches == [[6, 7]]
+
+
+def test_batches_stop_at_max_batches():
+    db = FakeSession([[1, 2]] * 5)
+
+    assert _run_batches(db, lambda: None, batch_size=2, max_batches=3) == 6
+    assert db.calls.count("commit") == 3
+
+
+def test_on_batch_sees_ids_before_each_commit():
+    db = FakeSession([[1, 2], [3]])
+    seen = []
+
+    def on_batch(session, ids):
+        seen.append((list(ids), session.calls[-1]))
+
+    _run_batches(db, lambda: None, batch_size=2, max_batches=10, on_batch=on_batch)
+
+    assert seen == [([1, 2], "execute"), ([3], "execute")]
+
+
+def test_failed_batch_rolls_back_and_keeps_earlier_commits():
+    db = FakeSession([[1, 2], RuntimeError("deadlock")])
+
+    with pytest.raises(RuntimeError):
+        _run_batches(db, lambda: None, batch_size=2, max_batches=10)
+
+    assert db.calls == ["execute", "commit", "execute", "rollback"]
+
+
+def test_deactivation_marks_applicant_dashboards_stale(monkeypatch):
+    job_ids = [uuid.uuid4(), uuid.uuid4()]
+    marked = []
+    monkeypatch.setattr(
+        job_archive, "mark_job_dashboards_stale", lambda db, ids: marked.append(list(ids))
+    )
+    db = FakeSession([job_ids])
+
+    assert deactivate_expired_jobs(db, batch_size=10, max_batches=1) == 2
+    assert marked == [job_ids]
+
+
+def archived_row(job_id) -> ArchivedJob:
+    return ArchivedJob(
+        id=job_id,
+        source="linkedin",
+        title="Engineer",
+        company="Acme",
+        data={
+            "id": str(job_id),
+            "source": "linkedin",
+            "title": "Engineer",
+            "company": "Acme",
+            "is_active": False,
+            "posted_date": "2025-03-01T12:00:00+00:00",
+            "salary_min": None,
+            "unknown_column": "ignored",
+        },
+    )
+
+
+def test_restore_rebuilds_typed_job():
+    job_id = uuid.uuid4()
+
+    job = _restore(archived_row(job_id))
+
+    assert isinstance(job, Job)
+    assert job.id == job_id
+    assert job.posted_date == datetime(2025, 3, 1, 12, tzinfo=timezone.utc)
+    assert job.is_active is False
+    assert job.salary_min is None
+
+
+def test_get_job_prefers_hot_table_then_archive():
+    hot_id, cold_id = uuid.uuid4(), uuid.uuid4()
+    hot = Job(id=hot_id, title="Hot")
+    db = FakeSession([])
+    db.rows = {(Job, hot_id): hot, (ArchivedJob, cold_id): archived_row(cold_id)}
+
+    assert get_job(db, hot_id) is hot
+    assert get_job(db, cold_id).id == cold_id
+    assert get_job(db, uuid.uuid4()) is None
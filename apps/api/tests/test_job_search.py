@@ -0,0 +1,134 @@
+"""
+Tests for the full-text job search statement and result parsing.
+"""
+import re
+from types import SimpleNamespace
+
+from sqlalchemy.dialects import postgresql
+
+from app.config import settings
+from app.services.search.jobs import (
+    RANK_NORMALIZATION,
+    TS_CONFIG,
+    JobSearchParams,
+    _to_results,
+    build_search_query,
+)
+
+
+def compiled(**params):
+    statement = build_search_query(JobSearchParams(**params))
+    result = statement.compile(dialect=postgresql.dialect())
+    return " ".join(str(result).split()), result.params
+
+
+def facet_where(sql, facet):
+    """WHERE clause of the subquery counting one facet."""
+    match = re.search(
+        rf"SELECT coalesce\(matched\.{facet}, %\(\w+\)s\) AS value, count\(\*\) AS n "
+        r"FROM matched WHERE (.*?) GROUP BY",
+        sql,
+    )
+    assert match, facet
+    return match.group(1)
+
+
+def test_text_query_matches_and_ranks_on_search_vector():
+    sql, params = compiled(query='python "data engineer" -intern')
+
+    assert "jobs.search_vector @@ websearch_to_tsquery(CAST(%(param_1)s AS REGCONFIG)" in sql
+    assert "ts_rank_cd(jobs.search_vector, websearch_to_tsquery(" in sql
+    assert params["param_1"] == TS_CONFIG
+    assert params["websearch_to_tsquery_1"] == 'python "data engineer" -intern'
+    assert params["ts_rank_cd_1"] == RANK_NORMALIZATION
+
+
+def test_blank_query_matches_everything_with_zero_rank():
+    sql, params = compiled(query="   ")
+
+    assert "websearch_to_tsquery" not in sql
+    assert "ts_rank_cd" not in sql
+    assert 0.0 in params.values()
+
+
+def test_active_and_salary_filters_apply_to_matched_set():
+    sql, params = compiled(salary_min=100, salary_max=200)
+    matched = sql.split(" SELECT facets.facets")[0]
+
+    assert "jobs.is_active IS true" in matched
+    assert "coalesce(jobs.salary_max, jobs.salary_min) >=" in matched
+    assert "coalesce(jobs.salary_min, jobs.salary_max) <=" in matched
+    assert 100 in params.values() and 200 in params.values()
+
+
+def test_inactive_jobs_included_when_not_active_only():
+    sql, _ = compiled(active_only=False)
+    matched = sql.split(" SELECT facets.facets")[0]
+
+    assert "is_active" not in matched
+
+
+def test_each_facet_is_counted_without_its_own_filter():
+    sql, _ = compiled(remote_types=["remote"], experience_levels=["senior"])
+
+    remote_where = facet_where(sql, "remote_type")
+    experience_where = facet_where(sql, "experience_level")
+    assert "experience_level IN" in remote_where
+    assert "remote_type IN" not in remote_where
+    assert "remote_type IN" in experience_where
+    assert "experience_level IN" not in experience_where
+
+
+def test_total_and_page_apply_both_filters():
+    sql, _ = compiled(remote_types=["remote"], experience_levels=["senior"])
+
+    total = re.search(r"SELECT count\(\*\) AS count_1 FROM matched WHERE (.*?)\), %\(jsonb_build_object_2\)s", sql)
+    page = re.search(r"AS id, matched\.rank AS rank, .*? FROM matched WHERE (.*?) ORDER BY", sql)
+    for clause in (total.group(1), page.group(1)):
+        assert "remote_type IN" in clause
+        assert "experience_level IN" in clause
+
+
+def test_limit_is_clamped_and_offset_floored():
+    _, params = compiled(limit=10_000, offset=-5)
+
+    assert params["param_2"] == settings.PAGINATION_MAX_LIMIT
+    assert params["param_3"] == 0
+
+
+def test_hits_ordered_by_rank_then_recency():
+    sql, _ = compiled(query="python")
+
+    assert sql.endswith("ORDER BY page.rank DESC, page.posted_date DESC NULLS LAST, page.id")
+
+
+def test_results_split_total_from_facets():
+    facets = {"total": 2, "remote_type": {"remote": 2}, "experience_level": {"senior": 1}}
+    rows = [
+        SimpleNamespace(facets=facets, Job="job-1", rank=0.5),
+        SimpleNamespace(facets=facets, Job="job-2", rank=0.25),
+    ]
+
+    results = _to_results(rows)
+
+    assert results.total == 2
+    assert results.facets == {"remote_type": {"remote": 2}, "experience_level": {"senior": 1}}
+    assert [(hit.job, hit.rank) for hit in results.hits] == [("job-1", 0.5), ("job-2", 0.25)]
+    assert "total" in facets  # the row's own dict is left untouched
+
+
+def test_empty_page_still_returns_facets():
+    facets = {"total": 7, "remote_type": {"onsite": 7}, "experience_level": {}}
+    rows = [SimpleNamespace(facets=facets, Job=None, rank=None)]
+
+    results = _to_results(rows)
+
+    assert results.hits == []
+    assert results.total == 7
+    assert results.facets["remote_type"] == {"onsite": 7}
+
+
+def test_no_rows_is_an_empty_result():
+    results = _to_results([])
+
+    assert (results.hits, results.total, results.facets) == ([], 0, {})
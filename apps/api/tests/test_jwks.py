@@ -0,0 +1,184 @@
+"""
+Tests for JWKS key loading, rotation and asymmetric token verification.
+"""
+import json
+import time
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from cryptography.hazmat.primitives import serialization
+from cryptography.hazmat.primitives.asymmetric import ec
+from jose import jwk, jwt
+
+from app.core import jwks, security
+from app.core.jwks import JWKSManager, parse_jwks
+from app.core.security import verify_token
+
+
+class SigningPair:
+    """An EC P-256 key pair exposed as a private PEM and a public JWK."""
+
+    def __init__(self, kid: str):
+        self.kid = kid
+        private = ec.generate_private_key(ec.SECP256R1())
+        self.private_pem = private.private_bytes(
+            serialization.Encoding.PEM,
+            serialization.PrivateFormat.PKCS8,
+            serialization.NoEncryption(),
+        )
+        public_pem = private.public_key().public_bytes(
+            serialization.Encoding.PEM, serialization.PublicFormat.SubjectPublicKeyInfo
+        )
+        self.public_jwk = {**jwk.construct(public_pem, "ES256").to_dict(), "kid": kid}
+
+    def token(self, **claims) -> str:
+        claims = {
+            "sub": "user-1",
+            "aud": "authenticated",
+            "exp": datetime.now(timezone.utc) + timedelta(minutes=5),
+            **claims,
+        }
+        return jwt.encode(claims, self.private_pem, algorithm="ES256", headers={"kid": self.kid})
+
+
+@pytest.fixture
+def jwks_file(tmp_path):
+    path = tmp_path / "jwks.json"
+
+    def publish(*pairs, extra=()):
+        path.write_text(json.dumps({"keys": [p.public_jwk for p in pairs] + list(extra)}))
+
+    publish.path = str(path)
+    return publish
+
+
+@pytest.fixture
+def manager(jwks_file):
+    return JWKSManager(jwks_file.path, refresh_interval=600, min_refresh_interval=30)
+
+
+def test_parse_skips_unusable_keys():
+    pair = SigningPair("good")
+    no_alg = {k: v for k, v in pair.public_jwk.items() if k != "alg"}
+
+    keys = parse_jwks({"keys": [
+        {**no_alg, "kid": "inferred"},
+        {**pair.public_jwk, "kid": None},
+        {**pair.public_jwk, "kid": "encryption", "use": "enc"},
+        {"kid": "unknown-type", "kty": "oct", "k": "c2VjcmV0"},
+        {**pair.public_jwk, "kid": "broken", "x": "AAAA"},
+        pair.public_jwk,
+    ]})
+
+    assert sorted(keys) == ["good", "inferred"]
+    assert keys["inferred"].algorithm == "ES256"
+
+
+def test_rotation_picks_up_new_kid_after_refresh(manager, jwks_file):
+    old, new = SigningPair("old"), SigningPair("new")
+    jwks_file(old)
+    assert manager.refresh()
+    jwks_file(old, new)
+    manager._last_attempt -= manager.min_refresh_interval
+
+    # The unknown kid is rejected now and wakes the refresh thread
+    assert manager.get_key("new") is None
+    assert manager._wake.is_set()
+
+    manager.refresh()
+    assert manager.get_key("new").kid == "new"
+    assert manager.get_key("old") is not None
+
+
+def test_unknown_kid_refreshes_at_most_once_per_interval(manager, jwks_file):
+    jwks_file(SigningPair("k1"))
+    manager.refresh()
+
+    assert manager.get_key("rotated") is None
+    assert not manager._wake.is_set()
+    assert manager.get_key(None) is None
+    assert not manager._wake.is_set()
+
+
+def test_failed_refresh_keeps_previous_keys(manager, jwks_file, tmp_path):
+    jwks_file(SigningPair("k1"))
+    manager.refresh()
+    (tmp_path / "jwks.json").write_text("not json")
+
+    assert not manager.refresh()
+    assert manager.get_key("k1") is not None
+    # Retried soon rather than after a full refresh interval
+    assert manager._expires_at - manager._last_attempt == manager.min_refresh_interval
+
+
+class FakeResponse:
+    def __init__(self, document, cache_control=""):
+        self.document = document
+        self.headers = {"cache-control": cache_control} if cache_control else {}
+
+    def raise_for_status(self):
+        pass
+
+    def json(self):
+        return self.document
+
+
+@pytest.mark.parametrize("cache_control,lifetime", [
+    ("public, max-age=300", 300),
+    ("max-age=5", 30),  # never below min_refresh_interval
+    ("", 600),
+])
+def test_url_lifetime_follows_cache_control(monkeypatch, cache_control, lifetime):
+    document = {"keys": [SigningPair("k1").public_jwk]}
+    monkeypatch.setattr(jwks.httpx, "get", lambda url, timeout: FakeResponse(document, cache_control))
+    manager = JWKSManager("https://auth.example.com/jwks", refresh_interval=600, min_refresh_interval=30)
+
+    assert manager.refresh()
+    assert manager._expires_at - manager._last_attempt == lifetime
+
+
+def test_refresh_thread_wakes_on_request(manager, jwks_file):
+    jwks_file(SigningPair("k1"))
+    manager.start()
+    try:
+        jwks_file(SigningPair("k1"), SigningPair("k2"))
+        manager._last_attempt -= manager.min_refresh_interval
+        manager.get_key("k2")
+
+        deadline = time.monotonic() + 2
+        while manager.get_key("k2") is None and time.monotonic() < deadline:
+            time.sleep(0.01)
+        assert manager.get_key("k2") is not None
+    finally:
+        manager.stop()
+        manager._thread.join(timeout=2)
+
+
+@pytest.fixture
+def signer(monkeypatch, manager, jwks_file):
+    pair = SigningPair("k1")
+    jwks_file(pair)
+    manager.refresh()
+    monkeypatch.setattr(security, "jwks_manager", manager)
+    monkeypatch.setattr(security.settings, "JWKS_AUDIENCE", "authenticated")
+    return pair
+
+
+def test_jwks_token_verifies(signer):
+    assert verify_token(signer.token())["sub"] == "user-1"
+
+
+def test_wrong_audience_is_rejected(signer):
+    assert verify_token(signer.token(aud="someone-else")) is None
+
+
+def test_key_from_another_set_is_rejected(signer):
+    impostor = SigningPair("k1")  # same kid, different key
+
+    assert verify_token(impostor.token()) is None
+
+
+def test_without_jwks_source_asymmetric_tokens_are_rejected(signer, monkeypatch):
+    monkeypatch.setattr(security, "jwks_manager", None)
+
+    assert verify_token(signer.token()) is None
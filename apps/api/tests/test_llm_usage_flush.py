@@ -0,0 +1,143 @@
+"""
+Tests for flushing Redis LLM usage deltas into llm_usage, exactly once.
+"""
+import uuid
+from datetime import date
+
+import pytest
+from sqlalchemy import create_engine, select
+from sqlalchemy.orm import sessionmaker
+
+from app.core.circuit_breaker import CircuitBreaker
+from app.models.llm_usage import LLMUsage, LLMUsageFlush
+from app.services.ai import usage
+from app.services.ai.usage import (
+    BATCH_FIELD,
+    FLUSHING_KEY,
+    PENDING_KEY,
+    _parse_pending,
+    flush_usage,
+    record_usage,
+)
+
+
+@pytest.fixture
+def redis_cache(monkeypatch, cache):
+    monkeypatch.setattr(usage, "cache", cache)
+    return cache
+
+
+@pytest.fixture
+def db():
+    engine = create_engine("sqlite://", execution_options={"schema_translate_map": {"auth": None}})
+    LLMUsage.__table__.create(engine)
+    LLMUsageFlush.__table__.create(engine)
+    with sessionmaker(engine)() as session:
+        yield session
+    engine.dispose()
+
+
+def totals(db):
+    return {
+        (row.provider, row.model): (row.input_tokens, row.output_tokens, row.requests)
+        for row in db.scalars(select(LLMUsage))
+    }
+
+
+def test_parse_groups_fields_and_skips_batch_id_and_junk():
+    user_id = uuid.uuid4()
+    raw = {
+        f"{user_id}|2026-10-17|openai|gpt-4o|in".encode(): b"100",
+        f"{user_id}|2026-10-17|openai|gpt-4o|out".encode(): b"40",
+        f"{user_id}|2026-10-17|openai|gpt-4o|n".encode(): b"2",
+        BATCH_FIELD.encode(): b"abc",
+        b"not|a|valid|field": b"1",
+        b"not-a-uuid|2026-10-17|openai|gpt-4o|in": b"1",
+        f"{user_id}|2026-10-17|openai|gpt-4o|bogus".encode(): b"1",
+    }
+
+    assert _parse_pending(raw) == {
+        (user_id, date(2026, 10, 17), "openai", "gpt-4o"):
+            {"input_tokens": 100, "output_tokens": 40, "requests": 2},
+    }
+
+
+def test_flush_adds_pending_usage_once(redis_cache, db):
+    user_id = uuid.uuid4()
+    record_usage(user_id, "openai", "gpt-4o", 100, 40)
+    record_usage(user_id, "openai", "gpt-4o", 10, 5)
+    record_usage(user_id, "anthropic", "claude", 7, 3)
+
+    assert flush_usage(db) == 2
+    assert totals(db) == {("openai", "gpt-4o"): (110, 45, 2), ("anthropic", "claude"): (7, 3, 1)}
+    assert not redis_cache.redis_client.exists(PENDING_KEY, FLUSHING_KEY)
+
+    assert flush_usage(db) == 0
+    record_usage(user_id, "openai", "gpt-4o", 1, 1)
+    assert flush_usage(db) == 1
+    assert totals(db)[("openai", "gpt-4o")] == (111, 46, 3)
+
+
+def test_committed_batch_left_in_redis_is_not_added_twice(redis_cache, db, monkeypatch):
+    record_usage(uuid.uuid4(), "openai", "gpt-4o", 100, 40)
+    client = redis_cache.redis_client
+    real_delete = client.delete
+
+    def delete(*keys):
+        if FLUSHING_KEY in keys:
+            raise ConnectionError("Redis went away after the commit")
+        return real_delete(*keys)
+
+    monkeypatch.setattr(client, "delete", delete)
+    assert flush_usage(db) == 1
+    assert client.exists(FLUSHING_KEY)
+    monkeypatch.setattr(client, "delete", real_delete)
+
+    # The retry finds its batch id recorded and only drops the Redis copy
+    assert flush_usage(db) == 0
+    assert totals(db) == {("openai", "gpt-4o"): (100, 40, 1)}
+    assert not client.exists(FLUSHING_KEY)
+    assert len(db.scalars(select(LLMUsageFlush)).all()) == 1
+
+
+def test_failed_commit_keeps_batch_for_retry(redis_cache, db, monkeypatch):
+    user_id = uuid.uuid4()
+    record_usage(user_id, "openai", "gpt-4o", 100, 40)
+    client = redis_cache.redis_client
+    real_commit = db.commit
+    monkeypatch.setattr(db, "commit", lambda: (_ for _ in ()).throw(RuntimeError("database down")))
+
+    with pytest.raises(RuntimeError):
+        flush_usage(db)
+    batch_id = client.hget(FLUSHING_KEY, BATCH_FIELD)
+    assert batch_id
+
+    # New usage waits behind the failed batch, which keeps its id
+    record_usage(user_id, "openai", "gpt-4o", 1, 1)
+    monkeypatch.setattr(db, "commit", real_commit)
+    assert flush_usage(db) == 1
+    assert db.scalar(select(LLMUsageFlush.batch_id)) == batch_id.decode()
+    assert totals(db) == {("openai", "gpt-4o"): (100, 40, 1)}
+
+    assert flush_usage(db) == 1
+    assert totals(db) == {("openai", "gpt-4o"): (101, 41, 2)}
+
+
+def test_concurrent_flush_is_skipped_while_locked(redis_cache, db):
+    record_usage(uuid.uuid4(), "openai", "gpt-4o", 100, 40)
+    lock = redis_cache.redis_client.lock(usage.FLUSH_LOCK_KEY, timeout=60)
+    assert lock.acquire(blocking=False)
+
+    assert flush_usage(db) == 0
+    assert redis_cache.redis_client.exists(PENDING_KEY)
+    lock.release()
+
+
+def test_open_breaker_skips_flush(redis_cache, db):
+    record_usage(uuid.uuid4(), "openai", "gpt-4o", 100, 40)
+    for _ in range(redis_cache.breaker.failure_threshold):
+        redis_cache.breaker.record_failure()
+    assert redis_cache.breaker.state == CircuitBreaker.OPEN
+
+    assert flush_usage(db) == 0
+    assert totals(db) == {}
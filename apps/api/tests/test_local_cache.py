@@ -0,0 +1,133 @@
+"""
+Tests for the in-process L1 tier and its cross-replica invalidation.
+"""
+import asyncio
+import json
+
+import pytest
+
+from app.config import settings
+from app.core.local_cache import MISSING, LocalCache
+
+
+def other_replica(keys=(), patterns=()) -> str:
+    """An invalidation message as another process would publish it."""
+    return json.dumps({"origin": "another-replica", "keys": list(keys), "patterns": list(patterns)})
+
+
+@pytest.fixture
+def local() -> LocalCache:
+    local = LocalCache({"profile": 2, "template": 10}, ttl=30)
+    local.listener_started()
+    return local
+
+
+class TestLocalCache:
+    def test_nothing_is_served_without_a_listener(self):
+        local = LocalCache({"profile": 2}, ttl=30)
+        local.set("profile:1", "a")
+
+        assert local.get("profile:1") is MISSING
+
+    def test_only_configured_namespaces_are_cached(self, local):
+        local.set("profile:1", "a")
+        local.set("job:1", "b")
+
+        assert local.get("profile:1") == "a"
+        assert local.get("job:1") is MISSING
+        assert local.handles("profile:1") and not local.handles("job:1")
+
+    def test_each_namespace_is_its_own_lru(self, local):
+        for key in ("profile:1", "profile:2", "template:1"):
+            local.set(key, key)
+        local.get("profile:1")
+        local.set("profile:3", "profile:3")
+
+        assert local.get("profile:2") is MISSING  # Least recently used
+        assert local.get("profile:1") == "profile:1"
+        assert local.get("template:1") == "template:1"
+
+    def test_ttl_is_capped_at_the_l1_ttl(self, local, monkeypatch):
+        now = [100.0]
+        monkeypatch.setattr("app.core.local_cache.time.monotonic", lambda: now[0])
+        local.set("profile:1", "a", ttl=3600)
+        local.set("profile:2", "b", ttl=5)
+
+        now[0] += 10
+        assert local.get("profile:1") == "a"
+        assert local.get("profile:2") is MISSING
+        now[0] += 30
+        assert local.get("profile:1") is MISSING
+
+    def test_losing_the_listener_drops_everything(self, local):
+        local.set("profile:1", "a")
+        local.listener_stopped()
+        local.listener_started()
+
+        assert local.get("profile:1") is MISSING
+
+    def test_invalidations_from_other_replicas_evict(self, local):
+        for key in ("profile:1", "profile:2", "template:1"):
+            local.set(key, key)
+
+        local.apply_invalidation(other_replica(keys=["profile:1"], patterns=["template:*"]).encode())
+
+        assert local.get("profile:1") is MISSING
+        assert local.get("template:1") is MISSING
+        assert local.get("profile:2") == "profile:2"
+
+    def test_own_invalidations_and_garbage_are_ignored(self, local):
+        local.set("profile:1", "a")
+
+        local.apply_invalidation(LocalCache.invalidation_message(keys=["profile:1"]))
+        local.apply_invalidation(b"\xff not json")
+
+        assert local.get("profile:1") == "a"
+
+
+class TestTwoTiers:
+    @pytest.fixture
+    async def replica(self, async_cache, local):
+        local.listener_stopped()  # The cache's own listener subscribes
+        async_cache.local = local
+        async_cache.start_invalidation_listener()
+        for _ in range(100):
+            if local.active:
+                break
+            await asyncio.sleep(0.01)
+        assert local.active
+        return async_cache
+
+    async def test_reads_are_served_from_l1(self, replica, monkeypatch):
+        await replica.set("profile:1", {"name": "Ada"}, expire=60)
+        await replica.get("profile:1")
+
+        async def unreachable(key):
+            raise AssertionError("went to Redis")
+
+        monkeypatch.setattr(replica.redis_client, "get", unreachable)
+        assert await replica.get("profile:1") == {"name": "Ada"}
+
+    async def test_local_writes_evict_l1(self, replica):
+        await replica.set("profile:1", "old", expire=60)
+        await replica.get("profile:1")
+
+        await replica.set("profile:1", "new", expire=60)
+
+        assert await replica.get("profile:1") == "new"
+
+    async def test_writes_on_other_replicas_evict_l1(self, replica, local):
+        await replica.set("profile:1", "old", expire=60)
+        await replica.get("profile:1")
+        assert local.get("profile:1") == "old"
+
+        # Another replica overwrote the key and announces it
+        await replica.redis_client.publish(
+            settings.CACHE_INVALIDATION_CHANNEL, other_replica(keys=["profile:1"])
+        )
+
+        for _ in range(100):
+            if local.get("profile:1") is MISSING:
+                break
+            await asyncio.sleep(0.01)
+        assert local.get("profile:1") is MISSING
@@ -0,0 +1,90 @@
+"""
+Tests for the @cached memoization decorator.
+"""
+from typing import Optional
+from unittest.mock import MagicMock
+
+import pytest
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from app.core import memoize
+from app.core.memoize import cached
+
+
+@pytest.fixture(autouse=True)
+def caches(monkeypatch, cache, async_cache):
+    monkeypatch.setattr(memoize, "cache", cache)
+    monkeypatch.setattr(memoize, "async_cache", async_cache)
+
+
+def test_sync_results_are_memoized_without_the_session():
+    calls = []
+
+    @cached(ttl=60)
+    def profile_summary(db: Session, user_id: str) -> dict:
+        calls.append(user_id)
+        return {"user_id": user_id}
+
+    first, second = MagicMock(spec=Session), MagicMock(spec=Session)
+
+    assert profile_summary(first, "u1") == {"user_id": "u1"}
+    assert profile_summary(second, "u1") == {"user_id": "u1"}
+    assert calls == ["u1"]
+    assert profile_summary.cache_key(first, "u1") == profile_summary.cache_key(second, "u1")
+    assert (profile_summary.cache_stats.hits, profile_summary.cache_stats.misses) == (1, 1)
+
+
+async def test_async_results_are_memoized():
+    calls = []
+
+    @cached(ttl=60, negative_ttl=30)
+    async def default_template(name: str) -> Optional[dict]:
+        calls.append(name)
+        return None if name == "missing" else {"name": name}
+
+    assert await default_template("cv") == {"name": "cv"}
+    assert await default_template("cv") == {"name": "cv"}
+    assert await default_template("missing") is None
+    assert await default_template("missing") is None
+    assert calls == ["cv", "missing"]
+
+
+async def test_invalidate_drops_the_entry():
+    calls = []
+
+    @cached(ttl=60)
+    async def default_template(name: str) -> dict:
+        calls.append(name)
+        return {"name": name}
+
+    await default_template("cv")
+    assert await default_template.invalidate("cv")
+    await default_template("cv")
+
+    assert calls == ["cv", "cv"]
+
+
+def test_async_function_annotated_with_a_session_is_rejected():
+    with pytest.raises(TypeError, match="takes a session"):
+        @cached(ttl=60)
+        async def default_template(db: AsyncSession) -> dict:
+            return {}
+
+
+async def test_async_function_called_with_a_session_is_rejected():
+    @cached(ttl=60)
+    async def default_template(db) -> dict:
+        raise AssertionError("must not run")
+
+    with pytest.raises(TypeError, match="takes a session"):
+        await default_template(MagicMock(spec=AsyncSession))
+
+
+async def test_non_plain_results_are_rejected():
+    @cached(ttl=60)
+    async def default_template() -> object:
+        return {"created": object()}
+
+    with pytest.raises(TypeError, match="not plain data"):
+        await default_template()
@@ -0,0 +1,188 @@
+"""
+Tests for the Prometheus request middleware and the other collectors.
+"""
+import fakeredis
+import httpx
+import pytest
+from fastapi import FastAPI
+from prometheus_client import REGISTRY, generate_latest
+from sqlalchemy import create_engine
+from sqlalchemy.pool import QueuePool
+
+from app.core import metrics
+from app.core.metrics import (
+    UNMATCHED_ROUTE,
+    CeleryQueueCollector,
+    MetricsMiddleware,
+    record_cache_lookup,
+    sample_pools,
+    task_finished,
+    task_started,
+    watch_pool,
+)
+
+
+def sample(name, **labels) -> float:
+    return REGISTRY.get_sample_value(name, labels) or 0.0
+
+
+def requests_total(method, route, status) -> float:
+    return sample("http_requests_total", method=method, route=route, status=status)
+
+
+@pytest.fixture
+def app():
+    app = FastAPI()
+    app.add_middleware(MetricsMiddleware)
+    app.state.in_progress = []
+
+    @app.get("/jobs/{job_id}")
+    async def get_job(job_id: str):
+        app.state.in_progress.append(
+            sample("http_requests_in_progress", method="GET", route="/jobs/{job_id}")
+        )
+        return {"id": job_id}
+
+    @app.get("/boom")
+    async def boom():
+        raise RuntimeError("unhandled")
+
+    return app
+
+
+@pytest.fixture
+def client(app):
+    transport = httpx.ASGITransport(app=app, raise_app_exceptions=False)
+    return httpx.AsyncClient(transport=transport, base_url="http://test")
+
+
+async def test_requests_are_labelled_by_route_template(client, app):
+    before = requests_total("GET", "/jobs/{job_id}", "200")
+    in_progress = sample("http_requests_in_progress", method="GET", route="/jobs/{job_id}")
+
+    async with client:
+        for job_id in ("1", "2", "3"):
+            assert (await client.get(f"/jobs/{job_id}")).status_code == 200
+
+    assert requests_total("GET", "/jobs/{job_id}", "200") == before + 3
+    assert sample("http_requests_total", method="GET", route="/jobs/1", status="200") == 0
+    assert app.state.in_progress == [in_progress + 1] * 3
+    assert sample("http_requests_in_progress", method="GET", route="/jobs/{job_id}") == in_progress
+    assert sample("http_request_duration_seconds_count", method="GET", route="/jobs/{job_id}") >= 3
+
+
+async def test_unknown_paths_share_one_series(client):
+    before = requests_total("GET", UNMATCHED_ROUTE, "404")
+
+    async with client:
+        for path in ("/nope", "/wp-admin.php", "/a/b/c"):
+            assert (await client.get(path)).status_code == 404
+
+    assert requests_total("GET", UNMATCHED_ROUTE, "404") == before + 3
+
+
+async def test_wrong_method_keeps_route_template(client):
+    before = requests_total("POST", "/jobs/{job_id}", "405")
+
+    async with client:
+        assert (await client.post("/jobs/1")).status_code == 405
+
+    assert requests_total("POST", "/jobs/{job_id}", "405") == before + 1
+
+
+async def test_unhandled_errors_count_as_500(client):
+    before = requests_total("GET", "/boom", "500")
+
+    async with client:
+        assert (await client.get("/boom")).status_code == 500
+
+    assert requests_total("GET", "/boom", "500") == before + 1
+    assert sample("http_requests_in_progress", method="GET", route="/boom") == 0
+
+
+def test_pool_gauges_follow_checkouts(monkeypatch):
+    monkeypatch.setattr(metrics, "_pools", {})
+    monkeypatch.setattr(metrics, "_pools_sampled_at", 0.0)
+    engine = create_engine("sqlite://", poolclass=QueuePool, pool_size=2, max_overflow=2)
+    watch_pool("test", engine.pool)
+    connections = [engine.connect() for _ in range(3)]
+
+    sample_pools(min_interval=0)
+
+    assert sample("db_pool_size", pool="test") == 2
+    assert sample("db_pool_checked_out", pool="test") == 3
+    assert sample("db_pool_overflow", pool="test") == 1
+
+    for connection in connections:
+        connection.close()
+    sample_pools()  # Throttled: just sampled
+    assert sample("db_pool_checked_out", pool="test") == 3
+    sample_pools(min_interval=0)
+    assert sample("db_pool_checked_out", pool="test") == 0
+    engine.dispose()
+
+
+def test_cache_lookups_count_keys_by_result():
+    before = {
+        result: sample("cache_lookups_total", operation="get_many", result=result)
+        for result in ("local_hit", "hit", "miss")
+    }
+    observed = sample("cache_lookup_duration_seconds_count", operation="get_many")
+
+    record_cache_lookup("get_many", hits=3, misses=2, seconds=0.001, local_hits=1)
+    record_cache_lookup("get_many", hits=0, misses=0, local_hits=4)  # no Redis round trip
+
+    assert sample("cache_lookups_total", operation="get_many", result="local_hit") == before["local_hit"] + 5
+    assert sample("cache_lookups_total", operation="get_many", result="hit") == before["hit"] + 3
+    assert sample("cache_lookups_total", operation="get_many", result="miss") == before["miss"] + 2
+    assert sample("cache_lookup_duration_seconds_count", operation="get_many") == observed + 1
+
+
+def test_tasks_are_timed_from_start_to_finish():
+    before = sample("celery_tasks_total", task="tasks.scrape", state="SUCCESS")
+
+    task_started("task-1", "tasks.scrape")
+    task_finished("task-1", "SUCCESS")
+    task_finished("task-1", "SUCCESS")  # Already recorded
+    task_finished("never-started", "FAILURE")
+
+    assert sample("celery_tasks_total", task="tasks.scrape", state="SUCCESS") == before + 1
+    assert sample("celery_tasks_total", task="tasks.scrape", state="FAILURE") == 0
+
+
+def test_queue_lengths_are_read_at_scrape_time(monkeypatch):
+    server = fakeredis.FakeServer()
+    monkeypatch.setattr(
+        metrics.redis, "from_url", lambda url, **kw: fakeredis.FakeRedis(server=server)
+    )
+    collector = CeleryQueueCollector("redis://broker", ["celery", "ai"])
+    collector._client.rpush("celery", "a", "b")
+
+    family, = collector.collect()
+    assert {s.labels["queue"]: s.value for s in family.samples} == {"celery": 2, "ai": 0}
+
+    server.connected = False
+    family, = collector.collect()
+    assert family.samples == []  # Broker down: the scrape still succeeds
+
+
+def test_registry_exposes_every_metric(monkeypatch):
+    monkeypatch.delenv("PROMETHEUS_MULTIPROC_DIR", raising=False)
+
+    body = generate_latest(metrics._build_registry(include_queues=False)).decode()
+
+    for name in ("http_requests_total", "http_request_duration_seconds", "http_requests_in_progress",
+                 "db_pool_checked_out", "cache_lookups_total", "celery_tasks_total"):
+        assert f"# TYPE {name}" in body
+    assert "celery_queue_length" not in body
+
+
+async def test_non_http_scopes_pass_through():
+    seen = []
+
+    async def app(scope, receive, send):
+        seen.append(scope["type"])
+
+    await MetricsMiddleware(app)({"type": "lifespan"}, None, None)
+
+    assert seen == ["lifespan"]
@@ -0,0 +1,123 @@
+"""
+Tests for keyset pagination cursors.
+"""
+import uuid
+from datetime import datetime, timezone
+from types import SimpleNamespace
+
+import pytest
+from sqlalchemy import select
+from sqlalchemy.dialects import postgresql
+
+from app.core.exceptions import ValidationException
+from app.models.job import Job
+from app.utils.pagination import (
+    APPLICATION_ORDER,
+    JOB_ORDER,
+    NEXT,
+    PREV,
+    _build_page,
+    _page_query,
+    decode_cursor,
+    encode_cursor,
+)
+
+
+def job(posted: datetime) -> SimpleNamespace:
+    return SimpleNamespace(posted_date=posted, id=uuid.uuid4())
+
+
+def test_round_trip_restores_column_types():
+    item = job(datetime(2026, 10, 1, tzinfo=timezone.utc))
+
+    cursor = encode_cursor(JOB_ORDER, NEXT, item)
+
+    assert decode_cursor(JOB_ORDER, cursor) == (NEXT, [item.posted_date, item.id])
+
+
+def test_round_trip_keeps_timezone_aware_datetimes():
+    item = SimpleNamespace(
+        created_at=datetime(2026, 10, 17, 9, 30, 15, 123456, tzinfo=timezone.utc), id=uuid.uuid4()
+    )
+
+    direction, values = decode_cursor(APPLICATION_ORDER, encode_cursor(APPLICATION_ORDER, PREV, item))
+
+    assert direction == PREV
+    assert values == [item.created_at, item.id]
+    assert values[0].tzinfo is not None
+
+
+def test_cursor_is_url_safe():
+    cursor = encode_cursor(JOB_ORDER, NEXT, job(datetime(2026, 1, 1, tzinfo=timezone.utc)))
+    assert set(cursor) <= set("ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz0123456789-_.")
+
+
+def test_tampered_cursor_is_rejected():
+    payload, signature = encode_cursor(JOB_ORDER, NEXT, job(datetime(2026, 1, 1, tzinfo=timezone.utc))).split(".")
+    forged = encode_cursor(JOB_ORDER, NEXT, job(datetime(2030, 1, 1, tzinfo=timezone.utc))).split(".")[0]
+
+    with pytest.raises(ValidationException):
+        decode_cursor(JOB_ORDER, f"{forged}.{signature}")
+
+
+def test_cursor_of_another_listing_is_rejected():
+    cursor = encode_cursor(JOB_ORDER, NEXT, job(datetime(2026, 1, 1, tzinfo=timezone.utc)))
+    with pytest.raises(ValidationException):
+        decode_cursor(APPLICATION_ORDER, cursor)
+
+
+@pytest.mark.parametrize("cursor", ["", "garbage", "a.b", "!!!.???", "e30.e30"])
+def test_malformed_cursor_is_rejected(cursor):
+    with pytest.raises(ValidationException):
+        decode_cursor(JOB_ORDER, cursor)
+
+
+def test_page_query_compares_the_whole_key():
+    cursor = encode_cursor(JOB_ORDER, NEXT, job(datetime(2026, 1, 1, tzinfo=timezone.utc)))
+
+    query, direction, has_cursor = _page_query(select(Job), JOB_ORDER, 20, cursor)
+    sql = str(query.compile(dialect=postgresql.dialect()))
+
+    assert (direction, has_cursor) == (NEXT, True)
+    assert "(jobs.posted_date, jobs.id) < (" in sql
+    assert "ORDER BY jobs.posted_date DESC, jobs.id DESC" in sql
+
+
+def test_previous_page_walks_the_order_backwards():
+    cursor = encode_cursor(JOB_ORDER, PREV, job(datetime(2026, 1, 1, tzinfo=timezone.utc)))
+
+    query, direction, _ = _page_query(select(Job), JOB_ORDER, 20, cursor)
+    sql = str(query.compile(dialect=postgresql.dialect()))
+
+    assert direction == PREV
+    assert "(jobs.posted_date, jobs.id) > (" in sql
+    assert "ORDER BY jobs.posted_date ASC, jobs.id ASC" in sql
+
+
+class TestBuildPage:
+    def test_first_page_has_only_a_next_cursor(self):
+        rows = [job(datetime(2026, 1, day, tzinfo=timezone.utc)) for day in range(10, 0, -1)]
+
+        page = _build_page(rows, JOB_ORDER, 3, NEXT, has_cursor=False)
+
+        assert page.items == rows[:3]
+        assert page.prev_cursor is None
+        assert decode_cursor(JOB_ORDER, page.next_cursor)[1][1] == rows[2].id
+
+    def test_last_page_has_only_a_prev_cursor(self):
+        rows = [job(datetime(2026, 1, 2, tzinfo=timezone.utc)), job(datetime(2026, 1, 1, tzinfo=timezone.utc))]
+
+        page = _build_page(rows, JOB_ORDER, 3, NEXT, has_cursor=True)
+
+        assert page.next_cursor is None
+        assert decode_cursor(JOB_ORDER, page.prev_cursor) == (PREV, [datetime(2026, 1, 2, tzinfo=timezone.utc), rows[0].id])
+
+    def test_previous_page_is_returned_in_display_order(self):
+        # Fetched ascending when walking backwards
+        rows = [job(datetime(2026, 1, day, tzinfo=timezone.utc)) for day in (5, 6, 7, 8)]
+
+        page = _build_page(rows, JOB_ORDER, 3, PREV, has_cursor=True)
+
+        assert [item.posted_date.day for item in page.items] == [7, 6, 5]
+        assert page.next_cursor is not None
+        assert page.prev_cursor is not None
@@ -0,0 +1,78 @@
+"""
+Tests for password hashing off the event loop.
+"""
+import asyncio
+import threading
+
+import pytest
+from passlib.context import CryptContext
+
+from app.config import settings
+from app.core import security
+from app.core.exceptions import RateLimitException
+
+
+@pytest.fixture(autouse=True)
+def fast_hashes(monkeypatch):
+    monkeypatch.setattr(
+        security, "pwd_context", CryptContext(schemes=["bcrypt"], deprecated="auto", bcrypt__rounds=4)
+    )
+
+
+@pytest.fixture
+def slots(monkeypatch) -> asyncio.Semaphore:
+    """A single hashing slot, bound to the test's event loop."""
+    semaphore = asyncio.Semaphore(1)
+    monkeypatch.setattr(security, "_hash_slots", semaphore)
+    monkeypatch.setattr(settings, "PASSWORD_HASH_QUEUE_TIMEOUT", 0.05)
+    return semaphore
+
+
+@pytest.fixture
+async def blocked(slots):
+    """Occupy the only slot with a hashing call until the event is set."""
+    release = threading.Event()
+    task = asyncio.ensure_future(security._run_hashing(release.wait, 5))
+    yield task
+    release.set()
+
+
+async def test_hash_and_verify(slots):
+    hashed = await security.get_password_hash_async("correct horse")
+
+    assert await security.verify_password_async("correct horse", hashed)
+    assert not await security.verify_password_async("wrong", hashed)
+
+
+async def test_outdated_hash_is_replaced_on_verify(slots):
+    old_hash = CryptContext(schemes=["bcrypt"], bcrypt__rounds=5).hash("correct horse")
+
+    valid, new_hash = await security.verify_and_update_password_async("correct horse", old_hash)
+
+    assert valid
+    assert new_hash is not None and security.pwd_context.verify("correct horse", new_hash)
+
+
+async def test_full_queue_is_rejected(slots, blocked):
+    await asyncio.sleep(0)  # Let the blocking call take the slot
+
+    with pytest.raises(RateLimitException):
+        await security.get_password_hash_async("correct horse")
+
+
+async def test_timeouts_and_cancellations_do_not_leak_slots(slots, blocked):
+    await asyncio.sleep(0)
+    for _ in range(5):
+        with pytest.raises(RateLimitException):
+            await security.get_password_hash_async("correct horse")
+    waiters = [asyncio.ensure_future(security.get_password_hash_async("x")) for _ in range(5)]
+    await asyncio.sleep(0)
+    for waiter in waiters:
+        waiter.cancel()
+    await asyncio.gather(*waiters, return_exceptions=True)
+
+    blocked.cancel()  # Cancelling the caller still frees its slot
+    await asyncio.gather(blocked, return_exceptions=True)
+
+    assert not slots.locked()
+    assert await security.get_password_hash_async("correct horse")
@@ -0,0 +1,147 @@
+"""
+Tests for per-request SQL instrumentation.
+"""
+import contextvars
+import logging
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+from sqlalchemy import create_engine, text
+from sqlalchemy.pool import StaticPool
+
+from app.config import settings
+from app.core.query_stats import (
+    QueryStats,
+    instrument_engine,
+    normalize_statement,
+    parameter_shape,
+    track_queries,
+)
+
+
+@pytest.fixture
+def engine(monkeypatch):
+    monkeypatch.setattr(settings, "DB_QUERY_STATS_ENABLED", True)
+    monkeypatch.setattr(settings, "DB_N_PLUS_ONE_THRESHOLD", 3)
+    monkeypatch.setattr(settings, "DB_SLOW_QUERY_MS", 10_000.0)
+    engine = create_engine(
+        "sqlite://", poolclass=StaticPool, connect_args={"check_same_thread": False}
+    )
+    instrument_engine(engine)
+    yield engine
+    engine.dispose()
+
+
+def run(engine, statement: str, times: int = 1, **parameters) -> None:
+    with engine.connect() as conn:
+        for _ in range(times):
+            conn.execute(text(statement), parameters)
+
+
+def n_plus_one_warnings(caplog):
+    return [r for r in caplog.records if r.getMessage().startswith("Possible N+1")]
+
+
+def slow_query_logs(caplog):
+    return [r for r in caplog.records if r.getMessage().startswith("Slow query")]
+
+
+def test_counts_statements_in_the_block(engine):
+    with track_queries("GET /jobs") as stats:
+        run(engine, "SELECT 1", times=2)
+        run(engine, "SELECT 2")
+    run(engine, "SELECT 3")  # Outside the block
+
+    assert stats.count == 3
+    assert stats.repeated() == {next(iter(stats.repeated())): 2}
+    assert stats.server_timing().endswith('desc="3 queries"')
+
+
+def test_n_plus_one_warns_once_past_the_threshold(engine, caplog):
+    caplog.set_level(logging.WARNING, logger="app.core.query_stats")
+    with track_queries("GET /jobs"):
+        run(engine, "SELECT :id", times=3, id=1)
+        assert n_plus_one_warnings(caplog) == []  # At the threshold, not past it
+
+        run(engine, "SELECT :id", times=5, id=1)
+
+    [warning] = n_plus_one_warnings(caplog)
+    assert "more than 3 times in GET /jobs" in warning.getMessage()
+
+
+def test_in_lists_of_any_length_count_as_one_statement(engine, caplog):
+    caplog.set_level(logging.WARNING, logger="app.core.query_stats")
+    with track_queries() as stats:
+        for size in range(1, 6):
+            placeholders = ", ".join(str(i) for i in range(size))
+            run(engine, f"SELECT 1 WHERE 1 IN ({placeholders})")
+
+    assert len(stats.fingerprints) == 1
+    assert len(n_plus_one_warnings(caplog)) == 1
+
+
+def test_slow_queries_are_logged_with_parameter_types_only(engine, caplog, monkeypatch):
+    caplog.set_level(logging.WARNING, logger="app.core.query_stats")
+    monkeypatch.setattr(settings, "DB_SLOW_QUERY_MS", 0.0)
+
+    with track_queries("GET /me"):
+        run(engine, "SELECT :email", email="person@example.com")
+
+    [record] = slow_query_logs(caplog)
+    assert record.db_parameters == ["str"]  # sqlite binds positionally
+    assert record.request == "GET /me"
+    assert "person@example.com" not in record.getMessage()
+
+
+def test_slow_query_sampling(engine, caplog, monkeypatch):
+    caplog.set_level(logging.WARNING, logger="app.core.query_stats")
+    monkeypatch.setattr(settings, "DB_SLOW_QUERY_MS", 0.0)
+    monkeypatch.setattr(settings, "DB_SLOW_QUERY_SAMPLE_RATE", 0.0)
+
+    run(engine, "SELECT 1", times=5)
+
+    assert slow_query_logs(caplog) == []
+
+
+def test_statements_from_threadpool_workers_are_all_counted(engine):
+    def worker():
+        run(engine, "SELECT 1", times=50)
+
+    with track_queries() as stats:
+        with ThreadPoolExecutor(max_workers=8) as pool:
+            # run_in_threadpool copies the request's context into the worker
+            futures = [pool.submit(contextvars.copy_context().run, worker) for _ in range(8)]
+            for future in futures:
+                future.result()
+
+    assert stats.count == 400
+    assert sum(stats.fingerprints.values()) == 400
+
+
+def test_record_returns_the_running_count():
+    stats = QueryStats()
+
+    first, runs = stats.record("SELECT  1", 1.0)
+    second, runs_again = stats.record("SELECT 1", 2.0)
+
+    assert first == second
+    assert (runs, runs_again) == (1, 2)
+    assert stats.total_ms == 3.0
+
+
+@pytest.mark.parametrize(
+    "statement, normalized",
+    [
+        ("SELECT *\n  FROM jobs\tWHERE id = $1", "SELECT * FROM jobs WHERE id = $1"),
+        ("SELECT * FROM jobs WHERE id IN ($1, $2, $3)", "SELECT * FROM jobs WHERE id IN (...)"),
+        ("INSERT INTO t (a, b) VALUES ($1, $2), ($3, $4), ($5, $6)", "INSERT INTO t (a, b) VALUES ($1, $2), ..."),
+    ],
+)
+def test_normalize_statement(statement, normalized):
+    assert normalize_statement(statement) == normalized
+
+
+def test_parameter_shape():
+    assert parameter_shape({"id": 1, "name": "x"}) == {"id": "int", "name": "str"}
+    assert parameter_shape([{"id": 1}, {"id": 2}]) == {"rows": 2, "row": {"id": "int"}}
+    assert parameter_shape((1, "x")) == ["int", "str"]
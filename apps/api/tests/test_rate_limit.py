@@ -0,0 +1,273 @@
+"""
+Tests for the sliding-window rate limiting middleware.
+"""
+import json
+import time
+
+import pytest
+import redis
+from starlette.datastructures import Headers
+
+from app.config import settings
+from app.core import rate_limit
+from app.core.rate_limit import (
+    LocalTokenBuckets,
+    RateLimit,
+    RateLimitMiddleware,
+    classify,
+    client_ip,
+    limits,
+)
+from app.core.token_cache import TokenClaimsCache, token_digest
+
+
+async def ok_app(scope, receive, send):
+    await send({"type": "http.response.start", "status": 200, "headers": []})
+    await send({"type": "http.response.body", "body": b"ok"})
+
+
+def http_scope(path: str, client: str = "203.0.113.7", headers=()) -> dict:
+    return {
+        "type": "http",
+        "method": "GET",
+        "path": path,
+        "headers": [(name.encode(), value.encode()) for name, value in headers],
+        "client": (client, 50000),
+    }
+
+
+async def call(middleware: RateLimitMiddleware, scope: dict):
+    messages = []
+
+    async def receive():
+        return {"type": "http.request", "body": b""}
+
+    async def send(message):
+        messages.append(message)
+
+    await middleware(scope, receive, send)
+    start, body = messages
+    return start["status"], Headers(raw=start["headers"]), body.get("body", b"")
+
+
+@pytest.fixture
+def middleware(monkeypatch, async_cache) -> RateLimitMiddleware:
+    monkeypatch.setattr(settings, "RATE_LIMIT_ENABLED", True)
+    monkeypatch.setattr(settings, "RATE_LIMIT_PER_MINUTE", 3)
+    monkeypatch.setattr(settings, "RATE_LIMIT_AUTH_PER_5_MIN", 2)
+    return RateLimitMiddleware(ok_app, cache=async_cache)
+
+
+async def test_requests_within_the_limit_are_allowed(middleware):
+    for remaining in ("2", "1", "0"):
+        status, headers, _ = await call(middleware, http_scope("/api/v1/jobs"))
+        assert status == 200
+        assert headers["x-ratelimit-limit"] == "3"
+        assert headers["x-ratelimit-remaining"] == remaining
+
+
+async def test_request_over_the_limit_is_rejected(middleware):
+    for _ in range(3):
+        await call(middleware, http_scope("/api/v1/jobs"))
+
+    status, headers, body = await call(middleware, http_scope("/api/v1/jobs"))
+
+    assert status == 429
+    assert int(headers["retry-after"]) >= 1
+    assert headers["x-ratelimit-remaining"] == "0"
+    error = json.loads(body)["error"]
+    assert error["code"] == "RATE_LIMIT_EXCEEDED"
+    assert error["details"]["limit"] == 3
+
+
+async def test_limit_is_shared_across_processes(middleware, async_cache):
+    other_process = RateLimitMiddleware(ok_app, cache=async_cache)
+    for _ in range(3):
+        await call(middleware, http_scope("/api/v1/jobs"))
+
+    status, _, _ = await call(other_process, http_scope("/api/v1/jobs"))
+
+    assert status == 429
+
+
+async def test_clients_and_categories_are_counted_separately(middleware):
+    for _ in range(3):
+        await call(middleware, http_scope("/api/v1/jobs"))
+
+    assert (await call(middleware, http_scope("/api/v1/jobs", client="198.51.100.1")))[0] == 200
+    assert (await call(middleware, http_scope("/api/v1/auth/login")))[0] == 200
+
+
+async def test_exempt_paths_are_not_limited(middleware):
+    for _ in range(5):
+        status, headers, _ = await call(middleware, http_scope("/health"))
+        assert status == 200
+        assert "x-ratelimit-limit" not in headers
+
+
+async def test_redis_failure_fails_open(middleware, monkeypatch):
+    async def unavailable(*args, **kwargs):
+        raise redis.ConnectionError("down")
+
+    monkeypatch.setattr(middleware, "_script", unavailable)
+
+    for _ in range(3):
+        status, headers, _ = await call(middleware, http_scope("/api/v1/jobs"))
+        assert status == 200
+        assert "x-ratelimit-limit" not in headers
+
+
+class TestTokenFloods:
+    """Floods must be absorbed locally, before JWT verification or Redis."""
+
+    @pytest.fixture
+    def verified(self, monkeypatch):
+        tokens = []
+
+        async def verify(token):
+            tokens.append(token)
+            return {"sub": token[len("valid-"):]} if token.startswith("valid-") else None
+
+        monkeypatch.setattr(rate_limit, "verify_token_cached", verify)
+        return tokens
+
+    @pytest.fixture
+    def redis_calls(self, middleware, monkeypatch):
+        calls = []
+        script = middleware._script
+
+        async def counted(keys, args):
+            calls.append(keys[0])
+            return await script(keys=keys, args=args)
+
+        monkeypatch.setattr(middleware, "_script", counted)
+        return calls
+
+    @staticmethod
+    def bearer(token: str):
+        return [("authorization", f"Bearer {token}")]
+
+    async def test_repeated_invalid_token_stops_reaching_verification(
+        self, middleware, verified, redis_calls
+    ):
+        statuses = [
+            (await call(middleware, http_scope("/api/v1/jobs", headers=self.bearer("forged"))))[0]
+            for _ in range(20)
+        ]
+
+        assert statuses == [200] * 3 + [429] * 17
+        assert len(verified) == 3
+        assert redis_calls == ["ratelimit:read:ip:203.0.113.7"] * 3
+
+    async def test_unique_invalid_tokens_stop_reaching_verification(
+        self, middleware, verified, redis_calls
+    ):
+        statuses = [
+            (await call(middleware, http_scope("/api/v1/jobs", headers=self.bearer(f"forged-{i}"))))[0]
+            for i in range(20)
+        ]
+
+        assert statuses == [200] * 3 + [429] * 17
+        assert len(verified) == 3
+        assert len(redis_calls) == 3
+
+    async def test_known_tokens_pass_while_the_address_is_flooding(
+        self, middleware, verified, redis_calls, monkeypatch
+    ):
+        known = TokenClaimsCache(max_entries=10)
+        known.listener_started()
+        known.set(token_digest("valid-u1"), {"sub": "u1", "exp": time.time() + 60})
+        monkeypatch.setattr(rate_limit, "claims_cache", known)
+        for i in range(5):
+            await call(middleware, http_scope("/api/v1/jobs", headers=self.bearer(f"forged-{i}")))
+
+        known_status, _, _ = await call(
+            middleware, http_scope("/api/v1/jobs", headers=self.bearer("valid-u1"))
+        )
+        unknown_status, _, _ = await call(
+            middleware, http_scope("/api/v1/jobs", headers=self.bearer("valid-u2"))
+        )
+
+        assert (known_status, unknown_status) == (200, 429)
+        assert redis_calls[-1] == "ratelimit:read:user:u1"
+
+
+class TestLocalTokenBuckets:
+    def test_bucket_runs_dry_at_the_limit(self):
+        buckets = LocalTokenBuckets(max_keys=10)
+        rule = RateLimit("default", limit=2, window=60)
+
+        assert buckets.take("a", rule) is None
+        assert buckets.take("a", rule) is None
+        rejection = buckets.take("a", rule)
+
+        assert rejection is not None and not rejection.allowed
+        assert buckets.take("b", rule) is None
+
+    def test_bucket_refills_over_the_window(self, monkeypatch):
+        now = [100.0]
+        monkeypatch.setattr("app.core.rate_limit.time.monotonic", lambda: now[0])
+        buckets = LocalTokenBuckets(max_keys=10)
+        rule = RateLimit("default", limit=2, window=60)
+        buckets.take("a", rule)
+        buckets.take("a", rule)
+
+        now[0] += 30  # Half the window: one token back
+
+        assert buckets.take("a", rule) is None
+        assert buckets.take("a", rule) is not None
+
+    def test_least_recently_used_clients_are_dropped(self):
+        buckets = LocalTokenBuckets(max_keys=2)
+        rule = RateLimit("default", limit=1, window=60)
+        for key in ("a", "b", "c"):
+            buckets.take(key, rule)
+
+        assert buckets.take("a", rule) is None  # Forgotten, so a full bucket again
+
+    def test_peek_does_not_take_a_token(self):
+        buckets = LocalTokenBuckets(max_keys=10)
+        rule = RateLimit("default", limit=1, window=60)
+
+        assert buckets.peek("a", rule) is None
+        assert buckets.take("a", rule) is None
+        assert buckets.peek("a", rule) is not None
+
+
+@pytest.mark.parametrize(
+    "method, path, content_type, category",
+    [
+        ("POST", "/api/v1/auth/login", "application/json", "auth"),
+        ("POST", "/api/v1/ai/cv/generate", "application/json", "ai"),
+        ("POST", "/api/v1/scraper/trigger", "application/json", "scraping"),
+        ("GET", "/api/v1/scraper/status/1", "", "read"),
+        ("POST", "/api/v1/parser/cv", "multipart/form-data; boundary=x", "upload"),
+        ("GET", "/api/v1/authors", "", "read"),
+        ("HEAD", "/api/v1/jobs", "", "read"),
+        ("PATCH", "/api/v1/applications/1", "application/json", "write"),
+        ("DELETE", "/api/v1/applications/1", "", "write"),
+        ("GET", "/metrics", "", None),
+    ],
+)
+def test_classify(method, path, content_type, category):
+    rule = classify(path, limits(), method, content_type)
+    assert (rule.category if rule else None) == category
+
+
+async def test_reads_and_writes_have_separate_limits(middleware, monkeypatch):
+    monkeypatch.setattr(settings, "RATE_LIMIT_WRITE_PER_MINUTE", 1)
+    middleware.categories = limits()
+    write = {**http_scope("/api/v1/applications"), "method": "POST"}
+
+    assert (await call(middleware, write))[0] == 200
+    assert (await call(middleware, write))[0] == 429
+    assert (await call(middleware, http_scope("/api/v1/applications")))[0] == 200
+
+
+def test_client_ip_trusts_only_the_configured_proxy_hops(monkeypatch):
+    scope = http_scope("/", client="10.0.0.1")
+    headers = Headers({"x-forwarded-for": "1.1.1.1, 203.0.113.9"})
+
+    assert client_ip(scope, headers) == "10.0.0.1"
+    monkeypatch.setattr(settings, "RATE_LIMIT_PROXY_HOPS", 1)
+    assert client_ip(scope, headers) == "203.0.113.9"
@@ -0,0 +1,153 @@
+"""
+Tests for the Server-Timing middleware and request phase accounting.
+"""
+import asyncio
+
+import pytest
+from starlette.datastructures import Headers
+
+from app.core.circuit_breaker import CircuitBreaker
+from app.core.query_stats import current_query_stats
+from app.core.timing import (
+    TimedJSONResponse,
+    TimingMiddleware,
+    current_timings,
+    record_phase,
+    timed,
+)
+
+
+def ok_app(work=None):
+    async def app(scope, receive, send):
+        if work is not None:
+            await work()
+        await send({"type": "http.response.start", "status": 200, "headers": []})
+        await send({"type": "http.response.body", "body": b"ok"})
+
+    return app
+
+
+async def run(app, scope_type: str = "http"):
+    messages = []
+
+    async def receive():
+        return {"type": "http.request", "body": b""}
+
+    async def send(message):
+        messages.append(message)
+
+    await app({"type": scope_type, "method": "GET", "path": "/jobs", "headers": []}, receive, send)
+    return messages
+
+
+async def call(app):
+    messages = await run(app)
+    return Headers(raw=messages[0]["headers"]), messages
+
+
+def server_timing(headers) -> dict:
+    """Server-Timing entries as {name: (dur, desc)}."""
+    entries = {}
+    for entry in headers["server-timing"].split(", "):
+        name, *params = entry.split(";")
+        values = dict(param.split("=", 1) for param in params)
+        entries[name] = (float(values["dur"]), values.get("desc"))
+    return entries
+
+
+async def test_every_response_reports_the_same_phases():
+    headers, _ = await call(TimingMiddleware(ok_app()))
+
+    entries = server_timing(headers)
+    assert list(entries) == ["db", "cache", "serialization", "total"]
+    assert entries["db"] == (0.0, '"0 queries"')
+    assert entries["cache"] == entries["serialization"] == (0.0, None)
+    assert float(headers["x-process-time"]) * 1000 == pytest.approx(entries["total"][0], abs=0.1)
+
+
+async def test_recorded_phases_and_queries_are_reported():
+    async def work():
+        record_phase("cache", 2_500_000)
+        record_phase("cache", 500_000)
+        record_phase("render", 1_000_000)  # ad hoc phase, reported after the fixed ones
+        current_query_stats().record("SELECT 1", 4.0)
+
+    headers, _ = await call(TimingMiddleware(ok_app(work)))
+
+    entries = server_timing(headers)
+    assert list(entries) == ["db", "cache", "serialization", "render", "total"]
+    assert entries["db"] == (4.0, '"1 queries"')
+    assert entries["cache"][0] == 3.0
+    assert entries["render"][0] == 1.0
+
+
+async def test_threadpool_work_counts_towards_the_request():
+    def blocking():
+        with timed("cache"):
+            pass
+        record_phase("cache", 1_000_000)
+
+    async def work():
+        await asyncio.to_thread(blocking)
+
+    headers, _ = await call(TimingMiddleware(ok_app(work)))
+
+    assert server_timing(headers)["cache"][0] >= 1.0
+
+
+async def test_breaker_calls_count_as_their_phase():
+    breaker = CircuitBreaker("test", failure_threshold=3, recovery_timeout=30, timing_phase="cache")
+
+    async def work():
+        with breaker.guard():
+            await asyncio.sleep(0.002)
+
+    headers, _ = await call(TimingMiddleware(ok_app(work)))
+
+    assert server_timing(headers)["cache"][0] >= 2.0
+
+
+async def test_json_rendering_counts_as_serialization():
+    seen = []
+
+    async def app(scope, receive, send):
+        response = TimedJSONResponse({"jobs": [{"title": "Engineer"}] * 1000})
+        seen.append(current_timings().phases["serialization"])
+        await response(scope, receive, send)
+
+    headers, messages = await call(TimingMiddleware(app))
+
+    assert seen[0] > 0
+    assert messages[1]["body"].startswith(b'{"jobs":[')
+    assert "serialization;dur=" in headers["server-timing"]
+
+
+async def test_timings_end_with_the_request():
+    await call(TimingMiddleware(ok_app()))
+
+    assert current_timings() is None
+    record_phase("cache", 1)  # No request: ignored
+
+
+async def test_non_http_scopes_pass_through():
+    seen = []
+
+    async def app(scope, receive, send):
+        seen.append(current_timings())
+        await send({"type": "lifespan.startup.complete"})
+
+    messages = await run(TimingMiddleware(app), scope_type="lifespan")
+
+    assert seen == [None]
+    assert messages == [{"type": "lifespan.startup.complete"}]
+
+
+def test_timed_records_even_when_the_block_raises(monkeypatch):
+    recorded = []
+    monkeypatch.setattr("app.core.timing.record_phase", lambda phase, ns: recorded.append(phase))
+
+    with pytest.raises(ValueError):
+        with timed("render"):
+            raise ValueError
+
+    assert recorded == ["render"]
@@ -0,0 +1,84 @@
+"""
+Tests for user-wide token revocation at the one-second `iat` resolution.
+"""
+import json
+import time
+
+import pytest
+from jose import jwt
+
+from app.config import settings
+from app.core import token_cache
+from app.core.token_cache import TokenClaimsCache, is_revoked_by, token_digest
+
+NOW = 1_700_000_000
+
+
+def make_token(user_id: str, iat: int) -> str:
+    claims = {"sub": user_id, "iat": iat, "exp": int(time.time()) + 3600}
+    return jwt.encode(claims, settings.SECRET_KEY, algorithm=settings.ALGORITHM)
+
+
+@pytest.mark.parametrize(
+    "iat, revoked",
+    [(NOW - 1, True), (NOW, False), (NOW + 1, False)],
+)
+def test_only_tokens_from_earlier_seconds_are_revoked(iat, revoked):
+    assert is_revoked_by({"iat": iat}, NOW) is revoked
+
+
+def test_cutoff_is_compared_in_whole_seconds():
+    # A float cutoff from an older writer must not revoke the same second
+    assert not is_revoked_by({"iat": NOW}, NOW + 0.9)
+    assert not is_revoked_by({"iat": NOW}, str(NOW + 0.9))
+    assert is_revoked_by({"iat": NOW}, NOW + 1)
+
+
+def test_missing_iat_counts_as_revoked():
+    assert is_revoked_by({}, NOW)
+
+
+class TestRevokeUserTokens:
+    @pytest.fixture(autouse=True)
+    def setup(self, monkeypatch, async_cache):
+        self.claims = TokenClaimsCache(max_entries=100)
+        self.claims.listener_started()
+        monkeypatch.setattr(token_cache, "claims_cache", self.claims)
+        monkeypatch.setattr(token_cache, "async_cache", async_cache)
+        monkeypatch.setattr(settings, "TOKEN_CACHE_ENABLED", True)
+
+    async def test_revocation_spares_tokens_issued_in_the_same_second(self, monkeypatch):
+        earlier = make_token("user-1", NOW - 1)
+        same_second = make_token("user-1", NOW)
+        other_user = make_token("user-2", NOW - 1)
+        for token in (earlier, same_second, other_user):
+            assert await token_cache.verify_token_cached(token) is not None
+
+        monkeypatch.setattr(token_cache.time, "time", lambda: NOW + 0.6)
+        await token_cache.revoke_user_tokens("user-1")
+
+        assert self.claims.get(token_digest(earlier)) is None
+        assert self.claims.get(token_digest(same_second)) is not None
+        self.claims.clear()  # Force the Redis check on the next lookup
+        assert await token_cache.verify_token_cached(earlier) is None
+        assert await token_cache.verify_token_cached(same_second) is not None
+        assert await token_cache.verify_token_cached(other_user) is not None
+
+    async def test_broadcast_applies_the_same_boundary(self):
+        earlier = make_token("user-1", NOW - 1)
+        same_second = make_token("user-1", NOW)
+        for token in (earlier, same_second):
+            await token_cache.verify_token_cached(token)
+
+        self.claims.apply_revocation(json.dumps({"user": "user-1", "before": NOW}).encode())
+
+        assert self.claims.get(token_digest(earlier)) is None
+        assert self.claims.get(token_digest(same_second)) is not None
+
+    async def test_revoke_single_token(self):
+        token = make_token("user-1", NOW)
+        await token_cache.verify_token_cached(token)
+
+        await token_cache.revoke_token(token)
+
+        assert await token_cache.verify_token_cached(token) is None